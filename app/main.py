@@ -27,9 +27,12 @@ from PySide6.QtGui import (
 )
 
 # Import custom modules
-from src.audio_capture import AudioCapture
+from src.audio_capture import AudioCapture, CAPTURE_PROFILES
+from src.device_registry import get_device_registry
 from src.whisper_manager import WhisperManager
+from src.dictation_pipeline import DictationPipeline
 from src.text_injector import TextInjector
+from src.key_delay_calibration import KeyDelayCalibrator
 from src.config_manager import ConfigManager
 from src.global_shortcuts import GlobalShortcuts, get_available_keyboards
 from src.benchmark import (
@@ -544,6 +547,9 @@ class SignalEmitter(QObject):
     status_update = Signal(str)
     recording_state = Signal(bool)
     pause_state = Signal(bool)  # True = paused, False = resumed
+    queue_state = Signal(int)  # Utterances still waiting for transcription
+    injection_progress = Signal(int, int)  # characters typed, total characters
+    injection_finished = Signal(bool)  # True = typed, False = left in clipboard
 
 
 class BenchmarkDialog(QDialog):
@@ -1366,6 +1372,167 @@ class BenchmarkDialog(QDialog):
             )
 
 
+class KeyDelayCalibrationDialog(QDialog):
+    """Dialog that types known strings into a test field to find the smallest safe key delay"""
+
+    # Signals for thread-safe UI updates
+    class CalibrationSignals(QObject):
+        clear_field = Signal()
+        load_changed = Signal(float)
+        trial_finished = Signal(str)  # log line
+        calibration_finished = Signal(object)  # CalibrationResult or None
+
+    # Event-loop tick of the simulated load, in milliseconds
+    LOAD_TICK_MS = 10
+
+    def __init__(self, parent, config: ConfigManager, keyboard):
+        super().__init__(parent)
+        self.config = config
+        self.keyboard = keyboard
+        self.result = None
+
+        self.setWindowTitle("Key Delay Calibration")
+        self.setMinimumSize(600, 450)
+        self.setModal(True)
+
+        # State read by the calibration thread
+        self._field_text = ""
+        self._field_focused = False
+        self._load = 0.0
+
+        self.signals = self.CalibrationSignals()
+        self.signals.clear_field.connect(self._clear_field)
+        self.signals.load_changed.connect(self._set_load)
+        self.signals.trial_finished.connect(self._log)
+        self.signals.calibration_finished.connect(self._on_calibration_finished)
+
+        self.calibrator = None
+        if keyboard is not None:
+            self.calibrator = KeyDelayCalibrator(
+                keyboard,
+                clear_field=self.signals.clear_field.emit,
+                read_field=lambda: self._field_text,
+                set_load=self.signals.load_changed.emit,
+                field_focused=lambda: self._field_focused,
+                config_manager=config,
+            )
+
+        # Keeps the event loop busy for a fraction of every tick while typing
+        self.load_timer = QTimer()
+        self.load_timer.timeout.connect(self._load_tick)
+
+        self._setup_ui()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setSpacing(12)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        title = QLabel("Key Delay Calibration")
+        title.setStyleSheet(f"font-size: 20px; font-weight: bold; color: {COLORS['primary']};")
+        layout.addWidget(title)
+
+        subtitle = QLabel("Known text is typed into the field below with shorter and shorter delays, "
+                          "while the window is kept busy. Don't touch the keyboard or mouse until it finishes.")
+        subtitle.setWordWrap(True)
+        subtitle.setStyleSheet(f"color: {COLORS['text_dim']};")
+        layout.addWidget(subtitle)
+
+        self.test_field = QLineEdit()
+        self.test_field.textChanged.connect(self._on_field_changed)
+        layout.addWidget(self.test_field)
+
+        self.calibration_log = QTextEdit()
+        self.calibration_log.setReadOnly(True)
+        layout.addWidget(self.calibration_log, 1)
+
+        self.status_label = QLabel("" if self.calibrator else
+                                   "Calibration needs the uinput keyboard or a connection to ydotoold.")
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.start_btn = QPushButton("Start")
+        self.start_btn.setEnabled(self.calibrator is not None)
+        self.start_btn.clicked.connect(self._start_calibration)
+        button_layout.addWidget(self.start_btn)
+        self.close_btn = QPushButton("Close")
+        self.close_btn.clicked.connect(self.reject)
+        button_layout.addWidget(self.close_btn)
+        layout.addLayout(button_layout)
+
+    def _start_calibration(self):
+        self.start_btn.setEnabled(False)
+        self.calibration_log.clear()
+        self.status_label.setText("Calibrating...")
+        self.activateWindow()
+        self.test_field.setFocus()
+        self.load_timer.start(self.LOAD_TICK_MS)
+
+        def report(trial):
+            outcome = "ok"
+            if not trial.passed:
+                if trial.reordered:
+                    outcome = "reordered"
+                else:
+                    outcome = f"{trial.dropped} dropped, {trial.extra} extra"
+            self.signals.trial_finished.emit(
+                f"{trial.key_delay:>4} ms  load {trial.load:.0%}  "
+                f"{trial.chars_per_second:6.1f} chars/s  {outcome}")
+
+        def run():
+            time.sleep(0.5)  # let the compositor give the field keyboard focus
+            result = self.calibrator.calibrate(progress_callback=report)
+            self.signals.calibration_finished.emit(result)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _on_calibration_finished(self, result):
+        self.load_timer.stop()
+        self.start_btn.setEnabled(True)
+        if result is None:
+            self.status_label.setText(f"Calibration failed: {self.calibrator.error}")
+            return
+
+        self.result = result
+        saved = self.calibrator.save(result)
+        self.status_label.setText(
+            f"Smallest safe delay: {result.key_delay} ms ({result.chars_per_second:.0f} chars/s, "
+            f"was {result.previous_key_delay} ms at about {result.previous_chars_per_second:.0f} chars/s). "
+            + ("Saved as the new key delay." if saved else "Could not save the setting."))
+
+    def _on_field_changed(self, text: str):
+        self._field_text = text
+
+    def _clear_field(self):
+        self.test_field.clear()
+        self._field_text = ""
+
+    def _set_load(self, load: float):
+        self._load = load
+
+    def _load_tick(self):
+        """Busy-wait for the current load's share of the tick, as a slow application would"""
+        focused = self.isActiveWindow() and self.test_field.hasFocus()
+        if self._field_focused and not focused and self.calibrator is not None:
+            # Stop typing now rather than at the next trial - keys would go to another window
+            self.calibrator.focus_lost()
+        self._field_focused = focused
+        busy_until = time.perf_counter() + self._load * self.LOAD_TICK_MS / 1000.0
+        while time.perf_counter() < busy_until:
+            pass
+
+    def _log(self, line: str):
+        self.calibration_log.append(line)
+
+    def reject(self):
+        if self.calibrator is not None:
+            self.calibrator.cancel()
+        self.load_timer.stop()
+        super().reject()
+
+
 class SettingsDialog(QDialog):
     """Settings dialog for Wayland Voice Typer"""
 
@@ -1520,6 +1687,22 @@ class SettingsDialog(QDialog):
         layout.addLayout(pause_layout)
         self.shortcut_combos['pause'] = self.pause_shortcut_combo
 
+        # Cancel typing shortcut
+        cancel_layout = QHBoxLayout()
+        cancel_layout.addWidget(QLabel("Cancel Typing:"))
+        self.cancel_shortcut_combo = QComboBox()
+        self.cancel_shortcut_combo.addItem("(None)", "")
+        self.cancel_shortcut_combo.addItems(self._get_shortcut_options())
+        if shortcuts.get('cancel'):
+            idx = self.cancel_shortcut_combo.findText(shortcuts.get('cancel'))
+            if idx >= 0:
+                self.cancel_shortcut_combo.setCurrentIndex(idx)
+        self.cancel_shortcut_combo.currentTextChanged.connect(lambda: self._validate_shortcuts())
+        cancel_layout.addWidget(self.cancel_shortcut_combo)
+        cancel_layout.addStretch()
+        layout.addLayout(cancel_layout)
+        self.shortcut_combos['cancel'] = self.cancel_shortcut_combo
+
         # Legacy reference (for backward compatibility display)
         self.shortcut_combo = self.toggle_shortcut_combo
 
@@ -1762,18 +1945,53 @@ class SettingsDialog(QDialog):
         self.key_delay_spin.setRange(1, 200)
         self.key_delay_spin.setValue(15)
         delay_layout.addWidget(self.key_delay_spin)
+        calibrate_btn = QPushButton("Calibrate...")
+        calibrate_btn.setToolTip("Find the smallest delay at which no characters are lost")
+        calibrate_btn.clicked.connect(self._calibrate_key_delay)
+        delay_layout.addWidget(calibrate_btn)
         delay_layout.addStretch()
         layout.addLayout(delay_layout)
 
+        # Paste instead of typing long texts
+        paste_layout = QHBoxLayout()
+        paste_layout.addWidget(QLabel("Paste texts from (chars):"))
+        self.paste_threshold_spin = QSpinBox()
+        self.paste_threshold_spin.setRange(0, 100000)
+        self.paste_threshold_spin.setSpecialValueText("Never")
+        self.paste_threshold_spin.setToolTip("Longer texts are pasted through the clipboard instead of typed")
+        paste_layout.addWidget(self.paste_threshold_spin)
+        self.paste_shortcut_combo = QComboBox()
+        self.paste_shortcut_combo.addItem("Ctrl+V", 'ctrl+v')
+        self.paste_shortcut_combo.addItem("Ctrl+Shift+V (terminals)", 'ctrl+shift+v')
+        paste_layout.addWidget(self.paste_shortcut_combo)
+        paste_layout.addStretch()
+        layout.addLayout(paste_layout)
+
         # Microphone
         mic_layout = QHBoxLayout()
         mic_layout.addWidget(QLabel("Microphone:"))
         self.mic_combo = QComboBox()
         self._load_microphones()
         mic_layout.addWidget(self.mic_combo)
+        rescan_mic_btn = QPushButton("Rescan")
+        rescan_mic_btn.setToolTip("Look for newly connected microphones")
+        rescan_mic_btn.clicked.connect(self._rescan_microphones)
+        mic_layout.addWidget(rescan_mic_btn)
         mic_layout.addStretch()
         layout.addLayout(mic_layout)
 
+        # Capture profile
+        profile_layout = QHBoxLayout()
+        profile_layout.addWidget(QLabel("Capture Profile:"))
+        self.profile_combo = QComboBox()
+        for name, profile in CAPTURE_PROFILES.items():
+            block_ms = profile['blocksize'] * 1000 // 16000
+            self.profile_combo.addItem(f"{name} ({block_ms} ms blocks)", name)
+        self.profile_combo.setToolTip("Smaller blocks react faster; compare with 'benchmark.py profiles'")
+        profile_layout.addWidget(self.profile_combo)
+        profile_layout.addStretch()
+        layout.addLayout(profile_layout)
+
         # Keyboard device
         kb_layout = QHBoxLayout()
         kb_layout.addWidget(QLabel("Keyboard Device:"))
@@ -1794,10 +2012,10 @@ class SettingsDialog(QDialog):
                 options.append(f'{prefix}{fkey}')
         return options
 
-    def _refresh_model_list(self):
+    def _refresh_model_list(self, force_rescan: bool = False):
         """Refresh the model dropdown"""
         self.model_combo.clear()
-        models = self.whisper_manager.get_available_models() if self.whisper_manager else []
+        models = self.whisper_manager.get_available_models(force_rescan) if self.whisper_manager else []
         if models:
             self.model_combo.addItems(models)
         else:
@@ -1817,6 +2035,26 @@ class SettingsDialog(QDialog):
         except Exception as e:
             print(f"Error loading microphones: {e}")
 
+    def _calibrate_key_delay(self):
+        """Measure the smallest safe key delay with the application's own keyboard"""
+        text_injector = getattr(self.parent_window, 'text_injector', None)
+        keyboard = text_injector.keyboard if text_injector else None
+        if keyboard is not None and not (keyboard.is_open or keyboard.open()):
+            keyboard = None
+        dialog = KeyDelayCalibrationDialog(self, self.config, keyboard)
+        dialog.exec()
+        if dialog.result is not None:
+            self.key_delay_spin.setValue(dialog.result.key_delay)
+            self.update_callback()
+
+    def _rescan_microphones(self):
+        """Re-enumerate audio devices, keeping the current selection if it still exists"""
+        selected = self.mic_combo.currentData()
+        get_device_registry().refresh()
+        self._load_microphones()
+        idx = self.mic_combo.findData(selected)
+        self.mic_combo.setCurrentIndex(idx if idx >= 0 else 0)
+
     def _load_keyboards(self):
         """Load available keyboards"""
         self.kb_combo.clear()
@@ -1852,6 +2090,10 @@ class SettingsDialog(QDialog):
         self.always_on_top_cb.setChecked(self.config.get_setting('always_on_top', True))
         self.audio_feedback_cb.setChecked(self.config.get_setting('audio_feedback', True))
         self.key_delay_spin.setValue(self.config.get_setting('key_delay', 15))
+        self.paste_threshold_spin.setValue(self.config.get_setting('paste_threshold_chars', 200))
+        idx = self.paste_shortcut_combo.findData(self.config.get_setting('paste_shortcut', 'ctrl+v'))
+        if idx >= 0:
+            self.paste_shortcut_combo.setCurrentIndex(idx)
 
         # Audio device
         current_audio = self.config.get_setting('audio_device', None)
@@ -1860,6 +2102,11 @@ class SettingsDialog(QDialog):
                 self.mic_combo.setCurrentIndex(i)
                 break
 
+        # Capture profile
+        idx = self.profile_combo.findData(self.config.get_setting('capture_profile', 'balanced'))
+        if idx >= 0:
+            self.profile_combo.setCurrentIndex(idx)
+
         # Keyboard device
         current_kb = self.config.get_setting('keyboard_device', '')
         for i in range(self.kb_combo.count()):
@@ -1906,7 +2153,7 @@ class SettingsDialog(QDialog):
     def _refresh_models(self):
         """Refresh models after directory changes"""
         self.config.save_config()
-        self._refresh_model_list()
+        self._refresh_model_list(force_rescan=True)
         QMessageBox.information(self, "Models Refreshed", "Model list has been refreshed.")
 
     def _save_settings(self):
@@ -1940,8 +2187,13 @@ class SettingsDialog(QDialog):
             self.config.set_setting('always_on_top', self.always_on_top_cb.isChecked())
             self.config.set_setting('audio_feedback', self.audio_feedback_cb.isChecked())
             self.config.set_setting('key_delay', self.key_delay_spin.value())
+            self.config.set_setting('paste_threshold_chars', self.paste_threshold_spin.value())
+            self.config.set_setting('paste_shortcut', self.paste_shortcut_combo.currentData())
             self.config.set_setting('audio_device', self.mic_combo.currentData())
             self.config.set_setting('keyboard_device', self.kb_combo.currentData())
+            self.config.set_setting('capture_profile', self.profile_combo.currentData())
+            if self.audio_capture:
+                self.audio_capture.set_capture_profile(self.profile_combo.currentData())
 
             new_model = self.model_combo.currentText()
             if new_model != "No models found":
@@ -1957,9 +2209,17 @@ class SettingsDialog(QDialog):
             shortcuts_changed = new_shortcuts != old_shortcuts
             if shortcuts_changed and self.global_shortcuts:
                 self.global_shortcuts.stop()
-                # Update each shortcut
+                # Update each shortcut - a newly assigned one needs its action
+                actions = {
+                    'toggle': '_toggle_recording',
+                    'start': '_start_recording',
+                    'stop': '_stop_recording',
+                    'pause': '_toggle_pause',
+                    'cancel': '_cancel_typing',
+                }
                 for name, key in new_shortcuts.items():
-                    self.global_shortcuts.update_shortcut_by_name(name, key)
+                    callback = getattr(self.parent_window, actions.get(name, ''), None)
+                    self.global_shortcuts.update_shortcut_by_name(name, key, callback)
                 self.global_shortcuts.start()
 
             if self.update_callback:
@@ -1980,22 +2240,46 @@ class WhisperTuxApp(QMainWindow):
         # Initialize core components
         self.config = ConfigManager()
         audio_device_id = self.config.get_setting('audio_device', None)
-        self.audio_capture = AudioCapture(device_id=audio_device_id)
+        preroll_ms = self.config.get_setting('preroll_ms', 300) if self.config.get_setting('always_on_capture', False) else 0
+        spill_after = (self.config.get_setting('spill_threshold_seconds', 120)
+                       if self.config.get_setting('long_session_mode', False) else 0)
+        self.audio_capture = AudioCapture(device_id=audio_device_id, preroll_ms=preroll_ms,
+                                          native_rate=self.config.get_setting('native_rate_capture', True),
+                                          spill_after_seconds=spill_after,
+                                          spill_dir=str(self.config.get_temp_directory()),
+                                          sample_format=self.config.get_setting('capture_format', 'float32'),
+                                          capture_profile=self.config.get_setting('capture_profile', 'balanced'))
+        self.audio_capture.start_always_on()
         self.whisper_manager = WhisperManager()
         self.text_injector = TextInjector(self.config)
         self.global_shortcuts = None
 
-        # Application state
-        self.is_recording = False
-        self.is_paused = False
-        self.is_processing = False
-
         # Signal emitter for thread-safe UI updates
         self.signals = SignalEmitter()
         self.signals.transcription_ready.connect(self._handle_transcription)
         self.signals.status_update.connect(self._update_status)
         self.signals.recording_state.connect(self._update_recording_ui)
         self.signals.pause_state.connect(self._update_pause_ui)
+        self.signals.queue_state.connect(self._update_queue_ui)
+        self.signals.injection_progress.connect(self._update_injection_progress)
+        self.signals.injection_finished.connect(self._handle_injection_finished)
+
+        # Recording -> transcription pipeline; callbacks arrive on pipeline threads
+        self.pipeline = DictationPipeline(
+            self.audio_capture,
+            self.whisper_manager,
+            self.config,
+            max_pending=self.config.get_setting('pipeline_max_pending', 4),
+            text_injector=self.text_injector,
+        )
+        self.pipeline.on_recording_state = self.signals.recording_state.emit
+        self.pipeline.on_pause_state = self.signals.pause_state.emit
+        self.pipeline.on_status = self.signals.status_update.emit
+        self.pipeline.on_queue_changed = self.signals.queue_state.emit
+        self.pipeline.on_transcription = lambda job: self.signals.transcription_ready.emit(job.text)
+        self.pipeline.on_injection_progress = lambda job, done, total: self.signals.injection_progress.emit(done, total)
+        self.pipeline.on_injection_finished = lambda job: self.signals.injection_finished.emit(job.injected)
+        self.pipeline.start()
 
         # Audio monitoring timer
         self.audio_timer = QTimer()
@@ -2391,10 +2675,12 @@ class WhisperTuxApp(QMainWindow):
                 start_key=shortcuts.get('start', ''),
                 stop_key=shortcuts.get('stop', ''),
                 pause_key=shortcuts.get('pause', ''),
+                cancel_key=shortcuts.get('cancel', ''),
                 toggle_callback=self._toggle_recording,
                 start_callback=self._start_recording,
                 stop_callback=self._stop_recording,
                 pause_callback=self._toggle_pause,
+                cancel_callback=self._cancel_typing,
             )
             self.global_shortcuts.start()
             print("Global shortcuts initialized")
@@ -2488,84 +2774,23 @@ class WhisperTuxApp(QMainWindow):
 
     def _toggle_recording(self):
         """Toggle recording state"""
-        if self.is_recording:
-            self._stop_recording()
-        else:
-            self._start_recording()
+        self.pipeline.toggle_recording()
 
     def _toggle_pause(self):
         """Toggle pause state during recording"""
-        if not self.is_recording:
-            return
+        self.pipeline.toggle_pause()
 
-        self.is_paused = self.audio_capture.toggle_pause()
-        self.signals.pause_state.emit(self.is_paused)
+    def _cancel_typing(self):
+        """Stop typing the current utterance"""
+        self.pipeline.cancel_injection()
 
     def _start_recording(self):
-        """Start recording"""
-        if self.is_recording or self.is_processing:
-            return
-
-        try:
-            self.is_recording = True
-            self.signals.recording_state.emit(True)
-
-            # Play start beep if enabled
-            if self.config.get_setting('audio_feedback', True):
-                threading.Thread(target=AudioFeedback.play_start_beep, daemon=True).start()
-
-            # Start audio monitoring
-            self.audio_meter.set_recording(True)
-            self.audio_timer.start(50)
-
-            def record_audio():
-                try:
-                    self.audio_capture.start_recording()
-                except Exception as e:
-                    self.signals.status_update.emit(f"Recording error: {e}")
-                    self.signals.recording_state.emit(False)
-
-            threading.Thread(target=record_audio, daemon=True).start()
-
-        except Exception as e:
-            self.is_recording = False
-            self.signals.recording_state.emit(False)
-            QMessageBox.critical(self, "Error", f"Failed to start recording: {e}")
+        """Start recording - previous utterances keep transcribing in the background"""
+        self.pipeline.start_recording()
 
     def _stop_recording(self):
-        """Stop recording and process"""
-        if not self.is_recording:
-            return
-
-        self.is_recording = False
-        self.is_processing = True
-        self.signals.recording_state.emit(False)
-
-        # Play stop beep if enabled
-        if self.config.get_setting('audio_feedback', True):
-            threading.Thread(target=AudioFeedback.play_stop_beep, daemon=True).start()
-
-        # Stop audio monitoring
-        self.audio_timer.stop()
-        self.audio_meter.set_recording(False)
-
-        def process_recording():
-            try:
-                audio_data = self.audio_capture.stop_recording()
-
-                if audio_data is not None and len(audio_data) > 0:
-                    self.signals.status_update.emit("Processing...")
-                    transcription = self.whisper_manager.transcribe_audio(audio_data)
-                    self.signals.transcription_ready.emit(transcription)
-                else:
-                    self.signals.transcription_ready.emit("")
-
-            except Exception as e:
-                self.signals.status_update.emit(f"Error: {e}")
-                # Reset UI on error too
-                self.signals.transcription_ready.emit("")
-
-        threading.Thread(target=process_recording, daemon=True).start()
+        """Stop recording and queue the audio for transcription"""
+        self.pipeline.stop_recording()
 
     def _update_audio_level(self):
         """Update audio level meter"""
@@ -2573,42 +2798,27 @@ class WhisperTuxApp(QMainWindow):
         self.audio_meter.set_level(level)
 
     def _handle_transcription(self, transcription: str):
-        """Handle completed transcription"""
-        # Reset processing state and update UI
-        self.is_processing = False
-        self._reset_record_button()
-
-        if transcription and transcription.strip():
-            cleaned = transcription.strip()
-            blank_indicators = ["[blank_audio]", "(blank)", "(silence)", "[silence]", "[BLANK_AUDIO]"]
-            is_blank = any(indicator.lower() in cleaned.lower() for indicator in blank_indicators)
-
-            if not is_blank:
-                # Show in text area for reference
-                self.transcription_text.append(cleaned)
-
-                # Inject text as a single batch operation (not character-by-character streaming)
-                # This waits for full transcription then types it all at once
-                # Future: LLM text editing step can be inserted here before injection
-                success = self.text_injector.inject_text(cleaned)
-
-                if success:
-                    self._update_status("Text injected")
-                else:
-                    self._update_status("Copied to clipboard")
-            else:
-                self._update_status("No speech detected")
-        else:
+        """Handle completed transcription (delivered in capture order, blanks already removed)"""
+        if transcription:
+            # Show in text area for reference; the pipeline's injection worker types it
+            self.transcription_text.append(transcription)
+        elif not self.pipeline.is_recording:
             self._update_status("No speech detected")
 
-    def _reset_record_button(self):
-        """Reset the record button to ready state"""
-        self.record_btn.setText("⏺")
-        self.record_btn.setToolTip("Start recording")
-        self.record_btn.setObjectName("primary")
-        self.record_btn.setEnabled(True)
-        self.record_btn.setStyle(self.record_btn.style())
-        self.pause_btn.setVisible(False)
+    def _update_injection_progress(self, typed: int, total: int):
+        """Show typing progress from the injection worker"""
+        if self.pipeline.is_recording or total <= 0:
+            return
+        self._update_status(f"Typing... {typed * 100 // total}%")
+
+    def _handle_injection_finished(self, success: bool):
+        """Handle the end of typing for one utterance"""
+        if self.pipeline.is_recording:
+            return  # keep showing the recording status
+        if success:
+            self._update_status("Text injected")
+        else:
+            self._update_status("Copied to clipboard")
 
     def _update_status(self, status: str):
         """Update status display with color-coded background"""
@@ -2618,7 +2828,7 @@ class WhisperTuxApp(QMainWindow):
         if "Recording" in status:
             bg_color = COLORS['error']
             text_color = COLORS['background']
-        elif "Processing" in status:
+        elif "Processing" in status or "Typing" in status:
             bg_color = COLORS['warning']
             text_color = COLORS['background']
         elif "Paused" in status:
@@ -2645,6 +2855,20 @@ class WhisperTuxApp(QMainWindow):
 
     def _update_recording_ui(self, is_recording: bool):
         """Update UI for recording state"""
+        was_recording = self.recording_start_time is not None
+
+        # Audio feedback and level meter follow the actual recorder state
+        if is_recording and not was_recording:
+            if self.config.get_setting('audio_feedback', True):
+                threading.Thread(target=AudioFeedback.play_start_beep, daemon=True).start()
+            self.audio_meter.set_recording(True)
+            self.audio_timer.start(50)
+        elif not is_recording and was_recording:
+            if self.config.get_setting('audio_feedback', True):
+                threading.Thread(target=AudioFeedback.play_stop_beep, daemon=True).start()
+            self.audio_timer.stop()
+            self.audio_meter.set_recording(False)
+
         if is_recording:
             # Use stop symbol ⏹ when recording
             self.record_btn.setText("⏹")
@@ -2657,27 +2881,22 @@ class WhisperTuxApp(QMainWindow):
             self.duration_label.setVisible(True)
             self.duration_timer.start(1000)  # Update every second
             self._update_status("Recording...")
-        elif self.is_processing:
-            self.record_btn.setText("⏳")
-            self.record_btn.setToolTip("Processing...")
-            self.record_btn.setEnabled(False)
-            self.pause_btn.setVisible(False)
-            # Stop duration timer but keep showing final duration
-            self.duration_timer.stop()
-            self._update_status("Processing...")
         else:
-            # Use record symbol ⏺ when ready
+            # Use record symbol ⏺ when ready - recording can restart while earlier
+            # utterances are still being transcribed
             self.record_btn.setText("⏺")
             self.record_btn.setToolTip("Start recording (or use hotkey)")
             self.record_btn.setObjectName("primary")
             self.record_btn.setEnabled(True)
             self.pause_btn.setVisible(False)
-            self.is_paused = False
             # Hide duration timer
             self.duration_timer.stop()
             self.duration_label.setVisible(False)
             self.recording_start_time = None
-            self._update_status("Ready")
+            if was_recording:
+                self._update_status("Processing...")
+            else:
+                self._update_status("Ready")
 
         # Force style update
         self.record_btn.setStyle(self.record_btn.style())
@@ -2685,6 +2904,15 @@ class WhisperTuxApp(QMainWindow):
         # Update tray icon based on recording state
         self._update_tray_icon(is_recording)
 
+    def _update_queue_ui(self, pending: int):
+        """Reflect how many utterances are still waiting for transcription"""
+        if self.pipeline.is_recording:
+            return
+        if pending > 1:
+            self._update_status(f"Processing ({pending})...")
+        elif pending == 1:
+            self._update_status("Processing...")
+
     def _update_pause_ui(self, is_paused: bool):
         """Update UI for pause state"""
         if is_paused:
@@ -2715,7 +2943,7 @@ class WhisperTuxApp(QMainWindow):
                     background-color: {COLORS['border']};
                 }}
             """)
-            if self.is_recording:
+            if self.pipeline.is_recording:
                 self._update_status("Recording...")
 
     def _copy_transcription(self):
@@ -2743,6 +2971,10 @@ class WhisperTuxApp(QMainWindow):
         toggle_key = shortcuts.get('toggle', 'F13')
         self.shortcut_display.setText(toggle_key)
         self.delay_display.setText(f"{self.config.get_setting('key_delay', 15)}ms delay")
+        if self.text_injector:
+            self.text_injector.set_key_delay(self.config.get_setting('key_delay', 15))
+            self.text_injector.set_paste_strategy(self.config.get_setting('paste_threshold_chars', 200),
+                                                  self.config.get_setting('paste_shortcut', 'ctrl+v'))
         self.mic_display.setText(self._get_current_mic_name())
 
         # Update always on top
@@ -2773,11 +3005,16 @@ class WhisperTuxApp(QMainWindow):
             if self.global_shortcuts:
                 self.global_shortcuts.stop()
 
-            if self.is_recording:
-                self.audio_capture.stop_recording()
+            # Discards an in-progress recording and lets queued work wind down
+            self.pipeline.shutdown()
+            self.text_injector.close()
+            self.audio_capture.stop_always_on()
+            get_device_registry().close()
 
             self.audio_timer.stop()
 
+            self.whisper_manager.shutdown()
+
             if self.tray_icon:
                 self.tray_icon.hide()
 
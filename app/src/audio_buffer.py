@@ -0,0 +1,322 @@
+"""
+Audio buffer for WhisperTux
+Contiguous, preallocated sample storage for recordings
+"""
+
+import os
+import struct
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+# Size of the canonical PCM WAV header written in front of spilled recordings
+WAV_HEADER_SIZE = 44
+
+# int16 full scale, for converting between int16 and float samples
+INT16_SCALE = 32768.0
+
+
+class GrowableAudioBuffer:
+    """
+    A contiguous sample buffer that grows geometrically.
+
+    Chunks are written into a preallocated array with slice assignment, so recording
+    costs one copy per chunk and an occasional resize instead of one small array per
+    chunk plus a full concatenate at the end. view() returns the recorded samples
+    without copying.
+
+    Views stay valid after the buffer grows (they keep the old array alive), but a
+    buffer must not be reused for another recording while views of it are still in
+    use - allocate a new one instead.
+    """
+
+    def __init__(self, sample_rate: int = 16000, initial_seconds: float = 60.0,
+                 dtype=np.float32, growth_factor: float = 1.5):
+        self.sample_rate = sample_rate
+        self.dtype = np.dtype(dtype)
+        self.growth_factor = max(1.1, growth_factor)
+        self._data = np.empty(max(1, int(sample_rate * initial_seconds)), dtype=self.dtype)
+        self._length = 0
+        self.grow_count = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    @property
+    def seconds(self) -> float:
+        return self._length / self.sample_rate
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the buffer, including unused capacity"""
+        return self._data.nbytes
+
+    def append(self, chunk: np.ndarray) -> np.ndarray:
+        """Copy a chunk into the buffer and return a view of where it was stored"""
+        count = len(chunk)
+        end = self._length + count
+        if end > len(self._data):
+            self._grow(end)
+        stored = self._data[self._length:end]
+        stored[:] = chunk
+        self._length = end
+        return stored
+
+    def view(self) -> np.ndarray:
+        """The recorded samples, without copying"""
+        return self._data[:self._length]
+
+    def finish(self) -> np.ndarray:
+        """End of recording - same as view()"""
+        return self.view()
+
+    def discard_front(self, count: int):
+        """
+        Drop the oldest count samples, moving the rest to the start of the buffer.
+
+        Costs one copy of the remaining samples, and overwrites what earlier views show.
+        """
+        count = max(0, min(count, self._length))
+        remaining = self._length - count
+        self._data[:remaining] = self._data[count:self._length]
+        self._length = remaining
+
+    def _grow(self, required: int):
+        capacity = len(self._data)
+        while capacity < required:
+            capacity = int(capacity * self.growth_factor) + 1
+        try:
+            # realloc in place (mremap for large buffers) - no second copy of the recording.
+            # numpy refuses while any view of the array is alive.
+            self._data.resize(capacity)
+        except ValueError:
+            data = np.empty(capacity, dtype=self.dtype)
+            data[:self._length] = self._data[:self._length]
+            self._data = data
+        self.grow_count += 1
+
+
+class SpilledAudio(np.ndarray):
+    """
+    int16 samples of a recording that lives in a WAV file on disk (memory-mapped).
+
+    wav_path is only set on the array returned by SpillingAudioBuffer.finish(); slices
+    and arrays computed from it don't cover the whole file and have wav_path None.
+    """
+
+    def __array_finalize__(self, obj):
+        self.wav_path = None
+
+
+class SpillingAudioBuffer:
+    """
+    Recording buffer that moves to a memory-mapped file once a recording gets long.
+
+    Up to spill_seconds the samples stay in a GrowableAudioBuffer. After that they are
+    converted to int16 and written into a WAV file in spill_dir through np.memmap, so
+    resident memory stays flat however long the session runs - the kernel writes the
+    pages back and can drop them. finish() patches the WAV header, so the file is a
+    complete recording the moment capture stops and whisper-cli can read it directly.
+    """
+
+    # File growth step once spilled
+    GROW_SECONDS = 60.0
+
+    def __init__(self, sample_rate: int = 16000, initial_seconds: float = 60.0,
+                 dtype=np.float32, spill_seconds: float = 120.0, spill_dir: Optional[str] = None):
+        self.sample_rate = sample_rate
+        self.spill_samples = max(1, int(sample_rate * spill_seconds))
+        self.spill_dir = spill_dir
+        self._memory = GrowableAudioBuffer(sample_rate, min(initial_seconds, spill_seconds), dtype)
+        self._file = None
+        self._map = None
+        self.path = None
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def spilled(self) -> bool:
+        return self._file is not None
+
+    @property
+    def seconds(self) -> float:
+        return self._length / self.sample_rate
+
+    def append(self, chunk: np.ndarray) -> np.ndarray:
+        """Store a chunk. Returns the stored view in memory, or the chunk itself once spilled."""
+        if self._file is None:
+            if self._length + len(chunk) <= self.spill_samples:
+                stored = self._memory.append(chunk)
+                self._length += len(chunk)
+                return stored
+            try:
+                self._spill()
+            except OSError as e:
+                # Can't write to disk - keep recording in memory rather than lose audio
+                print(f"WARNING: Could not spill recording to disk, keeping it in memory: {e}")
+                self.spill_samples = float('inf')
+                return self.append(chunk)
+
+        end = self._length + len(chunk)
+        if end > len(self._map):
+            self._grow(end)
+        self._map[self._length:end] = to_int16(chunk)
+        self._length = end
+        return chunk
+
+    def view(self) -> np.ndarray:
+        """The recorded samples - float in memory, int16 from the mapping once spilled"""
+        if self._file is None:
+            return self._memory.view()
+        return self._map[:self._length]
+
+    def finish(self) -> np.ndarray:
+        """Finalize the recording and return its samples without copying"""
+        if self._file is None:
+            return self._memory.view()
+
+        data_bytes = self._length * 2
+        self._map.flush()
+        self._map = None
+        self._file.seek(0)
+        self._file.write(_wav_header(self.sample_rate, data_bytes))
+        self._file.truncate(WAV_HEADER_SIZE + data_bytes)
+        self._file.close()
+        self._file = None
+
+        if self._length == 0:
+            return np.zeros(0, dtype=np.int16)
+        samples = np.memmap(self.path, dtype=np.int16, mode='r', offset=WAV_HEADER_SIZE,
+                            shape=(self._length,)).view(SpilledAudio)
+        samples.wav_path = self.path
+        print(f"Recording of {self.seconds:.0f}s stored in {self.path}")
+        return samples
+
+    def _spill(self):
+        """Move the in-memory samples into a new WAV file and continue there"""
+        fd, self.path = tempfile.mkstemp(prefix='recording-', suffix='.wav', dir=self.spill_dir)
+        self._file = os.fdopen(fd, 'r+b')
+        self._file.write(_wav_header(self.sample_rate, 0))
+        self._grow(self._length + int(self.sample_rate * self.GROW_SECONDS))
+        self._map[:self._length] = to_int16(self._memory.view())
+        self._memory = None
+        print(f"Long recording: spilling to {self.path}")
+
+    def _grow(self, required: int):
+        capacity = max(required, (len(self._map) if self._map is not None else 0)
+                       + int(self.sample_rate * self.GROW_SECONDS))
+        if self._map is not None:
+            self._map.flush()
+        self._file.truncate(WAV_HEADER_SIZE + capacity * 2)
+        self._map = np.memmap(self._file, dtype=np.int16, mode='r+', offset=WAV_HEADER_SIZE,
+                              shape=(capacity,))
+
+
+def to_int16(samples: np.ndarray) -> np.ndarray:
+    """Convert float samples in [-1, 1] to int16, clipping anything outside the range"""
+    if samples.dtype == np.int16:
+        return samples
+    # Clip into one temporary and scale it in place, so out-of-range samples saturate
+    # instead of wrapping around when cast
+    scaled = np.clip(samples, -1.0, 1.0)
+    scaled *= 32767.0
+    return scaled.astype(np.int16)
+
+
+def saturate_int16(values: np.ndarray) -> np.ndarray:
+    """Cast float values already in int16 units (e.g. resampled int16 audio) to int16, clipping in place"""
+    np.clip(values, -32768.0, 32767.0, out=values)
+    return values.astype(np.int16)
+
+
+def to_float32(samples: np.ndarray) -> np.ndarray:
+    """Samples as float32 in [-1, 1], converting int16 recordings"""
+    if samples.dtype == np.int16:
+        return np.multiply(samples, 1.0 / INT16_SCALE, dtype=np.float32)
+    return np.asarray(samples, dtype=np.float32)
+
+
+def count_clipped(samples: np.ndarray) -> int:
+    """Samples at or beyond full scale - clipped by the converter, or about to be clipped by us"""
+    if samples.dtype == np.int16:
+        return int(np.count_nonzero((samples >= 32767) | (samples <= -32767)))
+    return int(np.count_nonzero((samples > 1.0) | (samples < -1.0)))
+
+
+def discard_recording(audio):
+    """Delete the file behind a spilled recording once it is no longer needed"""
+    path = getattr(audio, 'wav_path', None)
+    if path:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def _wav_header(sample_rate: int, data_bytes: int) -> bytes:
+    """44-byte header for 16-bit mono PCM"""
+    return struct.pack('<4sI4s4sIHHIIHH4sI',
+                       b'RIFF', 36 + data_bytes, b'WAVE',
+                       b'fmt ', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+                       b'data', data_bytes)
+
+
+class PrerollRing:
+    """
+    Fixed-size ring holding the most recent audio.
+
+    Used while the input stream is open but nothing is being recorded, so the moment
+    before the hotkey was pressed can be prepended to the next recording.
+    """
+
+    def __init__(self, num_samples: int, dtype=np.float32):
+        self._data = np.zeros(max(1, num_samples), dtype=dtype)
+        self._write = 0   # next write position
+        self._filled = 0  # valid samples, up to capacity
+
+    def __len__(self) -> int:
+        return self._filled
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def write(self, chunk: np.ndarray):
+        """Add samples, overwriting the oldest once the ring is full"""
+        capacity = len(self._data)
+        if len(chunk) >= capacity:
+            self._data[:] = chunk[-capacity:]
+            self._write = 0
+            self._filled = capacity
+            return
+
+        first = min(len(chunk), capacity - self._write)
+        self._data[self._write:self._write + first] = chunk[:first]
+        rest = len(chunk) - first
+        if rest:
+            self._data[:rest] = chunk[first:]
+        self._write = (self._write + len(chunk)) % capacity
+        self._filled = min(capacity, self._filled + len(chunk))
+
+    def drain_into(self, buffer: GrowableAudioBuffer) -> int:
+        """Append the held samples to a buffer, oldest first, and empty the ring"""
+        count = self._filled
+        start = (self._write - count) % len(self._data)
+        if start + count <= len(self._data):
+            buffer.append(self._data[start:start + count])
+        else:
+            buffer.append(self._data[start:])
+            buffer.append(self._data[:self._write])
+        self.clear()
+        return count
+
+    def clear(self):
+        self._write = 0
+        self._filled = 0
@@ -11,40 +11,182 @@ import time
 from typing import Optional, Callable
 from io import BytesIO
 
+try:
+    from .audio_buffer import (GrowableAudioBuffer, SpillingAudioBuffer, PrerollRing,
+                               INT16_SCALE, count_clipped, to_int16)
+    from .capture_engine import CaptureEngine
+    from .device_registry import get_device_registry
+except ImportError:
+    from audio_buffer import (GrowableAudioBuffer, SpillingAudioBuffer, PrerollRing,
+                              INT16_SCALE, count_clipped, to_int16)
+    from capture_engine import CaptureEngine
+    from device_registry import get_device_registry
+
+
+# Capture profiles: block size in samples at 16 kHz and PortAudio's latency hint.
+# Smaller blocks make the level meter, VAD end-pointing and streaming transcription
+# react sooner at the cost of more wakeups per second.
+CAPTURE_PROFILES = {
+    'low-latency': {'blocksize': 256, 'latency': 'low'},     # 16 ms blocks
+    'balanced': {'blocksize': 1024, 'latency': 'high'},      # 64 ms blocks
+    'power-saving': {'blocksize': 4096, 'latency': 'high'},  # 256 ms blocks, fewest wakeups
+}
+DEFAULT_CAPTURE_PROFILE = 'balanced'
+
 
 class AudioCapture:
     """Handles audio recording and real-time level monitoring"""
     
-    def __init__(self, device_id=None):
+    def __init__(self, device_id=None, preroll_ms: int = 0, native_rate: bool = True,
+                 spill_after_seconds: float = 0, spill_dir: Optional[str] = None,
+                 sample_format: str = 'float32', capture_profile: str = DEFAULT_CAPTURE_PROFILE):
         # Audio configuration - whisper.cpp prefers 16kHz mono
         self.sample_rate = 16000
         self.channels = 1
-        self.chunk_size = 1024
-        self.dtype = np.float32
+        if capture_profile not in CAPTURE_PROFILES:
+            print(f"⚠ Unknown capture profile '{capture_profile}', using {DEFAULT_CAPTURE_PROFILE}")
+            capture_profile = DEFAULT_CAPTURE_PROFILE
+        self.capture_profile = capture_profile
+        self.chunk_size = CAPTURE_PROFILES[capture_profile]['blocksize']
+        # 'int16' captures and stores 16-bit samples end to end: half the memory, and no
+        # conversion when the recording is written as WAV
+        if sample_format not in ('float32', 'int16'):
+            print(f"⚠ Unknown capture format '{sample_format}', using float32")
+            sample_format = 'float32'
+        self.sample_format = sample_format
+        self.dtype = np.int16 if sample_format == 'int16' else np.float32
+        # Initial buffer capacity per recording; the buffer grows if a dictation runs longer
+        self.buffer_seconds = 60.0
+        # Long-session mode: past this many seconds a recording moves to a memory-mapped
+        # int16 WAV file in spill_dir (0 = always keep recordings in memory)
+        self.spill_after_seconds = spill_after_seconds
+        self.spill_dir = spill_dir
         
         # Device configuration
         self.preferred_device_id = device_id
+        # Open the device at its own rate and resample to sample_rate ourselves
+        self.native_rate = native_rate
+
+        # Always-on capture: keep the input stream open between recordings and hold the
+        # last preroll_ms of audio, which is prepended when recording starts
+        self.preroll_ms = preroll_ms
+        self.preroll = None
+        self.always_on = False
         
         # Recording state
         self.is_recording = False
         self.is_paused = False
         self.is_monitoring = False
-        self.audio_data = []
+        self.audio_buffer = None
         self.current_level = 0.0
         
         # Threading
-        self.record_thread = None
-        self.monitor_thread = None
         self.lock = threading.Lock()
+        # Serializes opening, closing and cycling the stream against starting and stopping a
+        # recording - hotplug arrives on the watcher thread, recordings on the control thread
+        self._stream_lock = threading.RLock()
         
         # Callbacks
         self.level_callback = None
+        self.chunk_callback = None  # Receives each recorded (unpaused) chunk, e.g. for streaming
         
-        # Audio stream
-        self.stream = None
-        
+        # Device lists come from the shared registry, which re-enumerates only on hotplug
+        self.devices = get_device_registry()
+        self._devices_changed = False
+        self.devices.add_listener(self._on_devices_changed)
+        # Device and profile changes made during a recording, applied once it stops
+        self._pending_stream_changes = []
+
         # Initialize sounddevice
         self._initialize_sounddevice()
+
+        # One input stream shared by the recorder and the level meter
+        self.engine = CaptureEngine(self.sample_rate, self.channels, self.dtype, self.chunk_size,
+                                    device=self.preferred_device_id,
+                                    latency=CAPTURE_PROFILES[capture_profile]['latency'])
+        self._recorder_sub = None
+        self._level_sub = None
+        self._metrics_at_start = None
+        self.last_recording_metrics = None  # CaptureMetrics for the most recent recording
+        self.last_stop_latency = None  # seconds stop_recording() took to hand the audio back
+        self._clipped = 0  # full-scale samples in the current recording
+        self.last_clipped_samples = 0
+        self._configure_native_rate()
+
+    def _configure_native_rate(self):
+        """Let the engine open the device at its default rate and channel count"""
+        if not self.native_rate:
+            return
+        try:
+            device_info = self.devices.get_input_info(self.preferred_device_id)
+            device_rate = int(round(device_info['default_samplerate']))
+            device_channels = max(1, min(int(device_info['max_input_channels']), 2))
+        except Exception as e:
+            print(f"⚠ Could not query native device format, capturing at {self.sample_rate}Hz: {e}")
+            return
+
+        self.engine.device_rate = device_rate
+        self.engine.channels = device_channels
+        # Keep blocks the same duration as chunk_size samples at sample_rate
+        self.engine.blocksize = max(1, int(round(self.chunk_size * device_rate / self.sample_rate)))
+        if device_rate != self.sample_rate or device_channels != self.channels:
+            print(f"Capturing at native {device_rate}Hz/{device_channels}ch, "
+                  f"resampling to {self.sample_rate}Hz mono")
+
+    def _on_devices_changed(self):
+        """Registry listener - audio hardware was added or removed"""
+        with self._stream_lock:
+            self._devices_changed = True
+            # PortAudio only sees the new hardware once no stream is open, and an always-on or
+            # monitoring stream never closes by itself - cycle it unless a recording is running
+            # (stop_recording() does it then)
+            if not self.is_recording and self.engine.is_running:
+                self._cycle_stream()
+
+    def _apply_to_stream(self, change: Callable[[], None]):
+        """
+        Run a change to the engine's device or block format while its stream is closed.
+
+        The engine reads these only when it opens the stream, so an open stream is cycled
+        around the change. During a recording the change waits until the recording stops.
+        """
+        with self._stream_lock:
+            if self.is_recording:
+                self._pending_stream_changes.append(change)
+                print("The change applies when the current recording stops")
+            elif self.engine.is_running:
+                self._cycle_stream([change])
+            else:
+                change()
+
+    def _cycle_stream(self, changes=()):
+        """Close the open stream, apply changes and let the registry re-initialize PortAudio, then reopen it"""
+        with self._stream_lock:
+            always_on, monitoring = self.always_on, self.is_monitoring
+            print("Reopening audio input")
+            if always_on:
+                self.stop_always_on()
+            self.is_monitoring = False
+            self._sync_level_subscription()
+
+            for change in changes:
+                change()
+            self.devices.devices()  # re-enumerates after a hotplug now that nothing is open
+            self.is_monitoring = monitoring
+            try:
+                if always_on:
+                    self.start_always_on()
+                else:
+                    self._refresh_device_format()
+                    self._sync_level_subscription()
+            except Exception as e:
+                print(f"ERROR: Failed to reopen audio input after a device change: {e}")
+
+    def _refresh_device_format(self):
+        """After a hotplug, re-read the device's format before the stream is next opened"""
+        if self._devices_changed and not self.engine.is_running:
+            self._devices_changed = False
+            self._configure_native_rate()
     
     def _initialize_sounddevice(self):
         """Initialize sounddevice and check for available devices"""
@@ -58,7 +200,7 @@ class AudioCapture:
             if self.preferred_device_id is not None:
                 try:
                     # Validate that the device exists and has input channels
-                    device_info = sd.query_devices(device=self.preferred_device_id, kind='input')
+                    device_info = self.devices.get_input_info(self.preferred_device_id)
                     if device_info['max_input_channels'] > 0:
                         sd.default.device[0] = self.preferred_device_id
                         print(f"Using configured audio device: {device_info['name']} (ID: {self.preferred_device_id})")
@@ -77,14 +219,13 @@ class AudioCapture:
             try:
                 # Get current input device info
                 current_device_id = sd.default.device[0] if sd.default.device[0] is not None else sd.default.device
-                device_info = sd.query_devices(device=current_device_id, kind='input')
-                host_api_info = sd.query_hostapis(device_info['hostapi'])
+                device_info = self.devices.get_input_info(current_device_id)
                 
                 print(f"Using audio input device: {device_info['name']}")
                 print(f"  Device ID: {current_device_id}")
                 print(f"  Sample Rate: {device_info['default_samplerate']:.0f} Hz")
                 print(f"  Max Input Channels: {device_info['max_input_channels']}")
-                print(f"  Host API: {host_api_info['name']}")
+                print(f"  Host API: {self.devices.hostapi_name(device_info['hostapi'])}")
                 
                 # Store device info for later use
                 self.device_info = device_info
@@ -104,7 +245,9 @@ class AudioCapture:
     def _set_system_default_device(self):
         """Set system default device when no specific device is configured"""
         try:
-            devices = sd.query_devices()
+            devices = self.devices.devices()
+            if devices is None:
+                raise RuntimeError("PortAudio could not be queried")
             print("Available audio devices:")
             for i, device in enumerate(devices):
                 marker = "*" if i == sd.default.device[0] else " "
@@ -117,25 +260,9 @@ class AudioCapture:
     
     @staticmethod
     def get_available_input_devices():
-        """Get list of available input devices"""
+        """Get list of available input devices (from the cached device registry)"""
         try:
-            devices = sd.query_devices()
-            input_devices = []
-            
-            for i, device in enumerate(devices):
-                if device['max_input_channels'] > 0:
-                    host_api_info = sd.query_hostapis(device['hostapi'])
-                    input_devices.append({
-                        'id': i,
-                        'name': device['name'],
-                        'channels': device['max_input_channels'],
-                        'sample_rate': device['default_samplerate'],
-                        'host_api': host_api_info['name'],
-                        'display_name': f"{device['name']} ({host_api_info['name']})"
-                    })
-            
-            return input_devices
-            
+            return get_device_registry().input_devices()
         except Exception as e:
             print(f"Error getting input devices: {e}")
             return []
@@ -161,15 +288,17 @@ class AudioCapture:
                 # Reset to system default
                 self.preferred_device_id = None
                 sd.default.device[0] = None
+                self._apply_to_stream(lambda: self._use_device(None))
             else:
                 # Validate device exists and has input channels
-                device_info = sd.query_devices(device=device_id, kind='input')
+                device_info = self.devices.get_input_info(device_id)
                 if device_info['max_input_channels'] > 0:
                     self.preferred_device_id = device_id
                     sd.default.device[0] = device_id
                     self.device_info = device_info
                     self.device_id = device_id
                     print(f"Audio device changed to: {device_info['name']} (ID: {device_id})")
+                    self._apply_to_stream(lambda: self._use_device(device_id))
                     return True
                 else:
                     print(f"Device {device_id} has no input channels")
@@ -179,31 +308,50 @@ class AudioCapture:
             print(f"Error setting audio device: {e}")
             return False
     
+    def _use_device(self, device_id):
+        """Point the engine at a device. Stream closed."""
+        self.engine.device = device_id
+        self._configure_native_rate()
+
+    def set_capture_profile(self, name: str) -> bool:
+        """Switch block size and latency, reopening an open stream (after the current recording)"""
+        if name not in CAPTURE_PROFILES:
+            print(f"Unknown capture profile: {name}")
+            return False
+        if name == self.capture_profile and not self._pending_stream_changes:
+            return True
+        self._apply_to_stream(lambda: self._use_capture_profile(name))
+        return True
+
+    def _use_capture_profile(self, name: str):
+        """Set the engine's block size and latency hint. Stream closed."""
+        profile = CAPTURE_PROFILES[name]
+        self.capture_profile = name
+        self.chunk_size = profile['blocksize']
+        self.engine.blocksize = self.chunk_size
+        self.engine.latency = profile['latency']
+        self._configure_native_rate()  # rescales the block size to the device rate
+        print(f"Capture profile: {name} ({self.chunk_size}-sample blocks, latency '{profile['latency']}')")
+
     def _find_system_input_device(self):
         """Try to find the system's configured input device"""
         try:
-            # Try to get the system's default input device using pactl (PulseAudio)
-            import subprocess
-            try:
-                result = subprocess.run(['pactl', 'get-default-source'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    default_source = result.stdout.strip()
-                    print(f"PulseAudio default source: {default_source}")
-                    
-                    # Try to match this with sounddevice devices
-                    devices = sd.query_devices()
-                    for device_idx, device in enumerate(devices):
-                        if (device['max_input_channels'] > 0 and 
-                            (default_source.lower() in device['name'].lower() or 
-                             any(keyword in device['name'].lower() 
-                                 for keyword in ['blue', 'microphone', 'usb', 'webcam']))):
-                            return device_idx
-            except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-                pass  # pactl not available or failed
+            devices = self.devices.devices() or []
+
+            # The system's default input device according to PulseAudio (pactl, cached)
+            default_source = self.devices.default_source()
+            if default_source:
+                print(f"PulseAudio default source: {default_source}")
+                
+                # Try to match this with sounddevice devices
+                for device_idx, device in enumerate(devices):
+                    if (device['max_input_channels'] > 0 and 
+                        (default_source.lower() in device['name'].lower() or 
+                         any(keyword in device['name'].lower() 
+                             for keyword in ['blue', 'microphone', 'usb', 'webcam']))):
+                        return device_idx
             
             # Fallback: Look for devices that are commonly preferred
-            devices = sd.query_devices()
             
             # Priority order: USB microphones, USB audio, built-in audio
             device_priorities = [
@@ -228,7 +376,7 @@ class AudioCapture:
     def _find_pulseaudio_input_device(self):
         """Find a PulseAudio input device"""
         try:
-            host_apis = sd.query_hostapis()
+            host_apis = self.devices.hostapis()
             pulseaudio_idx = None
             
             for idx, api in enumerate(host_apis):
@@ -237,7 +385,7 @@ class AudioCapture:
                     break
             
             if pulseaudio_idx is not None:
-                devices = sd.query_devices()
+                devices = self.devices.devices() or []
                 for device_idx, device in enumerate(devices):
                     if (device['hostapi'] == pulseaudio_idx and 
                         device['max_input_channels'] > 0):
@@ -250,40 +398,110 @@ class AudioCapture:
             return None
     
     def is_available(self) -> bool:
-        """Check if audio capture is available"""
-        try:
-            # Test if we can query devices
-            sd.query_devices()
-            return True
-        except Exception:
-            return False
+        """Check if audio capture is available (answered from the device registry)"""
+        return self.devices.is_available()
     
+    def start_always_on(self) -> bool:
+        """Open the input stream now and keep it open, filling the pre-roll ring between recordings"""
+        with self._stream_lock:
+            if self.preroll_ms <= 0:
+                return False
+            if self.always_on and self.engine.is_active:
+                return True
+            if not self.is_available():
+                print("Audio capture not available for always-on mode")
+                return False
+            self._refresh_device_format()
+
+            if self._recorder_sub is not None and not self.is_recording:
+                # A previous always-on stream died - drop its subscription before reopening
+                self.engine.close()
+                self._recorder_sub = None
+                self._level_sub = None
+
+            with self.lock:
+                self.preroll = PrerollRing(int(self.sample_rate * self.preroll_ms / 1000), self.dtype)
+                self.always_on = True
+
+            try:
+                if self._recorder_sub is None:
+                    self._recorder_sub = self.engine.subscribe(self._on_recorder_block, "recorder")
+                self._sync_level_subscription()
+            except Exception as e:
+                print(f"ERROR: Failed to start always-on capture: {e}")
+                with self.lock:
+                    self.always_on = False
+                    self.preroll = None
+                self._recorder_sub = None
+                return False
+
+            print(f"Always-on capture started with {self.preroll_ms} ms pre-roll")
+            return True
+
+    def stop_always_on(self):
+        """Close the always-on input stream (an active recording is stopped as well)"""
+        with self._stream_lock:
+            if not self.always_on:
+                return
+            if self.is_recording:
+                self.stop_recording()
+            with self.lock:
+                self.always_on = False
+                self.preroll = None
+            if self._recorder_sub is not None:
+                self.engine.unsubscribe(self._recorder_sub)
+                self._recorder_sub = None
+            self._sync_level_subscription()
+
     def start_recording(self) -> bool:
         """Start recording audio"""
-        if not self.is_available():
-            raise RuntimeError("Audio capture not available")
-        
-        if self.is_recording:
-            print("Already recording")
-            return True
+        with self._stream_lock:
+            if not self.is_available():
+                raise RuntimeError("Audio capture not available")
+            self._refresh_device_format()
         
-        try:
-            # Clear previous audio data
-            with self.lock:
-                self.audio_data = []
-                self.is_recording = True
-            
-            # Start recording thread
-            self.record_thread = threading.Thread(target=self._record_audio, daemon=True)
-            self.record_thread.start()
-            
-            print(f"Started recording at {self.sample_rate}Hz")
-            return True
+            if self.is_recording:
+                print("Already recording")
+                return True
+
+            # The always-on stream may have died (e.g. device unplugged) - reopen it
+            if self.always_on and not self.engine.is_active:
+                self.start_always_on()
+
+            try:
+                # Fresh buffer per recording - the previous one may still be waiting for transcription
+                preroll_chunk = None
+                with self.lock:
+                    self.audio_buffer = self._new_buffer()
+                    self._clipped = 0
+                    self._metrics_at_start = self.engine.get_metrics()
+                    if self.always_on and self.preroll is not None and len(self.preroll) > 0:
+                        self.preroll.drain_into(self.audio_buffer)
+                        preroll_chunk = self.audio_buffer.view()
+                        self._clipped = count_clipped(preroll_chunk)
+                    self.is_recording = True
+
+                if preroll_chunk is not None and self.chunk_callback:
+                    self.chunk_callback(preroll_chunk)
+
+                if self._recorder_sub is not None:
+                    # The stream is already open - recording starts with the next block
+                    preroll_ms = 0 if preroll_chunk is None else len(preroll_chunk) * 1000 // self.sample_rate
+                    print(f"Started recording at {self.sample_rate}Hz ({preroll_ms} ms pre-roll)")
+                    return True
+
+                self._recorder_sub = self.engine.subscribe(self._on_recorder_block, "recorder")
+                self._sync_level_subscription()
+
+                print(f"Started recording at {self.sample_rate}Hz")
+                return True
             
-        except Exception as e:
-            print(f"ERROR: Failed to start recording: {e}")
-            self.is_recording = False
-            return False
+            except Exception as e:
+                print(f"ERROR: Failed to start recording: {e}")
+                with self.lock:
+                    self.is_recording = False
+                    self.audio_buffer = None
+                return False
     
     def pause_recording(self) -> bool:
         """Pause recording without stopping it"""
@@ -319,155 +537,135 @@ class AudioCapture:
 
     def stop_recording(self) -> Optional[np.ndarray]:
         """Stop recording and return the recorded audio data"""
-        if not self.is_recording:
-            return None
+        with self._stream_lock:
+            if not self.is_recording:
+                return None
+            stop_started = time.perf_counter()
 
-        # Signal to stop recording
-        with self.lock:
-            self.is_recording = False
-            self.is_paused = False
-        
-        # Wait for recording thread to finish
-        if self.record_thread and self.record_thread.is_alive():
-            self.record_thread.join(timeout=2.0)
-        
-        # Clean up stream
-        self._cleanup_stream()
-        
-        # Return recorded data
-        with self.lock:
-            if self.audio_data:
-                # Concatenate all audio chunks
-                audio_array = np.concatenate(self.audio_data, axis=0)
-                print(f"Recording stopped, captured {len(audio_array)} samples")
-                return audio_array
+            # Let everything captured up to now reach the recorder (the always-on stream stays open)
+            if self.always_on:
+                self.engine.flush()
+            elif self._recorder_sub is not None:
+                self.engine.unsubscribe(self._recorder_sub)
+                self._recorder_sub = None
+
+            # Signal to stop recording
+            with self.lock:
+                self.is_recording = False
+                self.is_paused = False
+                if self.preroll is not None:
+                    self.preroll.clear()  # don't carry this recording's tail into the next one
+                audio_buffer, self.audio_buffer = self.audio_buffer, None
+                self.last_clipped_samples = self._clipped
+
+            self._sync_level_subscription()
+
+            if self._metrics_at_start is not None:
+                self.last_recording_metrics = self.engine.get_metrics().since(self._metrics_at_start)
+                if not self.last_recording_metrics.healthy:
+                    print(f"WARNING: capture problems during recording: {self.last_recording_metrics.summary()}")
+            if self.last_clipped_samples and audio_buffer is not None and len(audio_buffer) > 0:
+                print(f"WARNING: {self.last_clipped_samples} samples clipped "
+                      f"({100.0 * self.last_clipped_samples / len(audio_buffer):.2f}%) - input gain may be too high")
+
+            # Return recorded data as a view of the buffer or its file mapping (no copy)
+            audio_data = None
+            if audio_buffer is not None and len(audio_buffer) > 0:
+                audio_data = audio_buffer.finish()
+            self.last_stop_latency = time.perf_counter() - stop_started
+
+            if audio_data is not None:
+                print(f"Recording stopped, captured {len(audio_data)} samples "
+                      f"(stopped in {self.last_stop_latency * 1000:.1f} ms)")
             else:
                 print("No audio data recorded")
-                return None
-    
-    def _record_audio(self):
-        """Internal method to record audio in a separate thread"""
-        try:
-            # Callback function for sounddevice
-            def audio_callback(indata, frames, time_info, status):
-                if status:
-                    print(f"Audio callback status: {status}")
 
-                with self.lock:
-                    if self.is_recording:
-                        # Store the audio data (indata is already numpy array)
-                        audio_chunk = indata[:, 0]  # Get mono channel
+            # Device, profile and hardware changes made during the recording apply now
+            changes, self._pending_stream_changes = self._pending_stream_changes, []
+            if self.engine.is_running and (changes or self._devices_changed):
+                self._cycle_stream(changes)
+            else:
+                for change in changes:
+                    change()
+            return audio_data
 
-                        # Update current audio level for monitoring (even when paused)
-                        self.current_level = np.sqrt(np.mean(audio_chunk**2))
+    def _new_buffer(self):
+        """Buffer for a new recording"""
+        if self.spill_after_seconds > 0:
+            return SpillingAudioBuffer(self.sample_rate, self.buffer_seconds, self.dtype,
+                                       spill_seconds=self.spill_after_seconds, spill_dir=self.spill_dir)
+        return GrowableAudioBuffer(self.sample_rate, self.buffer_seconds, self.dtype)
+
+    def _on_recorder_block(self, block: np.ndarray):
+        """Recorder subscriber - store blocks while recording, feed the pre-roll otherwise"""
+        stored_chunk = None
+        with self.lock:
+            if self.is_recording:
+                # Only store audio data if not paused
+                if not self.is_paused:
+                    stored_chunk = self.audio_buffer.append(block)
+                    self._clipped += count_clipped(block)
+            elif self.always_on and self.preroll is not None:
+                # Between recordings - keep the most recent audio for the next start
+                self.preroll.write(block)
+
+        # Hand the chunk to any consumer outside the lock
+        if stored_chunk is not None and self.chunk_callback:
+            self.chunk_callback(stored_chunk)
+
+    def _on_level_block(self, block: np.ndarray):
+        """Level subscriber - one RMS computation per block for the meter and monitoring"""
+        level = float(np.sqrt(np.mean(np.square(block, dtype=np.float32))))
+        if block.dtype == np.int16:
+            level /= INT16_SCALE
+        self.current_level = level
+        if self.is_monitoring and self.level_callback:
+            self.level_callback(level)
+
+    def _sync_level_subscription(self):
+        """Keep the level meter subscribed while the stream is in use"""
+        wanted = self._recorder_sub is not None or self.is_monitoring
+        if wanted and self._level_sub is None:
+            self._level_sub = self.engine.subscribe(self._on_level_block, "level")
+        elif not wanted and self._level_sub is not None:
+            level_sub, self._level_sub = self._level_sub, None
+            self.engine.unsubscribe(level_sub)
+            self.current_level = 0.0
 
-                        # Only store audio data if not paused
-                        if not self.is_paused:
-                            self.audio_data.append(audio_chunk.copy())
-            
-            # Determine device to use for recording
-            device_to_use = self.preferred_device_id if self.preferred_device_id is not None else None
-            
-            # Start audio stream with callback - explicitly specify device
-            with sd.InputStream(
-                device=device_to_use,
-                samplerate=self.sample_rate,
-                channels=self.channels,
-                dtype=self.dtype,
-                blocksize=self.chunk_size,
-                callback=audio_callback
-            ):
-                # Keep recording while is_recording is True
-                while self.is_recording:
-                    time.sleep(0.1)
-                    
-        except Exception as e:
-            print(f"Error in recording thread: {e}")
-        finally:
-            print("Recording thread finished")
-    
     def start_monitoring(self, level_callback: Optional[Callable[[float], None]] = None):
         """Start monitoring audio levels without recording"""
-        if self.is_monitoring:
-            return
+        with self._stream_lock:
+            if self.is_monitoring:
+                return
             
-        if not self.is_available():
-            print("Audio capture not available for monitoring")
-            return
+            if not self.is_available():
+                print("Audio capture not available for monitoring")
+                return
+            self._refresh_device_format()
             
-        self.level_callback = level_callback
-        self.is_monitoring = True
+            self.level_callback = level_callback
+            self.is_monitoring = True
         
-        try:
-            # Start monitoring thread
-            self.monitor_thread = threading.Thread(target=self._monitor_audio, daemon=True)
-            self.monitor_thread.start()
-            
-        except Exception as e:
-            print(f"Failed to start audio monitoring: {e}")
-            self.is_monitoring = False
+            try:
+                self._sync_level_subscription()
+            except Exception as e:
+                print(f"Failed to start audio monitoring: {e}")
+                self.is_monitoring = False
     
     def stop_monitoring(self):
         """Stop monitoring audio levels"""
-        self.is_monitoring = False
-        
-        if self.monitor_thread and self.monitor_thread.is_alive():
-            self.monitor_thread.join(timeout=1.0)
-    
-    def _monitor_audio(self):
-        """Internal method to monitor audio levels"""
-        try:
-            # Callback function for monitoring
-            def monitor_callback(indata, frames, time_info, status):
-                if status:
-                    print(f"Monitor callback status: {status}")
-                
-                if self.is_monitoring and not self.is_recording:
-                    # Calculate RMS level
-                    audio_chunk = indata[:, 0]  # Get mono channel
-                    level = np.sqrt(np.mean(audio_chunk**2))
-                    self.current_level = level
-                    
-                    # Call callback if provided
-                    if self.level_callback:
-                        self.level_callback(level)
-            
-            # Start monitoring stream
-            with sd.InputStream(
-                samplerate=self.sample_rate,
-                channels=self.channels,
-                dtype=self.dtype,
-                blocksize=self.chunk_size,
-                callback=monitor_callback
-            ):
-                # Keep monitoring while is_monitoring is True and not recording
-                while self.is_monitoring:
-                    if self.is_recording:
-                        # If recording, just use the current level from recording
-                        if self.level_callback:
-                            self.level_callback(self.current_level)
-                    
-                    time.sleep(0.05)  # ~20Hz update rate
-                
-        except Exception as e:
-            print(f"Error in monitoring thread: {e}")
-        finally:
-            print("Audio monitoring thread finished")
+        with self._stream_lock:
+            self.is_monitoring = False
+            self._sync_level_subscription()
     
+    def get_capture_metrics(self):
+        """Overflow, drop and callback timing counters for the shared input stream"""
+        return self.engine.get_metrics()
+
     def get_audio_level(self) -> float:
         """Get the current audio level (0.0 to 1.0)"""
         return min(1.0, self.current_level * 10)  # Scale for better visualization
     
-    def _cleanup_stream(self):
-        """Clean up the audio stream"""
-        try:
-            if self.stream:
-                self.stream.stop_stream()
-                self.stream.close()
-                self.stream = None
-        except Exception as e:
-            print(f"Error cleaning up audio stream: {e}")
-    
     def list_devices(self):
         """List available audio input devices"""
         if not self.is_available():
@@ -476,8 +674,7 @@ class AudioCapture:
             
         print("Available audio input devices:")
         try:
-            devices = sd.query_devices()
-            for i, device in enumerate(devices):
+            for i, device in enumerate(self.devices.devices() or []):
                 if device['max_input_channels'] > 0:  # Input device
                     print(f"  Device {i}: {device['name']} "
                           f"(Channels: {device['max_input_channels']}, "
@@ -488,11 +685,8 @@ class AudioCapture:
     def save_audio_to_wav(self, audio_data: np.ndarray, filename: str):
         """Save audio data to a WAV file"""
         try:
-            # Convert float32 to int16 for WAV format
-            if audio_data.dtype == np.float32:
-                audio_int16 = (audio_data * 32767).astype(np.int16)
-            else:
-                audio_int16 = audio_data.astype(np.int16)
+            # Convert float32 to int16 for WAV format, clipping out-of-range samples
+            audio_int16 = to_int16(audio_data)
             
             with wave.open(filename, 'wb') as wav_file:
                 wav_file.setnchannels(self.channels)
@@ -508,9 +702,13 @@ class AudioCapture:
     def __del__(self):
         """Cleanup when object is destroyed"""
         try:
+            if self.always_on:
+                self.stop_always_on()
             if self.is_recording:
                 self.stop_recording()
             if self.is_monitoring:
                 self.stop_monitoring()
+            self.devices.remove_listener(self._on_devices_changed)
+            self.engine.close()
         except:
             pass  # Ignore errors during cleanup
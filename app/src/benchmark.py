@@ -9,6 +9,8 @@ import random
 import tempfile
 import wave
 import os
+import threading
+import tracemalloc
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass, asdict
@@ -18,11 +20,15 @@ import numpy as np
 try:
     from .whisper_manager import WhisperManager
     from .config_manager import ConfigManager
-    from .audio_capture import AudioCapture
+    from .audio_capture import AudioCapture, CAPTURE_PROFILES
+    from .audio_buffer import GrowableAudioBuffer, to_int16, to_float32, count_clipped
+    from .resampler import PolyphaseResampler
 except ImportError:
     from whisper_manager import WhisperManager
     from config_manager import ConfigManager
-    from audio_capture import AudioCapture
+    from audio_capture import AudioCapture, CAPTURE_PROFILES
+    from audio_buffer import GrowableAudioBuffer, to_int16, to_float32, count_clipped
+    from resampler import PolyphaseResampler
 
 
 # Text samples for benchmark reading - approximately 20-30 seconds each when read aloud
@@ -344,11 +350,8 @@ class WhisperBenchmark:
 
     def save_audio_to_file(self, audio_data: np.ndarray, filepath: Path, sample_rate: int = 16000):
         """Save audio data to a WAV file"""
-        # Convert float32 to int16
-        if audio_data.dtype == np.float32:
-            audio_int16 = (audio_data * 32767).astype(np.int16)
-        else:
-            audio_int16 = audio_data.astype(np.int16)
+        # Convert float32 to int16, clipping out-of-range samples
+        audio_int16 = to_int16(audio_data)
 
         with wave.open(str(filepath), 'wb') as wav_file:
             wav_file.setnchannels(1)
@@ -769,6 +772,459 @@ class WhisperBenchmark:
 
         return summaries
 
+    def benchmark_audio_ctx(
+        self,
+        audio_dir: Path,
+        models: Optional[List[str]] = None,
+        reference_texts: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Compare the full 30 s encoder window with adaptive audio-ctx sizing.
+
+        Every saved sample is transcribed twice per model, once with adaptive_audio_ctx
+        disabled and once enabled, and the mean latency and WER of both runs are reported.
+
+        Returns:
+            Dictionary mapping model name to mean times and WERs for both modes
+        """
+        if models is None:
+            models = self.get_available_models()
+
+        if reference_texts is None:
+            reference_texts = {s['id']: s['text'] for s in BENCHMARK_SAMPLES}
+
+        samples = []
+        for audio_path in sorted(audio_dir.glob("*.wav")):
+            if audio_path.stem not in reference_texts:
+                continue
+            audio_data, duration = self.load_audio_from_file(audio_path)
+            if audio_data is not None:
+                samples.append((audio_path.stem, audio_data, duration))
+
+        if not samples:
+            print(f"ERROR: No WAV files with reference text found in {audio_dir}")
+            return {}
+
+        original = self.config.get_setting('adaptive_audio_ctx', True)
+        results: Dict[str, Dict[str, float]] = {}
+
+        try:
+            for model in models:
+                if not self.whisper.set_model(model):
+                    print(f"ERROR: Failed to switch to model: {model}")
+                    continue
+
+                print(f"\nTesting model: {model}")
+                stats = {'full': ([], []), 'adaptive': ([], [])}
+                for sample_id, audio_data, duration in samples:
+                    for mode in ('full', 'adaptive'):
+                        self.config.set_setting('adaptive_audio_ctx', mode == 'adaptive')
+                        start_time = time.perf_counter()
+                        text = self.whisper.transcribe_audio(audio_data)
+                        elapsed = time.perf_counter() - start_time
+                        wer = calculate_wer(reference_texts[sample_id], text)
+                        stats[mode][0].append(elapsed)
+                        stats[mode][1].append(wer)
+
+                    ctx = self.whisper.get_audio_ctx(len(audio_data)) or 1500
+                    print(f"  - {sample_id} ({duration:.1f}s, ctx {ctx}): "
+                          f"full {stats['full'][0][-1]:.2f}s / {stats['full'][1][-1]:.2%}, "
+                          f"adaptive {stats['adaptive'][0][-1]:.2f}s / {stats['adaptive'][1][-1]:.2%}")
+
+                results[model] = {
+                    'full_time': float(np.mean(stats['full'][0])),
+                    'full_wer': float(np.mean(stats['full'][1])),
+                    'adaptive_time': float(np.mean(stats['adaptive'][0])),
+                    'adaptive_wer': float(np.mean(stats['adaptive'][1])),
+                }
+        finally:
+            self.config.set_setting('adaptive_audio_ctx', original)
+
+        print("\n" + "=" * 80)
+        print("ADAPTIVE AUDIO-CTX RESULTS")
+        print("=" * 80)
+        print(f"{'Model':<30} {'Full':>9} {'Adaptive':>9} {'Speedup':>8} {'WER full':>9} {'WER adapt':>10}")
+        print("-" * 80)
+        for model, r in results.items():
+            speedup = r['full_time'] / r['adaptive_time'] if r['adaptive_time'] > 0 else 0.0
+            print(f"{model:<30} {r['full_time']:>8.2f}s {r['adaptive_time']:>8.2f}s {speedup:>7.2f}x "
+                  f"{r['full_wer']:>9.2%} {r['adaptive_wer']:>10.2%}")
+        print("=" * 80)
+
+        return results
+
+    def benchmark_audio_transport(
+        self,
+        durations: Tuple[float, ...] = (5.0, 15.0, 30.0),
+        iterations: int = 20,
+        audio_file: Optional[Path] = None
+    ) -> Dict[str, Dict[float, float]]:
+        """
+        Measure the per-utterance I/O cost of each whisper-cli audio transport.
+
+        The handoff is replayed without running inference: 'file' writes the temp WAV,
+        reads it back the way whisper-cli does and round-trips the .txt result, while
+        'pipe' and 'memfd' encode the WAV in memory and pass it through a pipe or memfd.
+        If audio_file is given, full transcriptions are also timed with each transport.
+
+        Returns:
+            Dictionary mapping transport name to {duration: mean milliseconds}
+        """
+        transports = ['file', 'pipe']
+        if hasattr(os, 'memfd_create'):
+            transports.append('memfd')
+
+        temp_dir = self.config.get_temp_directory()
+        results: Dict[str, Dict[float, float]] = {t: {} for t in transports}
+
+        print(f"\nAudio transport I/O ({iterations} iterations, temp dir: {temp_dir})")
+        print(f"{'Audio':>8}" + "".join(f"{t:>12}" for t in transports))
+
+        for duration in durations:
+            audio = (np.random.randn(int(16000 * duration)) * 0.1).astype(np.float32)
+            row = f"{duration:>7.0f}s"
+            for transport in transports:
+                timings = []
+                for _ in range(iterations):
+                    start = time.perf_counter()
+                    self._replay_transport(transport, audio, temp_dir)
+                    timings.append(time.perf_counter() - start)
+                mean_ms = float(np.mean(timings)) * 1000
+                results[transport][duration] = mean_ms
+                row += f"{mean_ms:>10.2f}ms"
+            print(row)
+
+        for duration in durations:
+            saved = results['file'][duration] - results['pipe'][duration]
+            print(f"  {duration:.0f}s utterance: pipe saves {saved:.2f}ms of I/O vs temp files")
+
+        if audio_file is not None:
+            audio_data, audio_duration = self.load_audio_from_file(audio_file)
+            if audio_data is not None:
+                print(f"\nEnd-to-end transcription of {audio_file.name} ({audio_duration:.1f}s)")
+                original = self.config.get_setting('audio_transport', 'pipe')
+                try:
+                    for transport in transports:
+                        self.config.set_setting('audio_transport', transport)
+                        start = time.perf_counter()
+                        self.whisper.transcribe_audio(audio_data)
+                        elapsed = time.perf_counter() - start
+                        print(f"  {transport:>6}: {elapsed:.3f}s")
+                finally:
+                    self.config.set_setting('audio_transport', original)
+
+        return results
+
+    def _replay_transport(self, transport: str, audio: np.ndarray, temp_dir: Path):
+        """Perform the I/O a whisper-cli handoff needs, without running whisper"""
+        if transport == 'file':
+            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False, dir=temp_dir) as temp_file:
+                wav_path = temp_file.name
+            try:
+                self.whisper._save_audio_as_wav(audio, wav_path, 16000)
+                with open(wav_path, 'rb') as f:
+                    f.read()
+                with open(wav_path + '.txt', 'w') as f:
+                    f.write("transcription")
+                with open(wav_path + '.txt', 'r') as f:
+                    f.read()
+            finally:
+                os.unlink(wav_path + '.txt')
+                os.unlink(wav_path)
+            return
+
+        wav_bytes = self.whisper._encode_wav(audio, 16000)
+        if transport == 'pipe':
+            read_fd, write_fd = os.pipe()
+            chunks = []
+            reader = threading.Thread(
+                target=lambda: chunks.extend(iter(lambda: os.read(read_fd, 65536), b'')),
+                daemon=True
+            )
+            reader.start()
+            with os.fdopen(write_fd, 'wb') as writer:
+                writer.write(wav_bytes)
+            reader.join()
+            os.close(read_fd)
+        else:
+            fd = self.whisper._write_memfd(wav_bytes)
+            try:
+                with open(f'/dev/fd/{fd}', 'rb') as f:
+                    f.read()
+            finally:
+                os.close(fd)
+
+
+    def benchmark_capture(self, minutes: float = 10.0, iterations: int = 3,
+                          chunk_size: int = 1024, sample_rate: int = 16000) -> Dict[str, Dict[str, float]]:
+        """
+        Compare recording storage strategies for a long dictation.
+
+        Replays the audio callback for a recording of the given length, storing chunks the
+        old way (a list of copied chunks, concatenated on stop) and into a GrowableAudioBuffer
+        (slice assignment, zero-copy view on stop). Peak memory is measured with tracemalloc.
+
+        Returns:
+            Dictionary mapping strategy to {'peak_mb', 'final_mb', 'stop_ms', 'record_ms'}
+        """
+        total_samples = int(minutes * 60 * sample_rate)
+        num_chunks = total_samples // chunk_size
+        indata = (np.random.randn(chunk_size, 1) * 0.1).astype(np.float32)
+        audio_mb = num_chunks * chunk_size * 4 / (1024 * 1024)
+
+        def record_list():
+            chunks = []
+            for _ in range(num_chunks):
+                chunks.append(indata[:, 0].copy())
+            return chunks
+
+        def stop_list(chunks):
+            return np.concatenate(chunks, axis=0)
+
+        def record_buffer():
+            buffer = GrowableAudioBuffer(sample_rate, 60.0, np.float32)
+            for _ in range(num_chunks):
+                buffer.append(indata[:, 0])
+            return buffer
+
+        def stop_buffer(buffer):
+            return buffer.view()
+
+        strategies = {
+            'list+concat': (record_list, stop_list),
+            'buffer': (record_buffer, stop_buffer),
+        }
+
+        print(f"\nCapture storage for a {minutes:.0f} minute recording "
+              f"({num_chunks} chunks, {audio_mb:.1f} MB of samples, {iterations} iterations)")
+        print(f"{'Strategy':<14}{'Peak MB':>10}{'Held MB':>10}{'Record ms':>12}{'Stop ms':>10}")
+
+        results: Dict[str, Dict[str, float]] = {}
+        for name, (record, stop) in strategies.items():
+            peaks, finals, record_times, stop_times = [], [], [], []
+            for _ in range(iterations):
+                tracemalloc.start()
+                start = time.perf_counter()
+                stored = record()
+                recorded = time.perf_counter()
+                audio = stop(stored)
+                stopped = time.perf_counter()
+                del stored
+                final, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                assert len(audio) == num_chunks * chunk_size
+                del audio
+
+                peaks.append(peak / (1024 * 1024))
+                finals.append(final / (1024 * 1024))
+                record_times.append((recorded - start) * 1000)
+                stop_times.append((stopped - recorded) * 1000)
+
+            results[name] = {
+                'peak_mb': float(np.mean(peaks)),
+                'final_mb': float(np.mean(finals)),
+                'record_ms': float(np.mean(record_times)),
+                'stop_ms': float(np.mean(stop_times)),
+            }
+            r = results[name]
+            print(f"{name:<14}{r['peak_mb']:>10.1f}{r['final_mb']:>10.1f}{r['record_ms']:>12.1f}{r['stop_ms']:>10.2f}")
+
+        old, new = results['list+concat'], results['buffer']
+        print(f"  Peak memory: {old['peak_mb'] - new['peak_mb']:+.1f} MB saved, "
+              f"stop latency: {old['stop_ms'] - new['stop_ms']:.2f} ms saved")
+
+        return results
+
+    def benchmark_sample_formats(self, minutes: float = 10.0, iterations: int = 5,
+                                 clip_fraction: float = 0.001, sample_rate: int = 16000) -> Dict[str, Dict[str, float]]:
+        """
+        Compare float32 and int16 capture for a long recording.
+
+        Measures the memory held by the recording buffer, the CPU time of the conversion
+        each format needs before whisper can use the audio (float32 -> int16 WAV samples,
+        int16 -> float32 for the library backend), and counts clipped samples. A small
+        fraction of the synthetic samples is pushed past full scale to show clipping.
+
+        Returns:
+            Dictionary mapping format to {'buffer_mb', 'wav_ms', 'float_ms', 'clipped'}
+        """
+        total = int(minutes * 60 * sample_rate)
+        audio = (np.random.randn(total) * 0.1).astype(np.float32)
+        peaks = np.random.choice(total, int(total * clip_fraction), replace=False)
+        audio[peaks] = np.sign(audio[peaks]) * 1.5
+
+        def timed(func, data):
+            times = []
+            for _ in range(iterations):
+                start = time.process_time()
+                func(data)
+                times.append((time.process_time() - start) * 1000)
+            return float(np.median(times))
+
+        def buffered(samples):
+            buffer = GrowableAudioBuffer(sample_rate, 60.0, samples.dtype)
+            for offset in range(0, len(samples), 1024):
+                buffer.append(samples[offset:offset + 1024])
+            return buffer
+
+        captured_int16 = to_int16(audio)  # what PortAudio would deliver in int16 mode
+        legacy = (audio * 32767).astype(np.int16)
+        wrapped = int(np.count_nonzero(np.sign(legacy[peaks]) != np.sign(audio[peaks])))
+
+        results = {
+            'float32': {
+                'buffer_mb': buffered(audio).nbytes / (1024 * 1024),
+                'wav_ms': timed(to_int16, audio),
+                'float_ms': 0.0,
+                'clipped': count_clipped(audio),
+            },
+            'int16': {
+                'buffer_mb': buffered(captured_int16).nbytes / (1024 * 1024),
+                'wav_ms': timed(to_int16, captured_int16),
+                'float_ms': timed(to_float32, captured_int16),
+                'clipped': count_clipped(captured_int16),
+            },
+        }
+
+        print(f"\nSample formats for a {minutes:.0f} minute recording ({clip_fraction:.1%} of samples past full scale)")
+        print(f"{'Format':<10}{'Buffer MB':>11}{'to WAV ms':>11}{'to float ms':>13}{'Clipped':>10}")
+        for name, r in results.items():
+            print(f"{name:<10}{r['buffer_mb']:>11.1f}{r['wav_ms']:>11.1f}{r['float_ms']:>13.1f}{r['clipped']:>10}")
+        print(f"  Old float32 -> int16 cast: {timed(lambda a: (a * 32767).astype(np.int16), audio):.1f} ms, "
+              f"{wrapped} of {len(peaks)} out-of-range samples wrapped to the opposite sign")
+
+        return results
+
+    def benchmark_resampling(self, rates: Tuple[int, ...] = (22050, 44100, 48000, 96000),
+                             seconds: float = 60.0, channels: int = 2) -> Dict[int, float]:
+        """
+        Measure the CPU cost of native-rate capture: downmix plus streaming resample to 16 kHz.
+
+        Audio is fed in 64 ms blocks the way the capture engine's dispatch thread sees it,
+        and CPU time is measured with time.process_time. The streamed output is also
+        compared against scipy's one-shot resample_poly.
+
+        Returns:
+            Dictionary mapping device rate to CPU milliseconds per second of audio
+        """
+        from scipy.signal import resample_poly
+
+        results: Dict[int, float] = {}
+        print(f"\nNative-rate resampling to 16000Hz ({seconds:.0f}s of {channels}-channel audio per rate)")
+        print(f"{'Rate':>8}{'Taps':>8}{'CPU ms/s':>12}{'x realtime':>14}{'max error':>12}")
+
+        for rate in rates:
+            blocksize = int(round(1024 * rate / 16000))
+            audio = (np.random.randn(int(rate * seconds), channels) * 0.1).astype(np.float32)
+            resampler = PolyphaseResampler(rate, 16000)
+
+            outputs = []
+            start = time.process_time()
+            for offset in range(0, len(audio), blocksize):
+                block = audio[offset:offset + blocksize]
+                mono = block[:, 0].copy() if channels == 1 else block.mean(axis=1, dtype=np.float32)
+                outputs.append(resampler.process(mono))
+            cpu_seconds = time.process_time() - start
+
+            streamed = np.concatenate(outputs)
+            reference = resample_poly(audio.mean(axis=1), resampler.up, resampler.down).astype(np.float32)
+            compared = min(len(streamed), len(reference))
+            error = float(np.max(np.abs(streamed[:compared] - reference[:compared]))) if compared else 0.0
+
+            ms_per_second = cpu_seconds * 1000 / seconds
+            results[rate] = ms_per_second
+            speed = seconds / cpu_seconds if cpu_seconds > 0 else float('inf')
+            print(f"{rate:>8}{len(resampler.taps):>8}{ms_per_second:>12.2f}{speed:>13.0f}x{error:>12.1e}")
+
+        return results
+
+    def benchmark_capture_profiles(self, seconds: float = 10.0) -> Dict[str, Dict[str, float]]:
+        """
+        Open the default input device with each capture profile and measure what it achieves.
+
+        The achieved latency is one block plus the input latency PortAudio reports for the
+        open stream - the delay before a sample can reach the level meter, VAD or streaming
+        transcription. Jitter is the standard deviation of the time between callbacks.
+
+        Returns:
+            Dictionary mapping profile name to its measurements
+        """
+        results: Dict[str, Dict[str, float]] = {}
+        print(f"\nCapture profiles on the default input device ({seconds:.0f}s each)")
+        print(f"{'Profile':<14}{'Block ms':>10}{'Stream ms':>11}{'Achieved ms':>13}"
+              f"{'Jitter ms':>11}{'Max gap ms':>12}{'Callbacks/s':>13}{'Overflows':>11}")
+
+        for name in CAPTURE_PROFILES:
+            capture = AudioCapture(capture_profile=name)
+            if not capture.is_available():
+                print("ERROR: No audio input device available")
+                return results
+
+            capture.start_monitoring()
+            if not capture.engine.is_running:
+                print(f"{name:<14}could not open the input device")
+                continue
+            time.sleep(seconds)
+            metrics = capture.get_capture_metrics()
+            capture.stop_monitoring()
+            capture.engine.close()
+
+            results[name] = {
+                'block_ms': metrics.block_ms,
+                'stream_latency_ms': metrics.stream_latency_ms,
+                'achieved_latency_ms': metrics.block_ms + metrics.stream_latency_ms,
+                'jitter_ms': metrics.interval_jitter_ms,
+                'max_interval_ms': metrics.interval_max_ms,
+                'callbacks_per_second': metrics.callbacks / seconds,
+                'overflows': metrics.input_overflows,
+            }
+            r = results[name]
+            print(f"{name:<14}{r['block_ms']:>10.1f}{r['stream_latency_ms']:>11.1f}{r['achieved_latency_ms']:>13.1f}"
+                  f"{r['jitter_ms']:>11.2f}{r['max_interval_ms']:>12.1f}{r['callbacks_per_second']:>13.1f}"
+                  f"{r['overflows']:>11}")
+
+        return results
+
+    def benchmark_stop_latency(self, iterations: int = 20, record_seconds: float = 1.0) -> Dict[str, List[float]]:
+        """
+        Measure how long stopping a recording takes, with and without the always-on stream.
+
+        Records from the default input device. Each stop is timed from the call to
+        AudioCapture.stop_recording() until the recorded audio is handed back, which
+        includes closing the stream (on-demand mode) or flushing the capture queues.
+
+        Returns:
+            Dictionary mapping mode name to stop latencies in milliseconds
+        """
+        results: Dict[str, List[float]] = {}
+        print(f"\nStop-to-handoff latency ({iterations} recordings of {record_seconds:.1f}s per mode)")
+        print(f"{'Mode':<12}{'median ms':>12}{'p95 ms':>10}{'max ms':>10}")
+
+        for mode in ('on-demand', 'always-on'):
+            capture = AudioCapture(preroll_ms=300 if mode == 'always-on' else 0)
+            if not capture.is_available():
+                print("ERROR: No audio input device available")
+                return results
+            if mode == 'always-on' and not capture.start_always_on():
+                continue
+
+            latencies = []
+            for _ in range(iterations):
+                if not capture.start_recording():
+                    break
+                time.sleep(record_seconds)
+                capture.stop_recording()
+                latencies.append(capture.last_stop_latency * 1000)
+            capture.stop_always_on()
+            capture.engine.close()
+
+            if latencies:
+                results[mode] = latencies
+                print(f"{mode:<12}{np.median(latencies):>12.1f}{np.percentile(latencies, 95):>10.1f}"
+                      f"{max(latencies):>10.1f}")
+
+        return results
+
 
 def main():
     """CLI entry point for benchmark utility"""
@@ -818,6 +1274,84 @@ def main():
     # Show samples
     samples_parser = subparsers.add_parser('samples', help='Show benchmark text samples')
 
+    # Adaptive encoder context
+    ctx_parser = subparsers.add_parser('audio-ctx', help='Compare full and adaptive encoder context on saved audio')
+    ctx_parser.add_argument(
+        'audio_dir',
+        type=Path,
+        help='Directory containing WAV files from a previous session'
+    )
+    ctx_parser.add_argument(
+        '--models', '-m',
+        nargs='+',
+        help='Specific models to test (default: all available)'
+    )
+
+    # Audio handoff I/O
+    io_parser = subparsers.add_parser('io', help='Measure per-utterance I/O of each audio transport')
+    io_parser.add_argument(
+        '--iterations', '-i',
+        type=int,
+        default=20,
+        help='Iterations per transport and duration (default: 20)'
+    )
+    io_parser.add_argument(
+        '--audio',
+        type=Path,
+        help='WAV file to also transcribe end-to-end with each transport'
+    )
+
+    # Recording storage
+    capture_parser = subparsers.add_parser('capture', help='Measure memory and stop latency of recording storage')
+    capture_parser.add_argument(
+        '--minutes',
+        type=float,
+        default=10.0,
+        help='Simulated recording length in minutes (default: 10)'
+    )
+    capture_parser.add_argument(
+        '--iterations', '-i',
+        type=int,
+        default=3,
+        help='Iterations per strategy (default: 3)'
+    )
+
+    # Native-rate resampling cost
+    resample_parser = subparsers.add_parser('resample', help='Measure CPU cost of resampling native-rate capture')
+    resample_parser.add_argument(
+        '--seconds',
+        type=float,
+        default=60.0,
+        help='Seconds of audio per device rate (default: 60)'
+    )
+
+    # float32 vs int16 capture
+    formats_parser = subparsers.add_parser('formats', help='Compare memory and conversion cost of float32 and int16 capture')
+    formats_parser.add_argument(
+        '--minutes',
+        type=float,
+        default=10.0,
+        help='Simulated recording length in minutes (default: 10)'
+    )
+
+    # Capture profiles
+    profiles_parser = subparsers.add_parser('profiles', help='Measure achieved latency and jitter of each capture profile')
+    profiles_parser.add_argument(
+        '--seconds',
+        type=float,
+        default=10.0,
+        help='Seconds to capture per profile (default: 10)'
+    )
+
+    # Stop latency of the capture path
+    stop_parser = subparsers.add_parser('stop', help='Measure stop-to-handoff latency of recording')
+    stop_parser.add_argument(
+        '--iterations', '-i',
+        type=int,
+        default=20,
+        help='Recordings per mode (default: 20)'
+    )
+
     args = parser.parse_args()
 
     if args.command == 'list':
@@ -836,6 +1370,49 @@ def main():
             print(f"   {sample['text'][:80]}...")
         return
 
+    if args.command == 'audio-ctx':
+        benchmark = WhisperBenchmark()
+        if not benchmark.initialize():
+            print("ERROR: Failed to initialize benchmark")
+            return
+
+        benchmark.benchmark_audio_ctx(audio_dir=args.audio_dir, models=args.models)
+        return
+
+    if args.command == 'io':
+        benchmark = WhisperBenchmark()
+        if args.audio is not None and not benchmark.initialize():
+            print("ERROR: Failed to initialize benchmark")
+            return
+
+        benchmark.benchmark_audio_transport(iterations=args.iterations, audio_file=args.audio)
+        return
+
+    if args.command == 'capture':
+        benchmark = WhisperBenchmark()
+        benchmark.benchmark_capture(minutes=args.minutes, iterations=args.iterations)
+        return
+
+    if args.command == 'resample':
+        benchmark = WhisperBenchmark()
+        benchmark.benchmark_resampling(seconds=args.seconds)
+        return
+
+    if args.command == 'formats':
+        benchmark = WhisperBenchmark()
+        benchmark.benchmark_sample_formats(minutes=args.minutes)
+        return
+
+    if args.command == 'profiles':
+        benchmark = WhisperBenchmark()
+        benchmark.benchmark_capture_profiles(seconds=args.seconds)
+        return
+
+    if args.command == 'stop':
+        benchmark = WhisperBenchmark()
+        benchmark.benchmark_stop_latency(iterations=args.iterations)
+        return
+
     if args.command == 'run':
         benchmark = WhisperBenchmark()
         if not benchmark.initialize():
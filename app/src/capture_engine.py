@@ -0,0 +1,505 @@
+"""
+Capture engine for WhisperTux
+Owns the audio input stream and fans captured blocks out to subscribers
+"""
+
+import os
+import select
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+import sounddevice as sd
+
+try:
+    from .resampler import PolyphaseResampler
+    from .device_registry import get_device_registry
+    from .audio_buffer import saturate_int16
+except ImportError:
+    from resampler import PolyphaseResampler
+    from device_registry import get_device_registry
+    from audio_buffer import saturate_int16
+
+
+class _WakeableQueue:
+    """
+    Shared plumbing for the single-producer/single-consumer queues below.
+
+    The producer wakes the consumer by writing a byte to a non-blocking pipe, which
+    never takes a lock and never blocks. Other threads can wait for the consumer to
+    catch up through a condition that only the consumer side notifies.
+    """
+
+    def __init__(self):
+        self._wake_read, self._wake_write = os.pipe()
+        os.set_blocking(self._wake_read, False)
+        os.set_blocking(self._wake_write, False)
+        self._closed = False
+        self.popped = 0  # consumer-owned progress counter
+        self._progress = threading.Condition()
+
+    def close(self):
+        """Producer side - tell the consumer no more data will follow"""
+        self._closed = True
+        self._wake()
+
+    def _wake(self):
+        try:
+            os.write(self._wake_write, b'\0')
+        except (BlockingIOError, OSError):
+            pass  # Pipe full - the consumer is already due to wake up
+
+    def _wait_for_wake(self):
+        select.select([self._wake_read], [], [])
+        try:
+            while os.read(self._wake_read, 4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _mark_progress(self):
+        with self._progress:
+            self._progress.notify_all()
+
+    def wait_for(self, target: int, timeout: float = 1.0) -> bool:
+        """Wait until the consumer's progress counter reaches `target`"""
+        with self._progress:
+            return self._progress.wait_for(lambda: self.popped >= target, timeout)
+
+    def release(self):
+        for fd in (self._wake_read, self._wake_write):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class BlockQueue(_WakeableQueue):
+    """
+    Single-producer/single-consumer queue of audio blocks.
+
+    Appending to a deque is atomic, so the producer never takes a lock. If the consumer
+    falls behind by more than `capacity` blocks, new blocks are dropped and counted
+    instead of growing without bound.
+    """
+
+    def __init__(self, capacity: int = 256):
+        super().__init__()
+        self.capacity = capacity
+        self._blocks = deque()
+
+        # Each counter has a single writer
+        self.pushed = 0   # producer
+        self.dropped = 0  # producer
+
+    def push(self, block) -> bool:
+        """Producer side - never blocks"""
+        if len(self._blocks) >= self.capacity:
+            self.dropped += 1
+            return False
+        self._blocks.append(block)
+        self.pushed += 1
+        self._wake()
+        return True
+
+    def consume(self, handler: Callable[[np.ndarray], None]):
+        """Consumer side - pass blocks to handler until the queue is closed"""
+        while True:
+            self._wait_for_wake()
+
+            while self._blocks:
+                block = self._blocks.popleft()
+                try:
+                    handler(block)
+                except Exception as e:
+                    print(f"Error in audio block handler: {e}")
+                self.popped += 1
+            self._mark_progress()
+
+            if self._closed and not self._blocks:
+                return
+
+
+class SampleRing(_WakeableQueue):
+    """
+    Preallocated single-producer/single-consumer ring of audio frames.
+
+    Meant for the PortAudio callback: write() is a slice assignment into memory that
+    was allocated up front, two integer updates and a pipe write - no allocation, no
+    locks, no logging. Positions are running frame totals, so full and empty are never
+    ambiguous. If the consumer falls a whole ring behind, the frames that don't fit
+    are dropped and counted.
+    """
+
+    def __init__(self, frames: int, channels: int = 1, dtype=np.float32):
+        super().__init__()
+        self._data = np.zeros((max(1, frames), channels), dtype=dtype)
+        self.written = 0         # producer
+        self.dropped_frames = 0  # producer
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def write(self, frames: np.ndarray):
+        """Producer side - copy frames into the ring"""
+        capacity = len(self._data)
+        count = min(len(frames), capacity - (self.written - self.popped))
+        if count < len(frames):
+            self.dropped_frames += len(frames) - count
+        if count > 0:
+            start = self.written % capacity
+            first = min(count, capacity - start)
+            self._data[start:start + first] = frames[:first]
+            if count > first:
+                self._data[:count - first] = frames[first:count]
+            self.written += count
+        self._wake()
+
+    def consume(self, handler: Callable[[np.ndarray], None]):
+        """
+        Consumer side - pass every available span of frames to handler until closed
+
+        The handler gets a view into the ring that is only valid until it returns.
+        """
+        capacity = len(self._data)
+        while True:
+            self._wait_for_wake()
+
+            end = self.written
+            while self.popped < end:
+                start = self.popped % capacity
+                count = min(end - self.popped, capacity - start)
+                try:
+                    handler(self._data[start:start + count])
+                except Exception as e:
+                    print(f"Error in audio block handler: {e}")
+                self.popped += count
+            self._mark_progress()
+
+            if self._closed and self.popped >= self.written:
+                return
+
+
+@dataclass
+class CaptureMetrics:
+    """Health of the capture path, as counted by the engine"""
+    callbacks: int = 0
+    input_overflows: int = 0    # PortAudio lost input before our callback ran
+    input_underflows: int = 0
+    dropped_frames: int = 0     # callback ring full - dispatch thread fell behind
+    dropped_blocks: int = 0     # subscriber queues full - a consumer fell behind
+    callback_p50_us: float = 0.0
+    callback_p95_us: float = 0.0
+    callback_p99_us: float = 0.0
+    callback_max_us: float = 0.0
+    block_ms: float = 0.0           # nominal duration of one block
+    stream_latency_ms: float = 0.0  # input latency PortAudio reports for the open stream
+    interval_jitter_ms: float = 0.0  # standard deviation of the time between callbacks
+    interval_max_ms: float = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return not (self.input_overflows or self.dropped_frames or self.dropped_blocks)
+
+    def since(self, earlier: 'CaptureMetrics') -> 'CaptureMetrics':
+        """Counters accumulated after `earlier` was taken (percentiles are kept as they are)"""
+        return CaptureMetrics(
+            callbacks=self.callbacks - earlier.callbacks,
+            input_overflows=self.input_overflows - earlier.input_overflows,
+            input_underflows=self.input_underflows - earlier.input_underflows,
+            dropped_frames=self.dropped_frames - earlier.dropped_frames,
+            dropped_blocks=self.dropped_blocks - earlier.dropped_blocks,
+            callback_p50_us=self.callback_p50_us,
+            callback_p95_us=self.callback_p95_us,
+            callback_p99_us=self.callback_p99_us,
+            callback_max_us=self.callback_max_us,
+            block_ms=self.block_ms,
+            stream_latency_ms=self.stream_latency_ms,
+            interval_jitter_ms=self.interval_jitter_ms,
+            interval_max_ms=self.interval_max_ms,
+        )
+
+    def summary(self) -> str:
+        return (f"{self.callbacks} callbacks, {self.input_overflows} overflows, "
+                f"{self.input_underflows} underflows, {self.dropped_frames} dropped frames, "
+                f"{self.dropped_blocks} dropped blocks, callback p50/p95/p99/max "
+                f"{self.callback_p50_us:.0f}/{self.callback_p95_us:.0f}/"
+                f"{self.callback_p99_us:.0f}/{self.callback_max_us:.0f} us, "
+                f"{self.block_ms:.0f} ms blocks, {self.stream_latency_ms:.1f} ms stream latency, "
+                f"callback jitter {self.interval_jitter_ms:.2f} ms (max interval {self.interval_max_ms:.1f} ms)")
+
+
+class Subscription:
+    """A consumer of captured blocks, running on its own thread"""
+
+    def __init__(self, engine, handler: Callable[[np.ndarray], None], name: str, capacity: int):
+        self.engine = engine
+        self.handler = handler
+        self.name = name
+        self.queue = BlockQueue(capacity)
+        self.thread = threading.Thread(target=self._run, name=f"capture-{name}", daemon=True)
+
+    def _run(self):
+        self.queue.consume(self.handler)
+
+    @property
+    def dropped(self) -> int:
+        return self.queue.dropped
+
+
+class CaptureEngine:
+    """
+    Owns the input device and distributes its audio to any number of subscribers.
+
+    One PortAudio stream feeds everything - recorder, level meter, VAD, streaming
+    transcription. The stream callback is wait-free: it copies each block into a
+    preallocated SampleRing and updates a few counters, nothing else. A dispatch
+    thread downmixes (and, when the device runs at another rate, resamples) every block
+    once and pushes the result into one single-producer/single-consumer queue per
+    subscriber, so a slow consumer never stalls the device or the other consumers.
+
+    The stream is opened when the first subscriber arrives and closed when the last
+    one leaves.
+    """
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, dtype=np.float32,
+                 blocksize: int = 1024, device=None, latency='high'):
+        self.sample_rate = sample_rate  # rate delivered to subscribers
+        self.device_rate = sample_rate  # rate the device is opened at
+        self.channels = channels
+        self.dtype = dtype
+        self.blocksize = blocksize
+        self.device = device
+        # PortAudio latency hint: 'low', 'high' or seconds
+        self.latency = latency
+
+        # Shared by all subscribers; created on open when device_rate differs from sample_rate.
+        # device_rate, channels and blocksize may be changed while closed and apply at the next open.
+        self.resampler = None
+
+        # Seconds of device audio the callback ring can hold before frames are dropped
+        self.ring_seconds = 2.0
+
+        self.stream = None
+        self._input = None
+        self._dispatch_thread = None
+
+        # Written only by the audio callback
+        self._callbacks = 0
+        self._overflows = 0
+        self._underflows = 0
+        self._durations = np.zeros(2048, dtype=np.float64)  # recent callback durations (s)
+        self._intervals = np.zeros(2048, dtype=np.float64)  # recent times between callbacks (s)
+        self._intervals_seen = 0
+        self.stream_latency = 0.0  # seconds, as reported by PortAudio once the stream is open
+        # Totals from streams that have already been closed
+        self._closed_dropped_frames = 0
+        self._closed_dropped_blocks = 0
+        self._subscriptions = []  # replaced, never mutated, so the dispatcher can iterate safely
+        self._lock = threading.Lock()  # guards open/close and subscription changes, never the callback
+
+    @property
+    def is_running(self) -> bool:
+        return self.stream is not None
+
+    @property
+    def is_active(self) -> bool:
+        """True while the stream is open and still delivering audio"""
+        try:
+            return self.stream is not None and bool(self.stream.active)
+        except Exception:
+            return False
+
+    def subscribe(self, handler: Callable[[np.ndarray], None], name: str = "subscriber",
+                  capacity: int = 256) -> Subscription:
+        """
+        Receive every captured block (mono, at sample_rate) on a dedicated thread.
+
+        Opens the input stream if it isn't running yet. Raises if the device can't be opened.
+        """
+        subscription = Subscription(self, handler, name, capacity)
+        subscription.thread.start()
+        with self._lock:
+            self._subscriptions = self._subscriptions + [subscription]
+            if self.stream is None:
+                try:
+                    self._open()
+                except Exception:
+                    self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+                    self._finish(subscription)
+                    raise
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Stop delivering to a subscriber once it has handled everything already captured"""
+        with self._lock:
+            if subscription not in self._subscriptions:
+                return
+            remaining = [s for s in self._subscriptions if s is not subscription]
+            if not remaining:
+                # Last subscriber - close the stream first so its final blocks are delivered
+                self._close()
+            else:
+                self.flush()
+            self._subscriptions = remaining
+        self._finish(subscription)
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Wait until every block captured so far has reached every subscriber"""
+        if self._input is None:
+            return True
+        if not self._input.wait_for(self._input.written, timeout):
+            return False
+        return all(s.queue.wait_for(s.queue.pushed, timeout) for s in self._subscriptions)
+
+    def get_metrics(self) -> CaptureMetrics:
+        """Counters since the engine was created, percentiles over the most recent callbacks"""
+        callbacks = self._callbacks
+        recent = self._durations[:min(callbacks, len(self._durations))] * 1e6
+        p50, p95, p99 = np.percentile(recent, [50, 95, 99]) if len(recent) else (0.0, 0.0, 0.0)
+        intervals = self._intervals[:min(self._intervals_seen, len(self._intervals))] * 1000
+        dropped_frames = self._closed_dropped_frames + (self._input.dropped_frames if self._input else 0)
+        dropped_blocks = self._closed_dropped_blocks + sum(s.dropped for s in self._subscriptions)
+        return CaptureMetrics(
+            callbacks=callbacks,
+            input_overflows=self._overflows,
+            input_underflows=self._underflows,
+            dropped_frames=dropped_frames,
+            dropped_blocks=dropped_blocks,
+            callback_p50_us=float(p50),
+            callback_p95_us=float(p95),
+            callback_p99_us=float(p99),
+            callback_max_us=float(recent.max()) if len(recent) else 0.0,
+            block_ms=self.blocksize * 1000.0 / self.device_rate,
+            stream_latency_ms=self.stream_latency * 1000,
+            interval_jitter_ms=float(intervals.std()) if len(intervals) else 0.0,
+            interval_max_ms=float(intervals.max()) if len(intervals) else 0.0,
+        )
+
+    def _finish(self, subscription: Subscription):
+        self._closed_dropped_blocks += subscription.dropped
+        subscription.queue.close()
+        if subscription.thread is not threading.current_thread():
+            subscription.thread.join(timeout=2.0)
+        subscription.queue.release()
+
+    def _open(self):
+        """Open and start the input stream. Lock held."""
+        self.resampler = None
+        if self.device_rate != self.sample_rate:
+            self.resampler = PolyphaseResampler(self.device_rate, self.sample_rate)
+
+        ring = SampleRing(int(self.device_rate * self.ring_seconds), self.channels, self.dtype)
+        self._input = ring
+        self._dispatch_thread = threading.Thread(target=self._dispatch_loop, args=(ring,),
+                                                 name="capture-dispatch", daemon=True)
+        self._dispatch_thread.start()
+
+        durations = self._durations
+        intervals = self._intervals
+        history = len(durations)
+        clock = time.perf_counter
+        previous = np.zeros(1, dtype=np.float64)  # start time of the previous callback
+        self._intervals_seen = 0
+
+        def audio_callback(indata, frames, time_info, status):
+            # Real-time thread: no locks, no allocation, no printing
+            started = clock()
+            if previous[0]:
+                intervals[self._intervals_seen % history] = started - previous[0]
+                self._intervals_seen += 1
+            previous[0] = started
+            if status:
+                if status.input_overflow:
+                    self._overflows += 1
+                if status.input_underflow:
+                    self._underflows += 1
+            ring.write(indata)
+            durations[self._callbacks % history] = clock() - started
+            self._callbacks += 1
+
+        # Holds off PortAudio re-initialization after a hotplug until the stream is closed
+        get_device_registry().stream_opened()
+        try:
+            self.stream = sd.InputStream(
+                device=self.device,
+                samplerate=self.device_rate,
+                channels=self.channels,
+                dtype=self.dtype,
+                blocksize=self.blocksize,
+                latency=self.latency,
+                callback=audio_callback
+            )
+            self.stream.start()
+            self.stream_latency = float(getattr(self.stream, 'latency', 0.0) or 0.0)
+        except Exception:
+            self.stream = None
+            get_device_registry().stream_closed()
+            self._stop_dispatch()
+            raise
+        print(f"Capture engine started at {self.device_rate}Hz ({self.channels} channel(s), "
+              f"{self.blocksize}-frame blocks, {self.stream_latency * 1000:.1f} ms input latency)")
+
+    def _close(self):
+        """Stop the stream and deliver everything it captured. Lock held."""
+        if self.stream is None:
+            return
+        try:
+            self.stream.stop()
+            self.stream.close()
+        except Exception as e:
+            print(f"Error closing audio stream: {e}")
+        self.stream = None
+        get_device_registry().stream_closed()
+        self.flush()
+        self._stop_dispatch()
+
+    def _stop_dispatch(self):
+        if self._input is None:
+            return
+        self._input.close()
+        if self._dispatch_thread is not None:
+            self._dispatch_thread.join(timeout=2.0)
+        self._closed_dropped_frames += self._input.dropped_frames
+        self._input.release()
+        self._input = None
+        self._dispatch_thread = None
+
+    def _dispatch_loop(self, ring: SampleRing):
+        """Dispatch thread - drain the callback ring and report problems the callback only counted"""
+        reported = [self._overflows, 0]
+
+        def dispatch(frames: np.ndarray):
+            self._dispatch(frames)
+            if self._overflows != reported[0] or ring.dropped_frames != reported[1]:
+                print(f"WARNING: audio input overflow ({self._overflows} overflows, "
+                      f"{ring.dropped_frames} frames dropped so far)")
+                reported[0], reported[1] = self._overflows, ring.dropped_frames
+
+        ring.consume(dispatch)
+
+    def _dispatch(self, block: np.ndarray):
+        """Convert a span of device frames once and hand it to every subscriber"""
+        # The span is a view into the callback ring, so take a copy before it's overwritten
+        mono = block[:, 0].copy() if block.shape[1] == 1 else block.mean(axis=1, dtype=np.float32)
+        if self.resampler is not None:
+            mono = self.resampler.process(mono)
+            if len(mono) == 0:
+                return
+        if mono.dtype != self.dtype:
+            # int16 capture - back to int16 after downmixing or resampling (the filter can overshoot)
+            mono = saturate_int16(mono)
+        for subscription in self._subscriptions:
+            subscription.queue.push(mono)
+
+    def close(self):
+        """Close the stream and release all subscribers"""
+        with self._lock:
+            subscriptions, self._subscriptions = self._subscriptions, []
+            self._close()
+        for subscription in subscriptions:
+            self._finish(subscription)
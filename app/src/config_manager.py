@@ -9,6 +9,11 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 import shutil
 
+try:
+    from .model_index import ModelIndex
+except ImportError:
+    from model_index import ModelIndex
+
 
 class ConfigManager:
     """Manages application configuration and settings"""
@@ -18,6 +23,8 @@ class ConfigManager:
         self.project_root = Path(__file__).resolve().parent.parent
         self.local_models_dir = self.project_root / "whisper.cpp" / "models"
         self.local_whisper_binary = self.project_root / "whisper.cpp" / "build" / "bin" / "whisper-cli"
+        self.local_whisper_server_binary = self.project_root / "whisper.cpp" / "build" / "bin" / "whisper-server"
+        self.local_whisper_library = self.project_root / "whisper.cpp" / "build" / "src" / "libwhisper.so"
 
         # Default configuration values
         self.default_config = {
@@ -26,13 +33,20 @@ class ConfigManager:
             'start_shortcut': '',  # Empty = disabled
             'stop_shortcut': '',
             'pause_shortcut': '',
+            'cancel_shortcut': '',  # Stops the text being typed
             'model': 'large-v3',
             'custom_model_path': None,  # Direct path to a custom .bin model file
             'model_directories': [      # List of directories to scan for models
                 str(self.local_models_dir),
                 str(Path.home() / "ai" / "models" / "stt" / "whisper-cpp"),
             ],
-            'key_delay': 15,  # Delay between keystrokes in milliseconds for ydotool
+            'key_delay': 15,  # Delay between keystrokes in milliseconds
+            'injection_chunk_chars': 64,  # Characters typed per call (progress granularity)
+            'injection_backend': 'auto',  # auto (uinput, then ydotoold socket, then ydotool CLI), uinput or ydotool
+            'ydotool_socket': '',  # ydotoold socket path (empty = $YDOTOOL_SOCKET or /tmp/.ydotool_socket)
+            'paste_threshold_chars': 200,  # Paste texts at least this long instead of typing them (0 = always type)
+            'paste_shortcut': 'ctrl+v',  # Shortcut sent to paste: ctrl+v, or ctrl+shift+v for terminals
+            'clipboard_restore_delay_ms': 300,  # Without wl-copy: wait after a paste before restoring the clipboard (2000 for slow apps)
             'window_position': None,
             'always_on_top': True,
             'theme': 'darkly',
@@ -40,12 +54,47 @@ class ConfigManager:
             'word_overrides': {},  # Dictionary of word replacements: {"original": "replacement"}
             'transcription_threads': max(1, os.cpu_count() // 2) if os.cpu_count() else 4,
             'whisper_binary': None,  # Optional override for whisper-cli path
+            'whisper_backend': 'cli',  # 'cli' (spawn whisper-cli per utterance), 'server' or 'library' (resident model)
+            'whisper_server_binary': None,  # Optional override for whisper-server path
+            'whisper_server_port': 0,  # 0 = pick a free port
+            'whisper_server_idle_timeout': 600,  # Seconds before an idle server is unloaded (0 = never)
+            'vad_enabled': True,  # Trim silent edges and skip whisper for recordings without speech
+            'vad_threshold_db': -45.0,  # Minimum frame level (dBFS) counted as voiced speech
+            'vad_noise_margin_db': 10.0,  # Voiced frames must also be this far above the noise floor
+            'vad_zcr_threshold': 0.3,  # Zero-crossing rate that marks quiet fricatives at speech edges
+            'vad_zcr_floor_db': -55.0,  # High zero-crossing frames must still be louder than this (dBFS)
+            'vad_noise_floor_cap_db': -35.0,  # Highest level (dBFS) accepted as the room's noise floor
+            'vad_padding_ms': 250,  # Audio kept before and after detected speech
+            'vad_min_speech_ms': 120,  # Less voiced audio than this counts as silence
+            'pause_compression': False,  # Shorten long pauses inside a recording before decoding
+            'pause_min_ms': 1000,  # Pauses at least this long are shortened...
+            'pause_keep_ms': 300,  # ...to this much silence
+            'adaptive_audio_ctx': True,  # Shrink whisper's 30 s encoder window to fit short clips
+            'audio_ctx_margin': 0.2,  # Extra encoder context relative to the clip length
+            'audio_ctx_min': None,  # Override the per-model minimum encoder context (frames)
+            'audio_transport': 'pipe',  # How whisper-cli receives audio: 'pipe' (stdin), 'memfd' or 'file' (temp WAV)
+            'whisper_library': None,  # Optional override for libwhisper.so path
+            'whisper_library_use_gpu': True,  # Let the in-process engine use a GPU backend if compiled in
+            'capture_profile': 'balanced',  # low-latency (16 ms blocks), balanced (64 ms) or power-saving (256 ms)
+            'capture_format': 'float32',  # Sample format kept from capture to whisper: float32 or int16 (half the memory)
+            'native_rate_capture': True,  # Open the mic at its own sample rate and resample to 16kHz in-app
+            'always_on_capture': False,  # Keep the microphone stream open so recording starts instantly
+            'preroll_ms': 300,  # Audio from before the hotkey prepended to each recording (always-on mode)
+            'long_session_mode': False,  # Spill long recordings to a memory-mapped WAV file instead of RAM
+            'spill_threshold_seconds': 120,  # Recording length after which long-session mode moves audio to disk
+            'pipeline_max_pending': 4,  # Recorded utterances allowed to wait for transcription
+            'streaming_transcription': False,  # Decode while recording and commit stable text early
+            'streaming_injection': False,  # Type words as they are finalized instead of after the whole transcription
+            'model_index_cache': True,  # Persist model directory scans between runs
+            'model_index_watch': True,  # Rescan model directories only when inotify reports a change
             'operation_mode': 'live_text_entry',  # 'live_text_entry' or 'note_entry'
         }
         
         # Set up config directory and file path
         self.config_dir = Path.home() / '.config' / 'whispertux'
         self.config_file = self.config_dir / 'config.json'
+        self.model_index_file = self.config_dir / 'model_index.json'
+        self._model_index = None
         
         # Current configuration (starts with defaults)
         self.config = self.default_config.copy()
@@ -129,6 +178,7 @@ class ConfigManager:
             'start': self.config.get('start_shortcut', ''),
             'stop': self.config.get('stop_shortcut', ''),
             'pause': self.config.get('pause_shortcut', ''),
+            'cancel': self.config.get('cancel_shortcut', ''),
         }
 
     def set_shortcut(self, name: str, key: str) -> bool:
@@ -212,51 +262,22 @@ class ConfigManager:
             str(Path.home() / "ai" / "models" / "stt" / "whisper-cpp")
         ])
 
-        # Search for the model in each directory
-        for model_dir_str in model_dirs:
-            model_dir = Path(model_dir_str).expanduser()
-            if not model_dir.exists():
-                continue
-
-            # Special handling for large-v3-turbo with alternate naming conventions
-            if model_name == 'large-v3-turbo':
-                turbo_patterns = [
-                    model_dir / "ggml-large-v3-turbo.bin",
-                    model_dir / "ggml-large-v3-turbo.en.bin",
-                    model_dir / "multilang_whisper_large3_turbo.ggml",
-                    model_dir / "whisper_large3_turbo.ggml",
-                    model_dir / "large-v3-turbo.ggml",
-                    model_dir / "ggml-large-v3-turbo.ggml",
-                ]
-                for turbo_file in turbo_patterns:
-                    if turbo_file.exists():
-                        return turbo_file
-
-            # Handle different model naming conventions
-            if model_name.endswith('.en'):
-                # English-only model
-                model_path = model_dir / f"ggml-{model_name}.bin"
-                if model_path.exists():
-                    return model_path
-            else:
-                # Check both .en.bin and .bin versions
-                en_model_path = model_dir / f"ggml-{model_name}.en.bin"
-                multi_model_path = model_dir / f"ggml-{model_name}.bin"
-
-                if en_model_path.exists():
-                    return en_model_path
-                elif multi_model_path.exists():
-                    return multi_model_path
-
-            # Also check for generic ggml-model.bin (common for finetunes)
-            generic_path = model_dir / "ggml-model.bin"
-            if generic_path.exists() and model_name in str(model_dir):
-                return generic_path
+        # Search the indexed model directories (turbo aliases, stock files, generic ggml-model.bin)
+        model_path = self.get_model_index().find_model_file(model_name, model_dirs)
+        if model_path is not None:
+            return model_path
 
         # Default fallback: return expected path in first model directory
         default_dir = Path(model_dirs[0]).expanduser() if model_dirs else Path.home() / "ai" / "models" / "stt" / "whisper-cpp"
         return default_dir / f"ggml-{model_name}.en.bin"
 
+    def get_model_index(self) -> ModelIndex:
+        """Get the shared index of model directory contents, creating it on first use"""
+        if self._model_index is None:
+            cache_file = self.model_index_file if self.config.get('model_index_cache', True) else None
+            self._model_index = ModelIndex(cache_file, watch=self.config.get('model_index_watch', True))
+        return self._model_index
+
     def get_model_directories(self) -> list:
         """Get list of model directories"""
         dirs = self.config.get('model_directories', [])
@@ -339,6 +360,56 @@ class ConfigManager:
         # Return the most likely path even if it doesn't exist yet
         return possible_paths[0]
     
+    def get_whisper_server_binary_path(self) -> Path:
+        """Get the path to the whisper-server binary"""
+        # 1) Explicit override from config
+        override_binary = self.config.get('whisper_server_binary')
+        if override_binary and Path(override_binary).exists():
+            return Path(override_binary)
+
+        # 2) Local build inside the project
+        if self.local_whisper_server_binary.exists():
+            return self.local_whisper_server_binary
+
+        # 3) Next to the configured whisper-cli (e.g. an external Vulkan build)
+        sibling = self.get_whisper_binary_path().parent / "whisper-server"
+        if sibling.exists():
+            return sibling
+
+        # 4) whisper-server in PATH
+        whisper_server = shutil.which("whisper-server")
+        if whisper_server:
+            return Path(whisper_server)
+
+        # Return the most likely path even if it doesn't exist yet
+        return self.local_whisper_server_binary
+
+    def get_whisper_library_path(self) -> Path:
+        """Get the path to the libwhisper shared library"""
+        # 1) Explicit override from config
+        override_library = self.config.get('whisper_library')
+        if override_library and Path(override_library).exists():
+            return Path(override_library)
+
+        # 2) Local build inside the project
+        if self.local_whisper_library.exists():
+            return self.local_whisper_library
+
+        # 3) Alongside the configured whisper-cli build tree (build/bin -> build/src)
+        build_dir = self.get_whisper_binary_path().parent.parent
+        for candidate in [build_dir / "src" / "libwhisper.so", build_dir / "lib" / "libwhisper.so"]:
+            if candidate.exists():
+                return candidate
+
+        # 4) System-wide install
+        for lib_dir in [Path("/usr/local/lib"), Path("/usr/lib"), Path("/usr/lib64")]:
+            candidate = lib_dir / "libwhisper.so"
+            if candidate.exists():
+                return candidate
+
+        # Return the most likely path even if it doesn't exist yet
+        return self.local_whisper_library
+
     def get_temp_directory(self) -> Path:
         """Get the temporary directory for audio files"""
         # Use XDG data directory for user-writable temp files
@@ -0,0 +1,242 @@
+"""
+Device registry for WhisperTux
+Caches audio device enumeration and refreshes it when sound hardware is plugged in or removed
+"""
+
+import os
+import subprocess
+import threading
+import weakref
+from typing import Callable, List, Optional
+
+import sounddevice as sd
+
+try:
+    from .inotify_watcher import InotifyWatcher, IN_CREATE, IN_DELETE
+except ImportError:
+    from inotify_watcher import InotifyWatcher, IN_CREATE, IN_DELETE
+
+
+# ALSA creates and removes device nodes here when a card appears or disappears
+SOUND_DEVICE_DIR = '/dev/snd'
+
+
+class DeviceRegistry:
+    """
+    One cached snapshot of PortAudio's device and host API lists.
+
+    Enumerating devices is cheap to call but not free - every query goes through PortAudio,
+    and looking up the PulseAudio default source spawns pactl. The registry enumerates once
+    and answers from the snapshot until the hardware changes. Changes are detected with
+    inotify on /dev/snd; refresh() forces a rescan when inotify is unavailable.
+
+    PortAudio only discovers new hardware when it is re-initialized, which would close any
+    open stream, so re-initialization waits until no capture stream is open. Until then the
+    registry keeps serving the previous snapshot. Listeners are told about the change first,
+    which lets AudioCapture close an idle always-on or monitoring stream so the rescan can
+    happen straight away.
+    """
+
+    def __init__(self, watch: bool = True, sound_dir: str = SOUND_DEVICE_DIR):
+        self._lock = threading.RLock()
+        self._devices = None      # list of device dicts, index = PortAudio device id
+        self._hostapis = None     # list of host API dicts
+        self._input_info = {}     # query key -> info dict for a resolved input device
+        self._default_source = None
+        self._default_source_loaded = False
+        self._stale = False       # hotplug seen - PortAudio must be re-initialized
+        self._open_streams = 0
+        self._listeners = []      # weak references, so listeners don't keep their owners alive
+        self.generation = 0       # incremented every time the snapshot is replaced
+
+        self.watcher = None
+        if watch and os.path.isdir(sound_dir):
+            watcher = InotifyWatcher(self._on_hotplug, mask=IN_CREATE | IN_DELETE)
+            if watcher.start() and watcher.add_watch(sound_dir):
+                self.watcher = watcher
+            else:
+                watcher.stop()
+                print("WARNING: Could not watch for audio hotplug, use Rescan to pick up new devices")
+
+    @property
+    def watching(self) -> bool:
+        return self.watcher is not None
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Call back (from the watcher thread) whenever devices are added or removed"""
+        ref = weakref.WeakMethod(callback) if hasattr(callback, '__self__') else weakref.ref(callback)
+        with self._lock:
+            self._listeners.append(ref)
+
+    def remove_listener(self, callback: Callable[[], None]):
+        with self._lock:
+            self._listeners = [ref for ref in self._listeners if ref() not in (None, callback)]
+
+    def is_available(self) -> bool:
+        """True if PortAudio can be queried"""
+        return self.devices() is not None
+
+    def devices(self) -> Optional[list]:
+        """All devices (input and output), or None if PortAudio can't be queried"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._devices
+
+    def hostapis(self) -> list:
+        with self._lock:
+            self._ensure_loaded()
+            return self._hostapis or []
+
+    def hostapi_name(self, index: int) -> str:
+        hostapis = self.hostapis()
+        if 0 <= index < len(hostapis):
+            return hostapis[index]['name']
+        return "unknown"
+
+    def input_devices(self) -> List[dict]:
+        """Devices with input channels, in the format the settings dialog lists them"""
+        input_devices = []
+        for i, device in enumerate(self.devices() or []):
+            if device['max_input_channels'] > 0:
+                host_api = self.hostapi_name(device['hostapi'])
+                input_devices.append({
+                    'id': i,
+                    'name': device['name'],
+                    'channels': device['max_input_channels'],
+                    'sample_rate': device['default_samplerate'],
+                    'host_api': host_api,
+                    'display_name': f"{device['name']} ({host_api})"
+                })
+        return input_devices
+
+    def get_input_info(self, device=None) -> dict:
+        """
+        Same as sd.query_devices(device, kind='input'), answered from the cache.
+
+        Raises like sounddevice does if the device doesn't exist or has no input.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            # With no explicit device the answer depends on sounddevice's current default
+            key = repr(device) if device is not None else f"default:{list(sd.default.device)!r}"
+            info = self._input_info.get(key)
+            if info is None:
+                info = dict(sd.query_devices(device=device, kind='input'))
+                self._input_info[key] = info
+            return info
+
+    def default_source(self) -> Optional[str]:
+        """PulseAudio/PipeWire default source name from pactl, looked up once per snapshot"""
+        with self._lock:
+            self._ensure_loaded()
+            if not self._default_source_loaded:
+                self._default_source_loaded = True
+                try:
+                    result = subprocess.run(['pactl', 'get-default-source'],
+                                            capture_output=True, text=True, timeout=5)
+                    if result.returncode == 0:
+                        self._default_source = result.stdout.strip() or None
+                except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
+                    pass  # pactl not available or failed
+            return self._default_source
+
+    def refresh(self):
+        """Rescan now, e.g. from a Rescan button"""
+        with self._lock:
+            self._stale = True
+            self._devices = None
+        self._notify()
+
+    def stream_opened(self):
+        """Called by the capture engine - PortAudio must not be re-initialized while a stream is open"""
+        with self._lock:
+            self._open_streams += 1
+
+    def stream_closed(self):
+        with self._lock:
+            self._open_streams = max(0, self._open_streams - 1)
+
+    def close(self):
+        """Stop watching for hotplug"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+    def _ensure_loaded(self):
+        """Take a new snapshot if there is none or the hardware changed. Lock held."""
+        if self._stale and self._open_streams == 0:
+            self._reinitialize_portaudio()
+            self._stale = False
+            self._devices = None
+        if self._devices is not None:
+            return
+
+        try:
+            self._devices = [dict(device) for device in sd.query_devices()]
+            self._hostapis = [dict(api) for api in sd.query_hostapis()]
+        except Exception as e:
+            print(f"⚠ Could not query audio devices: {e}")
+            self._devices = None
+            self._hostapis = None
+            return
+        self._input_info = {}
+        self._default_source = None
+        self._default_source_loaded = False
+        self.generation += 1
+
+    @staticmethod
+    def _reinitialize_portaudio():
+        """Make PortAudio re-enumerate the hardware"""
+        # sounddevice has no public way to do this. _terminate() and _initialize() wrap
+        # Pa_Terminate()/Pa_Initialize() and have kept their names since sounddevice 0.3, but
+        # they are private - check for them rather than fail on a release that drops them.
+        if not (hasattr(sd, '_terminate') and hasattr(sd, '_initialize')):
+            print(f"⚠ sounddevice {getattr(sd, '__version__', '?')} cannot re-initialize PortAudio, "
+                  f"restart WhisperTux to use new audio devices")
+            return
+        try:
+            sd._terminate()
+            sd._initialize()
+        except Exception as e:
+            print(f"⚠ Could not re-initialize PortAudio: {e}")
+
+    def _on_hotplug(self, path: Optional[str]):
+        """inotify callback - a device node was created or removed under /dev/snd"""
+        with self._lock:
+            if self._stale:
+                return  # already waiting for a rescan
+            self._stale = True
+        print("Audio devices changed, refreshing device list")
+        self._notify()
+
+    def _notify(self):
+        with self._lock:
+            self._listeners = [ref for ref in self._listeners if ref() is not None]
+            listeners = [ref() for ref in self._listeners]
+        for callback in listeners:
+            if callback is None:
+                continue
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in device change listener: {e}")
+
+    def __del__(self):
+        """Cleanup when object is destroyed"""
+        try:
+            self.close()
+        except:
+            pass  # Ignore errors during cleanup
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_device_registry() -> DeviceRegistry:
+    """The process-wide registry - PortAudio's device list is process-wide too"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = DeviceRegistry()
+        return _registry
@@ -0,0 +1,451 @@
+"""
+Dictation pipeline for WhisperTux
+Coordinates recording, transcription and injection so consecutive dictations can overlap
+"""
+
+import queue
+import threading
+import time
+import numpy as np
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Optional, Callable, Tuple
+
+try:
+    from .streaming_transcriber import StreamingTranscriber
+    from .voice_activity import VoiceActivityDetector
+    from .audio_buffer import discard_recording
+except ImportError:
+    from streaming_transcriber import StreamingTranscriber
+    from voice_activity import VoiceActivityDetector
+    from audio_buffer import discard_recording
+
+
+# Whisper output that means nothing was said
+BLANK_INDICATORS = ["[blank_audio]", "(blank)", "(silence)", "[silence]"]
+
+
+class RecorderState(Enum):
+    """State of the capture stage"""
+    IDLE = 'idle'
+    RECORDING = 'recording'
+    PAUSED = 'paused'
+
+
+@dataclass
+class DictationJob:
+    """One captured utterance travelling through the pipeline"""
+    job_id: int
+    audio: Optional[np.ndarray]
+    streaming: Optional[StreamingTranscriber] = None
+    captured_at: float = 0.0
+    stop_latency: float = 0.0  # seconds from the stop command to the audio being queued
+    text: str = ""
+    injected: bool = False
+    vad_saved_seconds: float = 0.0
+    injection: Any = None  # IncrementalInjection typing this job while it is transcribed
+    first_text_latency: Optional[float] = None  # seconds from the stop to the first typed words
+    transcribed: threading.Event = field(default_factory=threading.Event)  # set once text is final
+    cancelled: threading.Event = field(default_factory=threading.Event)  # set to abort its decode
+
+
+class DictationPipeline:
+    """
+    Three-stage dictation pipeline.
+
+    A control thread owns the recorder state and executes start/stop/pause commands
+    in the order they were issued. Each stop turns the captured audio into a job on a
+    bounded queue, and a single transcription worker drains that queue, so results
+    are delivered strictly in capture order while the next recording is already running.
+    Jobs are typed by a single injection worker, keeping ydotool off the GUI thread;
+    each takes its place in the injection queue when it stops and is typed once it has
+    been transcribed. With streaming_injection enabled, each utterance's injection is
+    queued when its recording starts (streaming transcription) or stops, and words are
+    typed as the decoder finalizes them instead of after the whole transcription.
+    All callbacks are invoked from pipeline threads.
+    """
+
+    def __init__(self, audio_capture, whisper_manager, config_manager=None, max_pending: int = 4,
+                 text_injector=None):
+        self.audio_capture = audio_capture
+        self.whisper_manager = whisper_manager
+        self.config_manager = config_manager
+        self.text_injector = text_injector  # None = deliver text only, don't type it
+        self.vad = VoiceActivityDetector(config_manager)
+
+        # Callbacks
+        self.on_recording_state: Optional[Callable[[bool], None]] = None
+        self.on_pause_state: Optional[Callable[[bool], None]] = None
+        self.on_transcription: Optional[Callable[[DictationJob], None]] = None
+        self.on_status: Optional[Callable[[str], None]] = None
+        self.on_queue_changed: Optional[Callable[[int], None]] = None
+        self.on_injection_progress: Optional[Callable[[DictationJob, int, int], None]] = None
+        self.on_injection_finished: Optional[Callable[[DictationJob], None]] = None
+
+        # Capture stage
+        self.state = RecorderState.IDLE
+        self._streaming = None
+        self._incremental = None  # injection of the recording in progress (streaming transcription)
+        self._next_job_id = 1
+
+        # Transcription stage - bounded so a backlog applies back-pressure to stop()
+        self._jobs: "queue.Queue[Optional[DictationJob]]" = queue.Queue(maxsize=max_pending)
+        # (command, time.perf_counter() when it was issued)
+        self._commands: "queue.Queue[Tuple[str, float]]" = queue.Queue()
+        # Jobs (queued at their stop, typed once transcribed), or IncrementalInjections, in capture order
+        self._injections: "queue.Queue[Any]" = queue.Queue()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._transcribing: Optional[DictationJob] = None  # job taken by the transcription worker
+
+        self._control_thread = None
+        self._worker_thread = None
+        self._injection_thread = None
+        self._running = False
+
+        # Stop-to-handoff latencies (seconds) of recent recordings
+        self.stop_latencies: "deque[float]" = deque(maxlen=100)
+
+    @property
+    def is_recording(self) -> bool:
+        return self.state != RecorderState.IDLE
+
+    @property
+    def is_paused(self) -> bool:
+        return self.state == RecorderState.PAUSED
+
+    @property
+    def pending_count(self) -> int:
+        """Utterances captured but not yet delivered"""
+        with self._pending_lock:
+            return self._pending
+
+    def start(self):
+        """Start the pipeline threads"""
+        if self._running:
+            return
+        self._running = True
+        self._control_thread = threading.Thread(target=self._control_loop, name="pipeline-control", daemon=True)
+        self._worker_thread = threading.Thread(target=self._transcription_loop, name="pipeline-transcribe", daemon=True)
+        self._control_thread.start()
+        self._worker_thread.start()
+        if self.text_injector is not None:
+            self._injection_thread = threading.Thread(target=self._injection_loop, name="pipeline-inject", daemon=True)
+            self._injection_thread.start()
+
+    def shutdown(self, timeout: float = 5.0):
+        """Stop recording if needed and let the threads exit"""
+        if not self._running:
+            return
+        self._put_command('shutdown')
+        self._control_thread.join(timeout=timeout)
+        self._jobs.put(None)
+        self._worker_thread.join(timeout=timeout)
+        if self._injection_thread is not None:
+            self._injections.put(None)
+            self._injection_thread.join(timeout=timeout)
+        self._running = False
+
+    # Commands - safe to call from any thread, executed in order on the control thread
+
+    def start_recording(self):
+        self._put_command('start')
+
+    def stop_recording(self):
+        self._put_command('stop')
+
+    def toggle_recording(self):
+        self._put_command('toggle')
+
+    def toggle_pause(self):
+        self._put_command('pause')
+
+    def cancel_transcription(self):
+        """Abort the utterance being transcribed (library backend; takes effect at once)"""
+        job = self._transcribing
+        if job is not None:
+            job.cancelled.set()
+
+    def cancel_injection(self):
+        """Stop typing the current utterance (takes effect at once, not in command order)"""
+        if self.text_injector is not None:
+            self.text_injector.cancel()
+
+    @property
+    def streaming_injection(self) -> bool:
+        return (self.text_injector is not None and self.config_manager is not None
+                and self.config_manager.get_setting('streaming_injection', False))
+
+    def _put_command(self, command: str):
+        self._commands.put((command, time.perf_counter()))
+
+    def _control_loop(self):
+        while True:
+            command, issued_at = self._commands.get()
+            try:
+                if command == 'toggle':
+                    command = 'stop' if self.is_recording else 'start'
+
+                if command == 'start':
+                    self._do_start()
+                elif command == 'stop':
+                    self._do_stop(issued_at=issued_at)
+                elif command == 'pause':
+                    self._do_pause()
+                elif command == 'shutdown':
+                    if self.is_recording:
+                        self._do_stop(discard=True)
+                    return
+            except Exception as e:
+                print(f"Pipeline error handling '{command}': {e}")
+                self._emit_status(f"Error: {e}")
+
+    def _do_start(self):
+        if self.is_recording:
+            return
+
+        if self.config_manager and self.config_manager.get_setting('streaming_transcription', False):
+            self._streaming = StreamingTranscriber(self.whisper_manager)
+            if self.streaming_injection:
+                # Type committed words during the recording - queued now to keep capture order
+                self._incremental = self.text_injector.begin_incremental()
+                self._streaming.commit_callback = self._incremental.feed
+                self._injections.put(self._incremental)
+            self._streaming.start()
+            self.audio_capture.chunk_callback = self._streaming.add_audio
+
+        try:
+            if not self.audio_capture.start_recording():
+                raise RuntimeError("could not open the audio input device")
+        except Exception as e:
+            self._discard_streaming()
+            self._emit_status(f"Recording error: {e}")
+            if self.on_recording_state:
+                self.on_recording_state(False)
+            return
+
+        self.state = RecorderState.RECORDING
+        if self.on_recording_state:
+            self.on_recording_state(True)
+
+    def _do_stop(self, discard: bool = False, issued_at: Optional[float] = None):
+        if not self.is_recording:
+            return
+        if issued_at is None:
+            issued_at = time.perf_counter()
+
+        self.state = RecorderState.IDLE
+        if self.on_recording_state:
+            self.on_recording_state(False)
+
+        audio_data = self.audio_capture.stop_recording()
+        self.audio_capture.chunk_callback = None
+        streaming, self._streaming = self._streaming, None
+        incremental, self._incremental = self._incremental, None
+
+        if discard or audio_data is None or len(audio_data) == 0:
+            discard_recording(audio_data)
+            if streaming is not None:
+                streaming.stop()
+            if incremental is not None:
+                incremental.cancel()
+                incremental.finish("")
+            if not discard:
+                self._emit_status("No speech detected")
+            return
+
+        job = DictationJob(
+            job_id=self._next_job_id,
+            audio=audio_data,
+            streaming=streaming,
+            captured_at=time.monotonic(),
+            stop_latency=time.perf_counter() - issued_at,
+        )
+        self._next_job_id += 1
+        # Every job takes its place in the injection order now, whichever way it is typed,
+        # so toggling streaming_injection between utterances can't reorder them
+        if incremental is None and self.streaming_injection:
+            incremental = self.text_injector.begin_incremental()
+            self._injections.put(incremental)
+        if incremental is not None:
+            incremental.job = job
+            job.injection = incremental
+        elif self.text_injector is not None:
+            self._injections.put(job)
+        self._report_stop_latency(job.stop_latency)
+
+        self._change_pending(1)
+        if self._jobs.full():
+            self._emit_status("Transcription queue full, waiting...")
+        self._jobs.put(job)  # blocks while the queue is full
+
+    def _report_stop_latency(self, latency: float):
+        """Log how long the stop took to hand the audio over, split into capture teardown and the rest"""
+        self.stop_latencies.append(latency)
+        capture = getattr(self.audio_capture, 'last_stop_latency', None)
+        capture_text = f", capture {capture * 1000:.1f} ms" if capture is not None else ""
+        recent = np.array(self.stop_latencies) * 1000
+        print(f"Stop-to-handoff latency: {latency * 1000:.1f} ms{capture_text} "
+              f"(median {np.median(recent):.1f} ms, max {recent.max():.1f} ms over {len(recent)} recordings)")
+
+    def _do_pause(self):
+        if not self.is_recording:
+            return
+        paused = self.audio_capture.toggle_pause()
+        self.state = RecorderState.PAUSED if paused else RecorderState.RECORDING
+        if self.on_pause_state:
+            self.on_pause_state(paused)
+
+    def _discard_streaming(self):
+        self.audio_capture.chunk_callback = None
+        if self._streaming is not None:
+            self._streaming.stop()
+            self._streaming = None
+        if self._incremental is not None:
+            self._incremental.cancel()
+            self._incremental.finish("")
+            self._incremental = None
+
+    def _transcription_loop(self):
+        """Single worker - keeps results in capture order"""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+
+            self._transcribing = job
+            try:
+                if not self.is_recording:
+                    self._emit_status("Processing...")
+                if job.streaming is not None:
+                    text = job.streaming.finish()
+                else:
+                    segment_callback = job.injection.feed if job.injection is not None else None
+                    text = self._transcribe_job(job, segment_callback=segment_callback)
+                job.text = self.clean_transcription(text)
+            except Exception as e:
+                print(f"Transcription of job {job.job_id} failed: {e}")
+                self._emit_status(f"Error: {e}")
+                job.text = ""
+            finally:
+                discard_recording(job.audio)  # delete the file behind a long-session recording
+                job.audio = None  # release the samples early
+                job.streaming = None
+                if job.injection is not None:
+                    job.injection.finish(job.text)  # the injection worker is waiting for the rest
+                job.transcribed.set()
+                self._transcribing = None
+
+            if self.on_transcription:
+                self.on_transcription(job)
+
+            # With an injector the job is already queued and stays pending until it is typed
+            if self.text_injector is None:
+                self._change_pending(-1)
+
+    def _injection_loop(self):
+        """Single worker - types results in the order they were transcribed"""
+        while True:
+            job = self._injections.get()
+            if job is None:
+                return
+            if not isinstance(job, DictationJob):
+                self._run_incremental(job)
+                continue
+
+            # Queued at its stop - wait for the text, keeping later utterances behind it
+            job.transcribed.wait()
+            if not job.text:
+                self._change_pending(-1)
+                continue
+
+            def report_progress(done: int, total: int, job=job):
+                if self.on_injection_progress:
+                    self.on_injection_progress(job, done, total)
+
+            try:
+                job.injected = self.text_injector.inject_text(job.text, progress_callback=report_progress)
+            except Exception as e:
+                print(f"Injection of job {job.job_id} failed: {e}")
+                job.injected = False
+
+            self._change_pending(-1)
+            if self.on_injection_finished:
+                self.on_injection_finished(job)
+
+    def _run_incremental(self, incremental):
+        """Type an utterance as it is transcribed; returns once its transcription has finished"""
+        def report_progress(done: int, total: int):
+            if self.on_injection_progress:
+                self.on_injection_progress(incremental.job, done, total)
+
+        try:
+            injected = incremental.run(progress_callback=report_progress)
+        except Exception as e:
+            print(f"Streaming injection failed: {e}")
+            injected = False
+
+        job = incremental.job
+        if job is None:
+            return  # recording was discarded, never became a job
+        job.injected = injected
+        if incremental.first_typed_at is not None:
+            job.first_text_latency = incremental.first_typed_at - job.captured_at
+            if job.first_text_latency < 0:
+                print(f"First words of job {job.job_id} typed {-job.first_text_latency:.2f}s before the stop")
+            else:
+                print(f"First words of job {job.job_id} typed {job.first_text_latency * 1000:.0f} ms after the stop")
+
+        self._change_pending(-1)
+        if (job.text or incremental.typed_text) and self.on_injection_finished:
+            self.on_injection_finished(job)
+
+    def _transcribe_job(self, job: DictationJob,
+                        segment_callback: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Gate and trim silence, shorten pauses, then run whisper on what is left.
+
+        Streaming jobs never get here - their words are committed during the recording.
+        """
+        if getattr(job.audio, 'wav_path', None):
+            # Long-session recording on disk - trimming or shortening pauses would mean
+            # loading it into memory or writing a second file, so whisper gets it as it is
+            print(f"Transcribing {len(job.audio) / self.vad.sample_rate:.0f}s long-session recording from disk")
+            return self.whisper_manager.transcribe_audio(job.audio, segment_callback=segment_callback,
+                                                         cancel_event=job.cancelled)
+
+        vad_result = self.vad.process(job.audio)
+        job.vad_saved_seconds = vad_result.saved_seconds
+
+        if not vad_result.has_speech:
+            print(f"VAD: no speech in {vad_result.original_seconds:.2f}s recording, skipping inference")
+            return ""
+
+        if vad_result.saved_seconds > 0:
+            pauses = f", {vad_result.compressed_pauses} pauses shortened" if vad_result.compressed_pauses else ""
+            print(f"VAD: trimmed {vad_result.saved_seconds:.2f}s of silence from "
+                  f"{vad_result.original_seconds:.2f}s recording{pauses}")
+        return self.whisper_manager.transcribe_audio(vad_result.audio, segment_callback=segment_callback,
+                                                     cancel_event=job.cancelled)
+
+    @staticmethod
+    def clean_transcription(text: str) -> str:
+        """Strip whitespace and drop whisper's blank-audio markers"""
+        if not text or not text.strip():
+            return ""
+        cleaned = text.strip()
+        if any(indicator in cleaned.lower() for indicator in BLANK_INDICATORS):
+            return ""
+        return cleaned
+
+    def _change_pending(self, delta: int):
+        with self._pending_lock:
+            self._pending += delta
+            pending = self._pending
+        if self.on_queue_changed:
+            self.on_queue_changed(pending)
+
+    def _emit_status(self, status: str):
+        if self.on_status:
+            self.on_status(status)
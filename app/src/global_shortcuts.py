@@ -21,10 +21,12 @@ class GlobalShortcuts:
                  start_key: Optional[str] = None,
                  stop_key: Optional[str] = None,
                  pause_key: Optional[str] = None,
+                 cancel_key: Optional[str] = None,
                  toggle_callback: Optional[Callable] = None,
                  start_callback: Optional[Callable] = None,
                  stop_callback: Optional[Callable] = None,
-                 pause_callback: Optional[Callable] = None):
+                 pause_callback: Optional[Callable] = None,
+                 cancel_callback: Optional[Callable] = None):
         # Legacy support: primary_key maps to toggle
         self.primary_key = primary_key
         self.callback = callback  # Legacy callback for primary_key
@@ -57,6 +59,8 @@ class GlobalShortcuts:
             self._register_shortcut('stop', stop_key, stop_callback)
         if pause_key:
             self._register_shortcut('pause', pause_key, pause_callback)
+        if cancel_key:
+            self._register_shortcut('cancel', cancel_key, cancel_callback)
 
         # For legacy compatibility
         self.target_keys = self._parse_key_combination(primary_key)
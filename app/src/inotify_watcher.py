@@ -0,0 +1,194 @@
+"""
+inotify watcher for WhisperTux
+Watches directories for changes through the Linux inotify API (via ctypes, no extra dependencies)
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+from typing import Callable, Dict, Optional
+
+
+# Event masks from <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+# Directory entries appearing, disappearing or being renamed
+DIRECTORY_CHANGES = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class InotifyWatcher:
+    """
+    Watches a set of paths and calls back with the watched path whenever an event arrives.
+
+    The callback runs on the watcher's background thread. A path of None means the kernel
+    queue overflowed and every watched path should be considered changed.
+    """
+
+    def __init__(self, callback: Callable[[Optional[str]], None], mask: int = DIRECTORY_CHANGES):
+        self.callback = callback
+        self.mask = mask
+        self.fd = None
+        self._libc = None
+        self._watches: Dict[int, str] = {}  # wd -> path
+        self._paths: Dict[str, int] = {}    # path -> wd
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_read, self._stop_write = None, None
+
+    @staticmethod
+    def is_supported() -> bool:
+        """Check if inotify is available on this system"""
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            return False
+        try:
+            return hasattr(ctypes.CDLL(libc_name), 'inotify_init1')
+        except OSError:
+            return False
+
+    def start(self) -> bool:
+        """Create the inotify instance and start the reader thread"""
+        if self.fd is not None:
+            return True
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        except (OSError, AttributeError, TypeError) as e:
+            print(f"inotify not available: {e}")
+            return False
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            print(f"inotify_init1 failed: {os.strerror(ctypes.get_errno())}")
+            return False
+
+        self._libc = libc
+        self.fd = fd
+        self._stop_read, self._stop_write = os.pipe()
+        self._thread = threading.Thread(target=self._read_loop, name="inotify-watcher", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Stop the reader thread and close the inotify instance"""
+        if self.fd is None:
+            return
+        os.write(self._stop_write, b'x')
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        for fd in (self.fd, self._stop_read, self._stop_write):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self.fd = None
+        with self._lock:
+            self._watches.clear()
+            self._paths.clear()
+
+    def add_watch(self, path: str) -> bool:
+        """Start watching a directory. Returns False if the watch could not be added."""
+        if self.fd is None:
+            return False
+
+        with self._lock:
+            if path in self._paths:
+                return True
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.mask | IN_ONLYDIR)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    print("WARNING: inotify watch limit reached (fs.inotify.max_user_watches)")
+                return False
+            self._watches[wd] = path
+            self._paths[path] = wd
+            return True
+
+    def remove_watch(self, path: str):
+        """Stop watching a directory"""
+        with self._lock:
+            wd = self._paths.pop(path, None)
+            if wd is None:
+                return
+            self._watches.pop(wd, None)
+            if self.fd is not None:
+                self._libc.inotify_rm_watch(self.fd, wd)
+
+    def watched_paths(self) -> list:
+        with self._lock:
+            return list(self._paths)
+
+    def _read_loop(self):
+        """Read events and dispatch them until stopped"""
+        buffer_size = 64 * 1024
+        while True:
+            try:
+                ready, _, _ = select.select([self.fd, self._stop_read], [], [])
+            except (OSError, ValueError):
+                return
+            if self._stop_read in ready:
+                return
+
+            try:
+                data = os.read(self.fd, buffer_size)
+            except BlockingIOError:
+                continue
+            except OSError:
+                return
+
+            changed = set()
+            overflow = False
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size + name_len
+
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+
+                with self._lock:
+                    path = self._watches.get(wd)
+                    if mask & IN_IGNORED and path is not None:
+                        # Watch removed by the kernel (directory deleted or unmounted)
+                        self._watches.pop(wd, None)
+                        self._paths.pop(path, None)
+                if path is not None:
+                    changed.add(path)
+
+            try:
+                if overflow:
+                    self.callback(None)
+                for path in changed:
+                    self.callback(path)
+            except Exception as e:
+                print(f"Error in inotify callback: {e}")
+
+    def __del__(self):
+        """Cleanup when object is destroyed"""
+        try:
+            self.stop()
+        except:
+            pass  # Ignore errors during cleanup
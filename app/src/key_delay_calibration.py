@@ -0,0 +1,251 @@
+"""
+Key delay calibration for WhisperTux
+Finds the smallest key_delay at which a text field receives typed text intact
+"""
+
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+try:
+    from .uinput_injector import KeyboardInjector
+except ImportError:
+    from uinput_injector import KeyboardInjector
+
+
+# Known strings typed into the test field - runs of shifted and unshifted keys,
+# digits and punctuation, no tabs or newlines (those move focus or submit)
+CALIBRATION_STRINGS = [
+    "The quick brown fox jumps over the lazy dog.",
+    "Pack my box with five dozen liquor jugs!",
+    "HELLO world, 1234 + 5678 = 6912; (ok) [yes] {done}",
+    "MiXeD CaSe ShIfT rUnS: ~!@#$%^&*()_+ <>?\"|",
+    "user@example.com / path\\to\\file 'quoted' `code` -dash",
+]
+
+# Fractions of each event-loop tick the test field spends busy while text is typed into it
+LOAD_LEVELS = (0.0, 0.5, 0.8)
+
+# The settings dialog accepts 1-200 ms
+MIN_KEY_DELAY = 1
+MAX_KEY_DELAY = 200
+
+
+@dataclass
+class CalibrationTrial:
+    """One known string typed at one delay under one load"""
+    key_delay: int
+    load: float
+    expected: str
+    typed: str
+    seconds: float  # time spent typing
+
+    @property
+    def dropped(self) -> int:
+        """Characters that never arrived"""
+        return sum((Counter(self.expected) - Counter(self.typed)).values())
+
+    @property
+    def extra(self) -> int:
+        """Characters that arrived but weren't typed (e.g. a stuck shift)"""
+        return sum((Counter(self.typed) - Counter(self.expected)).values())
+
+    @property
+    def reordered(self) -> bool:
+        """Every character arrived, but not in the order it was typed"""
+        return self.typed != self.expected and self.dropped == 0 and self.extra == 0
+
+    @property
+    def passed(self) -> bool:
+        return self.typed == self.expected
+
+    @property
+    def chars_per_second(self) -> float:
+        return len(self.expected) / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class CalibrationResult:
+    """The smallest passing delay and what it achieves"""
+    key_delay: int
+    chars_per_second: float
+    previous_key_delay: int
+    trials: List[CalibrationTrial] = field(default_factory=list)
+
+    @property
+    def previous_chars_per_second(self) -> float:
+        """Estimated typing rate at the old delay (the delay dominates the per-character cost)"""
+        if self.key_delay <= 0 or self.chars_per_second <= 0:
+            return 0.0
+        per_char = 1.0 / self.chars_per_second - self.key_delay / 1000.0
+        return 1.0 / max(1e-6, per_char + self.previous_key_delay / 1000.0)
+
+
+class KeyDelayCalibrator:
+    """
+    Binary-searches key_delay against a local test field.
+
+    A delay passes when every calibration string arrives in the field exactly - no dropped,
+    extra or reordered characters - at every load level. The field belongs to the caller
+    (the settings window provides a Qt one) and is driven through four thread-safe callbacks,
+    because calibrate() blocks and has to run off the thread that delivers the keystrokes.
+    Assumes a delay that passes keeps passing when made longer.
+    """
+
+    def __init__(self, keyboard: KeyboardInjector,
+                 clear_field: Callable[[], None],
+                 read_field: Callable[[], str],
+                 set_load: Callable[[float], None],
+                 field_focused: Callable[[], bool],
+                 config_manager=None):
+        self.keyboard = keyboard
+        self.clear_field = clear_field
+        self.read_field = read_field
+        self.set_load = set_load
+        self.field_focused = field_focused
+        self.config_manager = config_manager
+
+        self.strings = list(CALIBRATION_STRINGS)
+        self.loads = LOAD_LEVELS
+        self.settle_seconds = 0.3  # no change for this long = the field has everything it will get
+        self.trials: List[CalibrationTrial] = []
+        self.error = None  # why calibrate() returned None
+        self._cancel = threading.Event()  # stops typing after the current character
+        self._focus_lost = False
+
+    def cancel(self):
+        self._cancel.set()
+
+    def focus_lost(self):
+        """Stop typing at once - keystrokes would land in whatever window has focus now"""
+        self._focus_lost = True
+        self._cancel.set()
+
+    def calibrate(self, max_delay: int = MAX_KEY_DELAY,
+                  progress_callback: Optional[Callable[[CalibrationTrial], None]] = None) -> Optional[CalibrationResult]:
+        """
+        Find the smallest passing delay in whole milliseconds.
+
+        The search starts at the keyboard's current delay, doubling it until it passes,
+        then bisects down.
+
+        Returns None if even max_delay loses characters, the field lost focus, typing
+        failed or the run was cancelled - self.error says which.
+        """
+        self._cancel.clear()
+        self._focus_lost = False
+        self.trials = []
+        self.error = None
+        previous = self.keyboard.key_delay
+        max_delay = max(MIN_KEY_DELAY, min(max_delay, MAX_KEY_DELAY))
+        try:
+            # Start from the current delay - it usually passes, and long delays are slow to test
+            low, high = MIN_KEY_DELAY, min(max(MIN_KEY_DELAY, int(round(previous))), max_delay)
+            while not self._passes(high, progress_callback):
+                if self.error is not None:
+                    return None
+                if high >= max_delay:
+                    self.error = f"Characters were lost even at {high} ms"
+                    return None
+                low, high = high + 1, min(high * 2, max_delay)
+            while low < high:
+                mid = (low + high) // 2
+                if self._passes(mid, progress_callback):
+                    high = mid
+                elif self.error is not None:
+                    return None
+                else:
+                    low = mid + 1
+        finally:
+            self.keyboard.key_delay = previous
+            self.set_load(0.0)
+
+        at_result = [t for t in self.trials if t.key_delay == high]
+        chars = sum(len(t.expected) for t in at_result)
+        seconds = sum(t.seconds for t in at_result)
+        return CalibrationResult(
+            key_delay=high,
+            chars_per_second=chars / seconds if seconds > 0 else 0.0,
+            previous_key_delay=previous,
+            trials=list(self.trials),
+        )
+
+    def save(self, result: CalibrationResult) -> bool:
+        """Store the calibrated delay as the new key_delay setting"""
+        if not self.config_manager:
+            return False
+        self.config_manager.set_setting('key_delay', result.key_delay)
+        return self.config_manager.save_config()
+
+    def _passes(self, key_delay: int, progress_callback) -> bool:
+        """Type every string under every load; stop at the first failure"""
+        for load in self.loads:
+            self.set_load(load)
+            for text in self.strings:
+                trial = self._run_trial(key_delay, load, text)
+                if trial is None:
+                    return False
+                self.trials.append(trial)
+                if progress_callback:
+                    progress_callback(trial)
+                if not trial.passed:
+                    return False
+        return True
+
+    def _run_trial(self, key_delay: int, load: float, text: str) -> Optional[CalibrationTrial]:
+        if self._stopped():
+            return None
+        if not self.field_focused():
+            self.error = "The test field lost keyboard focus"
+            return None
+
+        self.clear_field()
+        if not self._wait_for(lambda: self.read_field() == ""):
+            self.error = "The test field could not be cleared"
+            return None
+
+        self.keyboard.key_delay = key_delay
+        started = time.perf_counter()
+        if not self.keyboard.type_text(text, cancel=self._cancel):
+            if not self._stopped():
+                self.error = f"Typing failed on the {self.keyboard.name} keyboard"
+            return None
+        seconds = time.perf_counter() - started
+
+        typed = self._wait_until_settled(len(text))
+        return CalibrationTrial(key_delay, load, text, typed, seconds)
+
+    def _stopped(self) -> bool:
+        """Whether the run was cancelled or lost focus, setting self.error to which"""
+        if not self._cancel.is_set():
+            return False
+        self.error = "The test field lost keyboard focus" if self._focus_lost else "Calibration cancelled"
+        return True
+
+    def _wait_until_settled(self, expected_length: int) -> str:
+        """The field's text once it has all characters or stopped changing"""
+        typed = self.read_field()
+        changed_at = time.monotonic()
+        while not self._cancel.is_set():
+            if len(typed) >= expected_length:
+                # Anything extra would arrive right behind the last character
+                time.sleep(0.05)
+                return self.read_field()
+            if time.monotonic() - changed_at > self.settle_seconds:
+                return typed
+            time.sleep(0.01)
+            current = self.read_field()
+            if current != typed:
+                typed = current
+                changed_at = time.monotonic()
+        return typed
+
+    def _wait_for(self, condition: Callable[[], bool], timeout: float = 2.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if condition():
+                return True
+            time.sleep(0.01)
+        return False
@@ -0,0 +1,299 @@
+"""
+Model index for WhisperTux
+Caches the results of scanning model directories and keeps them up to date with inotify
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from .inotify_watcher import InotifyWatcher
+except ImportError:
+    from inotify_watcher import InotifyWatcher
+
+
+# Stock model names looked up as ggml-{name}.en.bin / ggml-{name}.bin
+STOCK_MODELS = ['tiny', 'base', 'small', 'medium', 'large', 'large-v2', 'large-v3', 'large-v3-turbo']
+
+# large-v3-turbo also ships under alternate names (used by dsnote, etc.)
+TURBO_FILENAMES = [
+    "ggml-large-v3-turbo.bin",
+    "ggml-large-v3-turbo.en.bin",
+    "multilang_whisper_large3_turbo.ggml",
+    "whisper_large3_turbo.ggml",
+    "large-v3-turbo.ggml",
+    "ggml-large-v3-turbo.ggml",
+]
+
+# Standalone .bin files with these prefixes are stock models, not finetunes
+_STANDARD_PREFIXES = ['ggml-tiny', 'ggml-base', 'ggml-small', 'ggml-medium', 'ggml-large']
+
+INDEX_VERSION = 1
+
+
+class ModelIndex:
+    """
+    Remembers what each model directory contains.
+
+    Every configured directory ("root") is scanned once with os.scandir, down to the same
+    depth the finetune scan has always used, and the result is stored together with the
+    modification time of every directory visited. Adding, removing or renaming a model
+    changes the mtime of the directory it lives in, so a cached root is still valid if
+    none of its directory mtimes changed. With inotify available the index watches those
+    directories and only rescans a root after an event; otherwise it re-stats them on each
+    query, which is still far cheaper than probing every candidate filename.
+
+    The index is persisted to disk so the first model list after startup comes from the
+    cache rather than a full scan.
+    """
+
+    def __init__(self, cache_file: Optional[Path] = None, watch: bool = True, max_depth: int = 3):
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.max_depth = max_depth
+
+        self._lock = threading.Lock()
+        self._roots: Dict[str, dict] = {}
+        self._validated = set()  # roots checked against the filesystem since startup
+        self._dirty = set()      # roots with pending inotify events
+        self._dir_roots: Dict[str, set] = {}  # watched directory -> roots containing it
+
+        self._load_cache()
+
+        self.watcher = None
+        if watch:
+            watcher = InotifyWatcher(self._on_directory_changed)
+            if watcher.start():
+                self.watcher = watcher
+            else:
+                print("WARNING: inotify unavailable, model directories will be re-checked on each scan")
+
+    @property
+    def watching(self) -> bool:
+        return self.watcher is not None
+
+    def get_roots(self, model_dirs: List[str]) -> List[dict]:
+        """Up-to-date index entries for the given model directories, in the same order"""
+        entries = []
+        changed = False
+        with self._lock:
+            for model_dir in model_dirs:
+                root = str(Path(model_dir).expanduser())
+                entry, rescanned = self._get_root(root)
+                changed = changed or rescanned
+                entries.append(entry)
+        if changed:
+            self._save_cache()
+        return entries
+
+    def find_model_file(self, model_name: str, model_dirs: List[str]) -> Optional[Path]:
+        """
+        Look a model up by internal name (e.g. "base", "base.en", "large-v3-turbo")
+
+        Directories are searched in order with the same precedence as the original per-file
+        probing: alternate turbo names, then the English-only/multilingual stock files, then
+        a generic ggml-model.bin in a directory whose path contains the model name.
+        """
+        for model_dir, entry in zip(model_dirs, self.get_roots(model_dirs)):
+            if not entry['exists']:
+                continue
+
+            if model_name == 'large-v3-turbo' and entry['turbo']:
+                return Path(entry['turbo'])
+
+            stock = entry['stock']
+            if model_name.endswith('.en'):
+                candidates = [model_name]
+            else:
+                candidates = [f"{model_name}.en", model_name]
+            for candidate in candidates:
+                if candidate in stock:
+                    return Path(stock[candidate])
+
+            if entry['generic'] and model_name in str(Path(model_dir).expanduser()):
+                return Path(entry['generic'])
+
+        return None
+
+    def invalidate(self, model_dir: Optional[str] = None):
+        """Force a rescan of one directory, or of every directory if none is given"""
+        with self._lock:
+            if model_dir is None:
+                self._dirty.update(self._roots)
+            else:
+                self._dirty.add(str(Path(model_dir).expanduser()))
+
+    def close(self):
+        """Stop watching directories"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+    def _get_root(self, root: str):
+        """Return (entry, rescanned) for a root, rescanning it if it may be stale. Lock held."""
+        entry = self._roots.get(root)
+
+        if entry is not None and root not in self._dirty:
+            if self.watching and root in self._validated and entry['exists']:
+                return entry, False
+            if root not in self._validated:
+                # Loaded from the cache - start watching before checking it is still current
+                self._watch_root(root, entry)
+            if self._is_current(entry, root):
+                self._validated.add(root)
+                return entry, False
+
+        self._dirty.discard(root)
+        entry = self._scan_root(root)
+        self._roots[root] = entry
+        self._watch_root(root, entry)
+        # Anything that changed while we were scanning and before the watches were in place
+        if not self._is_current(entry, root):
+            entry = self._scan_root(root)
+            self._roots[root] = entry
+            self._watch_root(root, entry)
+        self._validated.add(root)
+        return entry, True
+
+    @staticmethod
+    def _is_current(entry: dict, root: str) -> bool:
+        """Check the stored directory mtimes against the filesystem"""
+        if not entry['exists']:
+            return not os.path.isdir(root)
+        for path, mtime in entry['dirs'].items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _scan_root(self, root: str) -> dict:
+        """Scan one model directory"""
+        entry = {
+            'exists': False,
+            'dirs': {},        # directory -> st_mtime_ns
+            'stock': {},       # ggml-{name}.bin files by name ("base", "base.en") -> path
+            'turbo': None,     # first alternate large-v3-turbo file
+            'generic': None,   # ggml-model.bin directly in the root
+            'finetunes': [],   # [display name, path] in discovery order, before de-duplication
+        }
+
+        listing = self._list_dir(root, entry['dirs'])
+        if listing is None:
+            return entry
+        entry['exists'] = True
+
+        files = {name for name, is_dir, is_file in listing if is_file}
+        for filename in files:
+            if filename.startswith('ggml-') and filename.endswith('.bin'):
+                entry['stock'][filename[5:-4]] = os.path.join(root, filename)
+        for filename in TURBO_FILENAMES:
+            if filename in files:
+                entry['turbo'] = os.path.join(root, filename)
+                break
+        if "ggml-model.bin" in files:
+            entry['generic'] = os.path.join(root, "ggml-model.bin")
+
+        self._scan_for_finetunes(root, listing, entry, self.max_depth)
+        return entry
+
+    def _scan_for_finetunes(self, base_dir: str, listing: list, entry: dict, max_depth: int):
+        """Find finetune models (.bin files) below a directory"""
+        if max_depth <= 0:
+            return
+
+        for name, is_dir, is_file in listing:
+            path = os.path.join(base_dir, name)
+            if is_dir:
+                # A directory containing ggml-model.bin is a finetune named after the directory
+                sub_listing = self._list_dir(path, entry['dirs'])
+                if sub_listing is None:
+                    continue
+                if any(sub_name == "ggml-model.bin" and sub_is_file
+                       for sub_name, _, sub_is_file in sub_listing):
+                    entry['finetunes'].append([f"{name} - fine tune", os.path.join(path, "ggml-model.bin")])
+
+                self._scan_for_finetunes(path, sub_listing, entry, max_depth - 1)
+
+            elif is_file and name.endswith('.bin'):
+                # Standalone .bin files that look like finetunes, skipping stock model files
+                stem = name[:-4]
+                stem_lower = stem.lower()
+                is_standard = any(stem_lower.startswith(p) for p in _STANDARD_PREFIXES)
+                is_finetune = ('ggml' in stem_lower or 'fine-tune' in stem_lower or
+                               'finetune' in stem_lower or 'fine_tune' in stem_lower)
+                if not is_standard and is_finetune:
+                    entry['finetunes'].append([f"{stem} - fine tune", path])
+
+    @staticmethod
+    def _list_dir(path: str, dirs: dict) -> Optional[list]:
+        """List a directory as (name, is_dir, is_file) tuples and record its mtime"""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            listing = []
+            with os.scandir(path) as it:
+                for item in it:
+                    try:
+                        listing.append((item.name, item.is_dir(), item.is_file()))
+                    except OSError:
+                        continue
+        except OSError:
+            return None  # Missing or unreadable directory
+        dirs[path] = mtime
+        return listing
+
+    def _watch_root(self, root: str, entry: dict):
+        """Watch every directory of a freshly scanned root. Lock held."""
+        if self.watcher is None:
+            return
+        for path, roots in list(self._dir_roots.items()):
+            if root in roots and path not in entry['dirs']:
+                roots.discard(root)
+                if not roots:
+                    del self._dir_roots[path]
+                    self.watcher.remove_watch(path)
+        for path in entry['dirs']:
+            self._dir_roots.setdefault(path, set()).add(root)
+            self.watcher.add_watch(path)
+
+    def _on_directory_changed(self, path: Optional[str]):
+        """inotify callback - mark the roots containing a changed directory for rescanning"""
+        with self._lock:
+            if path is None:
+                self._dirty.update(self._roots)
+            else:
+                self._dirty.update(self._dir_roots.get(path, ()))
+
+    def _load_cache(self):
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self._roots = data.get('roots', {})
+        except Exception as e:
+            print(f"Warning: Could not load model index: {e}")
+
+    def _save_cache(self):
+        if not self.cache_file:
+            return
+        with self._lock:
+            data = {'version': INDEX_VERSION, 'roots': self._roots}
+            tmp_file = self.cache_file.with_name(self.cache_file.name + '.tmp')
+            try:
+                with open(tmp_file, 'w') as f:
+                    json.dump(data, f)
+                os.replace(tmp_file, self.cache_file)
+            except Exception as e:
+                print(f"Warning: Could not save model index: {e}")
+
+    def __del__(self):
+        """Cleanup when object is destroyed"""
+        try:
+            self.close()
+        except:
+            pass  # Ignore errors during cleanup
@@ -0,0 +1,76 @@
+"""
+Resampler for WhisperTux
+Streaming polyphase sample-rate conversion from the device rate to whisper's 16 kHz
+"""
+
+from math import gcd
+
+import numpy as np
+from scipy.signal import firwin, upfirdn
+
+
+class PolyphaseResampler:
+    """
+    Block-wise polyphase resampler with state carried across blocks.
+
+    Uses the same anti-aliasing filter as scipy.signal.resample_poly (Kaiser window,
+    beta 5, 10 zero crossings per side) and runs it through scipy.signal.upfirdn.
+    Each call filters the new block together with a short history of earlier input,
+    starting the history on a sample whose phase is known, so the output is identical
+    to resampling the whole recording at once apart from the last few samples of
+    filter delay, which arrive with the next block.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int = 16000, window=('kaiser', 5.0)):
+        input_rate, output_rate = int(round(input_rate)), int(round(output_rate))
+        divisor = gcd(input_rate, output_rate)
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.up = output_rate // divisor
+        self.down = input_rate // divisor
+
+        max_rate = max(self.up, self.down)
+        half_len = 10 * max_rate
+        self.taps = (firwin(2 * half_len + 1, 1.0 / max_rate, window=window) * self.up).astype(np.float32)
+
+        # Outputs before this index are the filter warming up (its group delay)
+        self._delay = half_len // self.down
+        # Input samples of history needed to compute the next output
+        self._history_len = -(-len(self.taps) // self.up) + 1
+        self.reset()
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down
+
+    def reset(self):
+        """Forget all state, e.g. when a new stream starts"""
+        self._history = np.zeros(0, dtype=np.float32)
+        self._history_start = 0          # absolute input index of _history[0], always a multiple of down
+        self._next_output = self._delay  # absolute index of the next output sample to emit
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Resample one block of mono samples, returning whatever output is now complete"""
+        if self.passthrough:
+            return np.asarray(block, dtype=np.float32)
+
+        x = np.concatenate((self._history, np.asarray(block, dtype=np.float32)))
+        start = self._history_start
+        base = start * self.up // self.down                    # absolute index of upfirdn's first output
+        last = (len(x) * self.up - 1) // self.down             # last output with all its input available
+        first = self._next_output - base
+
+        output = np.zeros(0, dtype=np.float32)
+        if first <= last:
+            # upfirdn only needs input up to the last output we keep
+            needed = last * self.down // self.up + 1
+            output = upfirdn(self.taps, x[:needed], self.up, self.down)[first:last + 1].astype(np.float32)
+            self._next_output = base + last + 1
+
+        # Keep enough history for the next block, starting on a multiple of `down` so the
+        # phase of upfirdn's output grid stays aligned with the absolute output index
+        end = start + len(x)
+        keep_from = max(start, (end - self._history_len) // self.down * self.down)
+        self._history = x[keep_from - start:]
+        self._history_start = keep_from
+        return output
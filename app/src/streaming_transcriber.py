@@ -0,0 +1,246 @@
+"""
+Streaming transcriber for WhisperTux
+Transcribes audio while recording and commits stable text using local agreement
+"""
+
+import difflib
+import re
+import threading
+import numpy as np
+from typing import Optional, Callable, List, Tuple
+
+try:
+    from .audio_buffer import GrowableAudioBuffer, to_float32
+except ImportError:
+    from audio_buffer import GrowableAudioBuffer, to_float32
+
+
+_ANNOTATION = re.compile(r'\[[^\]]*\]|\([^)]*\)')
+
+
+def _normalize_word(word: str) -> str:
+    """Compare words without case or surrounding punctuation"""
+    return re.sub(r'^\W+|\W+$', '', word.lower())
+
+
+class StreamingTranscriber:
+    """
+    Re-decodes a rolling audio buffer during recording.
+
+    A word is committed once two consecutive decodes agree on it (LocalAgreement-2),
+    and audio is trimmed at the end of fully committed segments, so the buffer stays
+    short no matter how long the dictation runs. On stop only the uncommitted tail
+    has to be decoded.
+
+    Each decode re-transcribes audio whose words are already committed, and may split
+    or spell them differently, so the new words are found by aligning the decode with
+    the committed words rather than by counting them.
+    """
+
+    def __init__(self, whisper_manager, sample_rate: int = 16000, step_seconds: float = 1.0,
+                 trim_seconds: float = 12.0, max_buffer_seconds: float = 25.0,
+                 commit_callback: Optional[Callable[[str], None]] = None):
+        self.whisper_manager = whisper_manager
+        self.sample_rate = sample_rate
+
+        # Decode the buffer once this much new audio has arrived
+        self.step_seconds = step_seconds
+        # Start trimming committed segments once the buffer is longer than this
+        self.trim_seconds = trim_seconds
+        # Hard limit - force a commit at a segment boundary to stay inside whisper's 30s window
+        self.max_buffer_seconds = max_buffer_seconds
+
+        # Called with newly committed text from the worker thread
+        self.commit_callback = commit_callback
+
+        self._lock = threading.Lock()
+        self._new_data = threading.Event()
+        self._stop = threading.Event()
+        self._worker = None
+        self._reset()
+
+    def _reset(self):
+        self._pending: List[np.ndarray] = []   # chunks not yet moved into the buffer
+        self._buffer = GrowableAudioBuffer(self.sample_rate, initial_seconds=self.max_buffer_seconds + 5.0)
+        self._samples_since_decode = 0
+        self._committed: List[str] = []        # all committed words
+        self._buffer_words: List[str] = []     # committed words spoken in the current buffer, as last decoded
+        self._prior_words: List[str] = []      # recent words of audio already trimmed, for the prompt
+        self._hypothesis: List[str] = []       # uncommitted words from the last decode
+        self.decode_count = 0
+
+    def start(self):
+        """Reset state and start the background decode loop"""
+        self.stop()
+        self._reset()
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def add_audio(self, chunk: np.ndarray):
+        """Queue a chunk of captured audio (safe to call from the audio callback)"""
+        with self._lock:
+            self._pending.append(chunk)
+        self._new_data.set()
+
+    def stop(self):
+        """Stop the decode loop without producing a final result"""
+        self._stop.set()
+        self._new_data.set()
+        if self._worker and self._worker.is_alive():
+            self._worker.join()
+        self._worker = None
+
+    def finish(self) -> str:
+        """Stop streaming, decode the uncommitted tail and return the full transcription"""
+        self.stop()
+        self._drain_pending()
+
+        tail_words: List[str] = []
+        if len(self._buffer) > 0:
+            segments = self.whisper_manager.transcribe_segments(
+                self._buffer.view(), self.sample_rate, prompt=self._prompt()
+            )
+            if segments is None:
+                # Decode failed - fall back to the last hypothesis we have
+                tail_words = self._hypothesis
+            else:
+                words, _ = self._split_words(segments)
+                tail_words = words[self._committed_end(words):]
+
+        text = ' '.join(self._committed + tail_words)
+        print(f"Streaming transcription finished after {self.decode_count} partial decodes, "
+              f"{len(self._committed)} words committed early, {len(tail_words)} in tail")
+        return text.strip()
+
+    def get_committed_text(self) -> str:
+        """Text that has already been confirmed"""
+        return ' '.join(self._committed)
+
+    def _run(self):
+        """Decode the buffer each time enough new audio has arrived"""
+        step_samples = int(self.step_seconds * self.sample_rate)
+        while not self._stop.is_set():
+            # add_audio() and stop() both set the event, so no timeout is needed
+            self._new_data.wait()
+            self._new_data.clear()
+            if self._stop.is_set():
+                break
+
+            self._drain_pending()
+            if self._samples_since_decode < step_samples:
+                continue
+
+            self._samples_since_decode = 0
+            try:
+                self._process_iteration()
+            except Exception as e:
+                print(f"Streaming decode error: {e}")
+                self._stop.wait(self.step_seconds)  # back off, but wake at once on stop
+
+    def _drain_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for chunk in pending:
+            self._buffer.append(to_float32(chunk))
+            self._samples_since_decode += len(chunk)
+
+    def _process_iteration(self):
+        """One local-agreement step over the current buffer"""
+        segments = self.whisper_manager.transcribe_segments(
+            self._buffer.view(), self.sample_rate, prompt=self._prompt()
+        )
+        if segments is None:
+            return
+        self.decode_count += 1
+
+        words, segment_ends = self._split_words(segments)
+        start = self._committed_end(words)
+        new_words = words[start:]
+
+        # Commit the prefix this decode shares with the previous one
+        agreed = 0
+        for previous, current in zip(self._hypothesis, new_words):
+            if _normalize_word(previous) != _normalize_word(current):
+                break
+            agreed += 1
+        self._commit(new_words[:agreed])
+        self._hypothesis = new_words[agreed:]
+
+        # From here on the buffer's committed words are compared as this decode spelled them
+        committed_end = start + agreed
+        self._buffer_words = words[:committed_end]
+        self._trim(segments, segment_ends, words, committed_end)
+
+    def _committed_end(self, words: List[str]) -> int:
+        """Index in a decode's words just past the committed words of the buffer"""
+        committed = [_normalize_word(w) for w in self._buffer_words]
+        current = [_normalize_word(w) for w in words]
+        if current[:len(committed)] == committed:
+            return len(committed)
+
+        # The decode re-split or re-spelled committed words - align on the words that match
+        matcher = difflib.SequenceMatcher(None, committed, current, autojunk=False)
+        blocks = [block for block in matcher.get_matching_blocks() if block.size]
+        if not blocks:
+            return min(len(committed), len(current))
+        last = blocks[-1]
+        # Committed words after the last match were changed by this decode - skip as many
+        unmatched = len(committed) - (last.a + last.size)
+        return min(len(current), last.b + last.size + unmatched)
+
+    def _commit(self, words: List[str]):
+        if not words:
+            return
+        self._committed.extend(words)
+        if self.commit_callback:
+            self.commit_callback(' '.join(words))
+
+    def _trim(self, segments: List[Tuple[float, float, str]], segment_ends: List[int],
+              words: List[str], committed_end: int):
+        """Drop audio belonging to segments whose words are all committed"""
+        buffer_seconds = len(self._buffer) / self.sample_rate
+        if buffer_seconds < self.trim_seconds or len(segments) < 2:
+            return
+
+        # Never cut into the last segment - it may still be growing
+        cut = None
+        for index in range(len(segments) - 1):
+            if segment_ends[index] <= committed_end:
+                cut = index
+
+        if cut is None and buffer_seconds >= self.max_buffer_seconds:
+            # Nothing agreed on for too long - accept everything up to the last boundary
+            cut = len(segments) - 2
+            self._commit(words[committed_end:segment_ends[cut]])
+            self._hypothesis = words[segment_ends[cut]:]
+            committed_end = segment_ends[cut]
+            self._buffer_words = words[:committed_end]
+
+        if cut is None:
+            return
+
+        cut_sample = int(segments[cut][1] * self.sample_rate)
+        if cut_sample <= 0 or cut_sample >= len(self._buffer):
+            return
+
+        self._buffer.discard_front(cut_sample)
+        self._prior_words = (self._prior_words + words[:segment_ends[cut]])[-50:]
+        self._buffer_words = words[segment_ends[cut]:committed_end]
+
+    def _prompt(self) -> Optional[str]:
+        """Recent committed text that precedes the buffer, to keep context across trims"""
+        if not self._prior_words:
+            return None
+        return ' '.join(self._prior_words)
+
+    @staticmethod
+    def _split_words(segments: List[Tuple[float, float, str]]) -> Tuple[List[str], List[int]]:
+        """Flatten segments into words and record the word index where each segment ends"""
+        words: List[str] = []
+        segment_ends: List[int] = []
+        for _, _, text in segments:
+            # Drop non-speech annotations such as [BLANK_AUDIO] or (music)
+            words.extend(_ANNOTATION.sub(' ', text).split())
+            segment_ends.append(len(words))
+        return words, segment_ends
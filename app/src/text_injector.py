@@ -1,12 +1,50 @@
 """
 Text injector for WhisperTux
-Handles injecting transcribed text into other applications using ydotool
+Handles injecting transcribed text into other applications using uinput, ydotoold or ydotool
 """
 
+import difflib
+import os
+import re
+import shutil
 import subprocess
+import threading
 import time
+from collections import deque
+import numpy as np
 import pyperclip
-from typing import Optional
+from typing import Optional, Callable, Dict, List
+
+try:
+    from .uinput_injector import UInputInjector, KEY_LEFTCTRL, KEY_V, SHIFT
+    from .ydotoold_client import YdotooldInjector
+except ImportError:
+    from uinput_injector import UInputInjector, KEY_LEFTCTRL, KEY_V, SHIFT
+    from ydotoold_client import YdotooldInjector
+
+
+# Paste shortcuts as keycodes (pressed in order, released in reverse)
+PASTE_SHORTCUTS = {
+    'ctrl+v': [KEY_LEFTCTRL, KEY_V],
+    'ctrl+shift+v': [KEY_LEFTCTRL, SHIFT, KEY_V],  # terminals
+}
+
+# Injection strategies, as recorded in the timings
+STRATEGY_TYPE = 'type'
+STRATEGY_PASTE = 'paste'
+STRATEGY_STREAM = 'stream'
+
+# Non-speech annotations whisper puts in segments, such as [BLANK_AUDIO] or (music)
+_ANNOTATION = re.compile(r'\[[^\]]*\]|\([^)]*\)')
+
+# Text that attaches to the previous word without a space
+_NO_SPACE_BEFORE = re.compile(r'^[.,;:!?%)\]}]')
+
+# Longest wait for the focused application to read a paste before the clipboard is restored anyway
+PASTE_READ_TIMEOUT = 10.0
+
+# Longest close() waits for a pending clipboard restore
+CLOSE_RESTORE_WAIT = 2.0
 
 
 class TextInjector:
@@ -19,14 +57,61 @@ class TextInjector:
         # Initialize settings from config if available
         if self.config_manager:
             self.key_delay = self.config_manager.get_setting('key_delay', 15)
+            self.chunk_chars = self.config_manager.get_setting('injection_chunk_chars', 64)
+            self.backend = self.config_manager.get_setting('injection_backend', 'auto')
+            ydotool_socket = self.config_manager.get_setting('ydotool_socket', '')
+            self.paste_threshold = self.config_manager.get_setting('paste_threshold_chars', 200)
+            self.paste_shortcut = self.config_manager.get_setting('paste_shortcut', 'ctrl+v')
+            self.clipboard_restore_delay = self.config_manager.get_setting('clipboard_restore_delay_ms', 300)
         else:
             self.key_delay = 15  # Default key delay in milliseconds
-
-        # Check if ydotool is available
+            self.chunk_chars = 64  # Characters typed per call, for progress reporting
+            self.backend = 'auto'
+            ydotool_socket = ''
+            self.paste_threshold = 200  # Paste texts at least this long instead of typing them (0 = always type)
+            self.paste_shortcut = 'ctrl+v'
+            self.clipboard_restore_delay = 300  # Milliseconds after a paste before the old clipboard is put back (no wl-copy)
+
+        self.set_paste_strategy(self.paste_threshold, self.paste_shortcut)
+
+        # Clipboard contents from before our first paste, put back once the paste is done.
+        # On Wayland a one-shot wl-copy serves the paste and its exit says the paste was read.
+        self._restore_lock = threading.Lock()
+        self._restore = None  # (cancel event, thread) of the pending restore
+        self._saved_clipboard = None
+        self._paste_once = bool(os.environ.get('WAYLAND_DISPLAY')) and shutil.which('wl-copy') is not None
+
+        # Recent (characters, seconds) per strategy
+        self.timings: Dict[str, "deque"] = {
+            STRATEGY_TYPE: deque(maxlen=100),
+            STRATEGY_PASTE: deque(maxlen=100),
+            STRATEGY_STREAM: deque(maxlen=100),
+        }
+        self.last_strategy = None
+
+        # Set by cancel() to stop typing between characters
+        self._cancel = threading.Event()
+        self._active_session = None
+
+        # Persistent keyboard - our own uinput device, or one connection to ydotoold.
+        # Either way no process is spawned per utterance.
+        self.keyboard = None
+        if self.backend in ('auto', 'uinput'):
+            injector = UInputInjector(self.key_delay)
+            if injector.open():
+                self.keyboard = injector
+            elif self.backend == 'uinput':
+                print("WARNING: Could not create a uinput keyboard, falling back to ydotool")
+        if self.keyboard is None:
+            client = YdotooldInjector(self.key_delay, ydotool_socket or None)
+            if client.open():
+                self.keyboard = client
+
+        # The ydotool CLI types whatever the key table can't, or everything if neither keyboard works
         self.ydotool_available = self._check_ydotool()
 
-        if not self.ydotool_available:
-            print("ydotool not found - text injection will use clipboard fallback")
+        if self.keyboard is None and not self.ydotool_available:
+            print("Neither uinput nor ydotool available - text injection will use clipboard fallback")
 
     def _check_ydotool(self) -> bool:
         """Check if ydotool is available on the atiystem"""
@@ -39,16 +124,21 @@ class TextInjector:
         except:
             return False
 
-    def inject_text(self, text: str) -> bool:
+    def inject_text(self, text: str, progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
         """
         Inject text into the currently focused application.
 
-        Always copies to clipboard first as a backup, then attempts ydotool
-        injection for direct text entry. If ydotool fails or no focused text
-        field exists, the text is still available via Ctrl+V.
+        Texts of at least paste_threshold characters are pasted: they go on the clipboard,
+        a paste shortcut is sent, and the previous clipboard is restored shortly after.
+        Shorter texts are copied to clipboard as a backup, then typed with the uinput
+        keyboard or ydotoold (or the ydotool CLI). If typing fails or no focused text field
+        exists, the text is still available via Ctrl+V.
+
+        This blocks while typing, so call it from a worker thread.
 
         Args:
             text: Text to inject
+            progress_callback: Called with (characters typed, total characters) after each chunk
 
         Returns:
             True if successful, False otherwise
@@ -56,24 +146,52 @@ class TextInjector:
         if not text or text.strip() == "":
             print("No text to inject (empty or whitespace)")
             return True
+        self._cancel.clear()
 
         # Preprocess the text to handle unwanted carriage returns and speech-to-text corrections
         processed_text = self._preprocess_text(text)
 
+        strategy = self._choose_strategy(processed_text)
+        if strategy == STRATEGY_PASTE:
+            started = time.perf_counter()
+            success = self._inject_via_clipboard(processed_text)
+            if success:
+                self._record_timing(STRATEGY_PASTE, len(processed_text), time.perf_counter() - started)
+                if progress_callback:
+                    progress_callback(len(processed_text), len(processed_text))
+            return success
+
         try:
+            # A paste still waiting to restore the clipboard is superseded by the backup copy
+            self._cancel_clipboard_restore()
+
             # Always copy to clipboard first as a backup
-            # This ensures text is never lost even if ydotool injection fails
+            # This ensures text is never lost even if typing fails
             # (e.g., no focused text field, cursor not in an input, etc.)
             self._copy_to_clipboard(processed_text)
 
-            # Then try ydotool for direct text entry if available
-            if self.ydotool_available:
-                success = self._inject_via_ydotool(processed_text)
-                if not success:
-                    print("ydotool injection failed - text is available in clipboard (Ctrl+V)")
+            # Then type it for direct text entry if we can
+            if self.keyboard is not None or self.ydotool_available:
+                total = len(processed_text)
+                typed = 0
+                success = True
+                started = time.perf_counter()
+                for chunk in self._split_for_typing(processed_text, self.chunk_chars):
+                    if self._cancel.is_set() or not self._type_chunk(chunk):
+                        success = False
+                        break
+                    typed += len(chunk)
+                    if progress_callback:
+                        progress_callback(typed, total)
+                if success:
+                    self._record_timing(STRATEGY_TYPE, total, time.perf_counter() - started)
+                elif self._cancel.is_set():
+                    print(f"Typing cancelled after {typed} of {total} chars - text is available in clipboard")
+                else:
+                    print("Text injection failed - text is available in clipboard (Ctrl+V)")
                 return success
             else:
-                # ydotool not available - clipboard is the only option
+                # Nothing to type with - clipboard is the only option
                 print("Text copied to clipboard - paste with Ctrl+V")
                 return True
 
@@ -81,6 +199,83 @@ class TextInjector:
             print(f"Text injection failed: {e} - text may still be in clipboard")
             return False
 
+    def begin_incremental(self) -> "IncrementalInjection":
+        """Start an utterance that is typed piece by piece as it is transcribed"""
+        return IncrementalInjection(self)
+
+    def cancel(self):
+        """Stop the text being typed now, including the rest of a streamed utterance"""
+        self._cancel.set()
+        session = self._active_session
+        if session is not None:
+            session.cancel()
+        print("Typing cancelled")
+
+    def _choose_strategy(self, text: str) -> str:
+        """Paste long texts if a paste shortcut can be sent, type everything else"""
+        if self.paste_threshold > 0 and len(text) >= self.paste_threshold:
+            if self.keyboard is not None or self.ydotool_available:
+                return STRATEGY_PASTE
+        return STRATEGY_TYPE
+
+    def set_key_delay(self, key_delay: float):
+        """Change the delay between keystrokes, including on the open keyboard"""
+        self.key_delay = key_delay
+        if self.keyboard is not None:
+            self.keyboard.key_delay = key_delay
+
+    def set_paste_strategy(self, threshold: int, shortcut: str = 'ctrl+v'):
+        """Paste texts of at least threshold characters (0 = always type) with the given shortcut"""
+        if shortcut not in PASTE_SHORTCUTS:
+            print(f"WARNING: Unknown paste shortcut '{shortcut}', using ctrl+v")
+            shortcut = 'ctrl+v'
+        self.paste_threshold = max(0, int(threshold))
+        self.paste_shortcut = shortcut
+
+    def _record_timing(self, strategy: str, chars: int, seconds: float):
+        """Remember how long an injection took and log it against recent ones of the same strategy"""
+        self.last_strategy = strategy
+        history = self.timings[strategy]
+        history.append((chars, seconds))
+        rates = np.array([c / s for c, s in history if s > 0])
+        rate_text = f", median {np.median(rates):.0f} chars/s over {len(rates)}" if len(rates) else ""
+        print(f"Injected {chars} chars by {strategy} in {seconds * 1000:.1f} ms{rate_text}")
+
+    def get_timings(self) -> Dict[str, dict]:
+        """Summary of recent injections per strategy"""
+        summary = {}
+        for strategy, history in self.timings.items():
+            if not history:
+                continue
+            seconds = np.array([s for _, s in history])
+            chars = np.array([c for c, _ in history])
+            summary[strategy] = {
+                'count': len(history),
+                'median_ms': float(np.median(seconds) * 1000),
+                'max_ms': float(seconds.max() * 1000),
+                'chars_per_second': float(chars.sum() / seconds.sum()) if seconds.sum() > 0 else 0.0,
+            }
+        return summary
+
+    @staticmethod
+    def _split_for_typing(text: str, chunk_chars: int) -> List[str]:
+        """Split text into chunks of roughly chunk_chars, breaking after whitespace"""
+        if chunk_chars <= 0 or len(text) <= chunk_chars:
+            return [text]
+
+        chunks = []
+        start = 0
+        while start < len(text):
+            end = min(start + chunk_chars, len(text))
+            if end < len(text):
+                # Prefer to break just after the last space in the window
+                space = text.rfind(' ', start, end)
+                if space > start:
+                    end = space + 1
+            chunks.append(text[start:end])
+            start = end
+        return chunks
+
     def _preprocess_text(self, text: str) -> str:
         """
         Preprocess text to handle common speech-to-text corrections and remove unwanted line breaks
@@ -178,6 +373,19 @@ class TextInjector:
             print(f"Warning: Failed to copy to clipboard: {e}")
             return False
 
+    def _type_chunk(self, chunk: str) -> bool:
+        """Type one chunk with the persistent keyboard, or ydotool for characters it has no key for"""
+        if self.keyboard is not None and self.keyboard.can_type(chunk) and self._keyboard_ready():
+            return self.keyboard.type_text(chunk, cancel=self._cancel)
+        if self.ydotool_available:
+            return self._inject_via_ydotool(chunk)
+        print("ERROR: Text can't be typed by the virtual keyboard and ydotool is not available")
+        return False
+
+    def _keyboard_ready(self) -> bool:
+        """The keyboard is open, reconnecting first if ydotoold went away earlier"""
+        return self.keyboard.is_open or self.keyboard.open()
+
     def _inject_via_ydotool(self, text: str) -> bool:
         """Inject text using ydotool with configurable --key-delay and raw text (no escaping)"""
         try:
@@ -209,56 +417,311 @@ class TextInjector:
     def _inject_via_clipboard(self, text: str) -> bool:
         """Inject text using clipboard + paste key combination"""
         try:
-            # Save current clipboard content
-            try:
-                original_clipboard = pyperclip.paste()
-            except:
-                original_clipboard = ""
+            # Save current clipboard content - unless an earlier paste is still waiting to
+            # restore it, in which case the clipboard holds our own text
+            original_clipboard = self._cancel_clipboard_restore()
+            if original_clipboard is None:
+                try:
+                    original_clipboard = pyperclip.paste()
+                except:
+                    original_clipboard = ""
 
-            # Set new clipboard content
-            pyperclip.copy(text)
+            # Set new clipboard content - served once, so we learn when the paste was read
+            owner = self._copy_paste_once(text)
+            if owner is None:
+                pyperclip.copy(text)
 
             # Small delay to ensure clipboard is set
             time.sleep(0.1)
-
-            # Paste using ydotool Ctrl+V (if ydotool is available)
-            if self.ydotool_available:
-                # Use ydotool to send Ctrl+V
+            if owner is not None and owner.poll() is not None:
+                # Read before the shortcut was sent (a clipboard manager) - the paste itself
+                # would find an empty clipboard, so put a normal copy back and use the timer
+                owner = None
+                pyperclip.copy(text)
+
+            # Paste on the virtual keyboard, or through ydotool
+            keys = PASTE_SHORTCUTS[self.paste_shortcut]
+            sent = False
+            if self.keyboard is not None and self._keyboard_ready():
+                sent = self.keyboard.send_keys(keys)
+                if not sent:
+                    print(f"  {self.keyboard.name} paste command failed")
+            elif self.ydotool_available:
+                # Use ydotool to send the shortcut
                 result = subprocess.run(
-                    ['ydotool', 'key', '29:1', '47:1', '47:0', '29:0'],
+                    ['ydotool', 'key'] + [f'{code}:1' for code in keys] +
+                    [f'{code}:0' for code in reversed(keys)],
                     capture_output=True,
                     timeout=5
                 )
 
-                if result.returncode != 0:
+                sent = result.returncode == 0
+                if not sent:
                     print(f"  ydotool paste command failed: {result.stderr}")
             else:
                 print("No method available to send paste command")
-                print("   Text has been copied to clipboard - paste manually with Ctrl+V")
-
-            # Restore original clipboard after a delay
-            def restore_clipboard():
-                time.sleep(2.0)  # Wait 2 seconds before restoring
-                try:
-                    pyperclip.copy(original_clipboard)
-                except:
-                    pass  # Ignore restore errors
 
-            # Run restore in a separate thread so it doesn't block
-            import threading
-            restore_thread = threading.Thread(target=restore_clipboard, daemon=True)
-            restore_thread.start()
+            if not sent:
+                # Leave the text on the clipboard so it can be pasted by hand (more than once)
+                if owner is not None:
+                    owner.kill()
+                    pyperclip.copy(text)
+                print("   Text has been copied to clipboard - paste manually with Ctrl+V")
+                return False
 
-            print("Text copied to clipboard and paste command sent")
+            self._schedule_clipboard_restore(original_clipboard, text, owner)
+            print(f"Text copied to clipboard and {self.paste_shortcut} sent")
             return True
 
         except Exception as e:
             print(f"ERROR: Clipboard injection failed: {e}")
             return False
 
+    def _copy_paste_once(self, text: str) -> Optional[subprocess.Popen]:
+        """Put text on the Wayland clipboard with a wl-copy that exits after serving one paste"""
+        if not self._paste_once:
+            return None
+        try:
+            owner = subprocess.Popen(['wl-copy', '--foreground', '--paste-once'],
+                                     stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                     stderr=subprocess.DEVNULL)
+            owner.stdin.write(text.encode('utf-8'))
+            owner.stdin.close()
+            return owner
+        except Exception as e:
+            print(f"WARNING: wl-copy --paste-once failed, restoring the clipboard on a timer: {e}")
+            self._paste_once = False
+            return None
+
+    def _schedule_clipboard_restore(self, original: str, pasted: str,
+                                    owner: Optional[subprocess.Popen] = None):
+        """
+        Put the original clipboard back once the paste is done.
+
+        With a one-shot owner that is as soon as it exits after serving the paste (or after
+        PASTE_READ_TIMEOUT if nothing reads it). Without one nothing signals the read, so
+        the restore waits clipboard_restore_delay ms - raise it for slow applications.
+        """
+        cancel = threading.Event()
+
+        def restore():
+            if owner is not None:
+                deadline = time.monotonic() + PASTE_READ_TIMEOUT
+                while owner.poll() is None and time.monotonic() < deadline:
+                    if cancel.wait(0.02):
+                        break
+                if owner.poll() is None:
+                    owner.kill()
+            else:
+                cancel.wait(max(0, self.clipboard_restore_delay) / 1000.0)
+            with self._restore_lock:
+                if self._restore is None or self._restore[0] is not cancel:
+                    return  # superseded by a newer paste
+                self._restore = None
+                self._saved_clipboard = None
+            try:
+                # Leave the clipboard alone if something else was copied in the meantime
+                # (a one-shot owner leaves it empty once it has served the paste)
+                current = pyperclip.paste()
+                if current == pasted or (owner is not None and current == ''):
+                    pyperclip.copy(original)
+            except:
+                pass  # Ignore restore errors
+
+        thread = threading.Thread(target=restore, name="clipboard-restore", daemon=True)
+        with self._restore_lock:
+            self._restore = (cancel, thread)
+            self._saved_clipboard = original
+        thread.start()
+
+    def _cancel_clipboard_restore(self) -> Optional[str]:
+        """Cancel a pending restore, returning the clipboard contents it would have restored"""
+        with self._restore_lock:
+            restore, original = self._restore, self._saved_clipboard
+            self._restore = None
+            self._saved_clipboard = None
+        if restore is not None:
+            restore[0].set()
+        return original
+
     def get_status(self) -> dict:
         """Get the status of the text injector"""
         return {
+            'keyboard': self.keyboard.name if self.keyboard is not None else None,
             'ydotool_available': self.ydotool_available,
-            'key_delay': self.key_delay
+            'key_delay': self.key_delay,
+            'paste_threshold': self.paste_threshold,
+            'last_strategy': self.last_strategy,
+            'timings': self.get_timings()
         }
+
+    def close(self):
+        """Remove the virtual keyboard or disconnect from ydotoold"""
+        # Give a pending restore a moment to finish. Restoring now could make a paste that
+        # was just sent insert the old clipboard; if it isn't done, leave the transcription.
+        with self._restore_lock:
+            restore = self._restore
+        if restore is not None:
+            restore[1].join(CLOSE_RESTORE_WAIT)
+        if self.keyboard is not None:
+            self.keyboard.close()
+            self.keyboard = None
+
+
+class IncrementalInjection:
+    """
+    Types one utterance piece by piece while it is still being transcribed.
+
+    Decoders call feed() with finalized text from their own threads. run() types it on
+    the injection worker as it arrives and returns once finish() has delivered the final
+    transcription and everything has been typed, so the first words appear while the rest
+    is still being decoded. The last word fed is held back until more text arrives, so
+    spoken commands split across two pieces ("question mark") are still converted.
+    """
+
+    # Words kept back until the next piece, to preprocess two-word commands together
+    HOLDBACK_WORDS = 1
+
+    def __init__(self, injector: TextInjector):
+        self.injector = injector
+        self.job = None  # set by the pipeline once the recording has become a job
+        self._cond = threading.Condition()
+        self._words: List[str] = []  # every word received so far
+        self._taken = 0              # words already handed to the keyboard
+        self._finished = False
+        self._cancelled = False
+        self._diverged = False       # the final transcription shares no words with what was fed
+        self.final_text = None       # the whole transcription, preprocessed, once finish() has it
+        self.typed_text = ""         # what was typed, after preprocessing and spacing
+        self.first_typed_at = None   # time.monotonic() when the first piece was typed
+
+    def feed(self, text: str):
+        """Finalized text from the decoder"""
+        words = _ANNOTATION.sub(' ', text or '').split()
+        if not words:
+            return
+        with self._cond:
+            if self._finished:
+                return
+            self._words.extend(words)
+            self._cond.notify()
+
+    def finish(self, final_text: str):
+        """The whole transcription is known - queue the part that wasn't fed"""
+        final = _ANNOTATION.sub(' ', final_text or '').split()
+        with self._cond:
+            if self._finished:
+                return
+            if final:
+                self.final_text = self.injector._preprocess_text(' '.join(final))
+                rest = self._unfed_words(final)
+                if rest is None:
+                    print("Final transcription differs from the streamed text - it is available in clipboard")
+                    self._diverged = True
+                else:
+                    self._words.extend(rest)
+            self._finished = True
+            self._cond.notify()
+
+    def _unfed_words(self, final: List[str]) -> Optional[List[str]]:
+        """
+        The words of the final transcription that follow what was fed.
+
+        The final decode can correct, merge or split words that were already fed, so the
+        two are aligned and typing continues after the last word they share. None if
+        they share no word at all.
+        """
+        fed = [_normalize_word(w) for w in self._words]
+        final_normalized = [_normalize_word(w) for w in final]
+        if final_normalized[:len(fed)] == fed:
+            return final[len(fed):]
+        blocks = [b for b in difflib.SequenceMatcher(None, fed, final_normalized, autojunk=False)
+                  .get_matching_blocks() if b.size]
+        if not blocks:
+            return None
+        return final[blocks[-1].b + blocks[-1].size:]
+
+    def cancel(self):
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify()
+
+    def run(self, progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
+        """
+        Type pieces as they arrive until the utterance is finished.
+
+        Returns False if typing failed or was cancelled; in either case it still waits for
+        finish(), so the caller can move on to the next utterance.
+        """
+        injector = self.injector
+        injector._cancel.clear()
+        injector._active_session = self
+        started = None
+        success = True
+        try:
+            while True:
+                words = self._next_words(skip=not success)
+                if words is None:
+                    break
+                if not success:
+                    continue
+                piece = self._format(words)
+                if not piece:
+                    continue
+                if started is None:
+                    started = time.perf_counter()
+                    self.first_typed_at = time.monotonic()
+                if not injector._type_chunk(piece):
+                    success = False
+                    continue
+                self.typed_text += piece
+                if progress_callback:
+                    total = len(self.typed_text) + len(' '.join(self._words[self._taken:]))
+                    progress_callback(len(self.typed_text), total)
+        finally:
+            injector._active_session = None
+
+        if self._cancelled or injector._cancel.is_set():
+            print(f"Typing cancelled after {len(self.typed_text)} chars")
+            return False
+        if not success or self._diverged:
+            # Keep the whole transcription available for pasting by hand
+            injector._copy_to_clipboard(self.final_text or
+                                        injector._preprocess_text(' '.join(self._words)))
+            if not success:
+                print("Text injection failed - the text is available in clipboard (Ctrl+V)")
+            return False
+        if self.typed_text:
+            # The final transcription as backup - it may correct words typed early
+            injector._copy_to_clipboard(self.final_text or self.typed_text.strip())
+            injector._record_timing(STRATEGY_STREAM, len(self.typed_text), time.perf_counter() - started)
+        return True
+
+    def _next_words(self, skip: bool = False) -> Optional[List[str]]:
+        """Block until words can be typed; None once everything has been typed"""
+        with self._cond:
+            while True:
+                cancelled = self._cancelled or self.injector._cancel.is_set()
+                available = len(self._words) - self._taken
+                if self._finished and (available == 0 or cancelled or skip):
+                    return None
+                ready = available if self._finished else available - self.HOLDBACK_WORDS
+                if ready > 0 and not cancelled and not skip:
+                    words = self._words[self._taken:self._taken + ready]
+                    self._taken += ready
+                    return words
+                self._cond.wait()
+
+    def _format(self, words: List[str]) -> str:
+        """Preprocess a piece and space it against what was typed before"""
+        text = self.injector._preprocess_text(' '.join(words))
+        if not text:
+            return ""
+        if self.typed_text and not self.typed_text.endswith(('\n', ' ')) and not _NO_SPACE_BEFORE.match(text):
+            text = ' ' + text
+        return text
+
+
+def _normalize_word(word: str) -> str:
+    """Compare words without case or surrounding punctuation"""
+    return re.sub(r'^\W+|\W+$', '', word.lower())
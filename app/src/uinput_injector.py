@@ -0,0 +1,214 @@
+"""
+uinput injector for WhisperTux
+Types text as key events through a persistent virtual keyboard created with evdev's UInput
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from evdev import UInput, ecodes
+from evdev.uinput import UInputError
+
+
+# Printable characters on a US keyboard -> (keycode, needs shift).
+# Keycodes are interpreted through the compositor's keymap, like ydotool's own table.
+_UNSHIFTED = {
+    ' ': 'KEY_SPACE', '\t': 'KEY_TAB', '\n': 'KEY_ENTER',
+    '-': 'KEY_MINUS', '=': 'KEY_EQUAL', '[': 'KEY_LEFTBRACE', ']': 'KEY_RIGHTBRACE',
+    '\\': 'KEY_BACKSLASH', ';': 'KEY_SEMICOLON', "'": 'KEY_APOSTROPHE', '`': 'KEY_GRAVE',
+    ',': 'KEY_COMMA', '.': 'KEY_DOT', '/': 'KEY_SLASH',
+}
+_SHIFTED = {
+    '!': 'KEY_1', '@': 'KEY_2', '#': 'KEY_3', '$': 'KEY_4', '%': 'KEY_5',
+    '^': 'KEY_6', '&': 'KEY_7', '*': 'KEY_8', '(': 'KEY_9', ')': 'KEY_0',
+    '_': 'KEY_MINUS', '+': 'KEY_EQUAL', '{': 'KEY_LEFTBRACE', '}': 'KEY_RIGHTBRACE',
+    '|': 'KEY_BACKSLASH', ':': 'KEY_SEMICOLON', '"': 'KEY_APOSTROPHE', '~': 'KEY_GRAVE',
+    '<': 'KEY_COMMA', '>': 'KEY_DOT', '?': 'KEY_SLASH',
+}
+
+
+def _build_keymap() -> Dict[str, Tuple[int, bool]]:
+    keymap = {}
+    for letter in 'abcdefghijklmnopqrstuvwxyz':
+        code = ecodes.ecodes[f'KEY_{letter.upper()}']
+        keymap[letter] = (code, False)
+        keymap[letter.upper()] = (code, True)
+    for digit in '0123456789':
+        keymap[digit] = (ecodes.ecodes[f'KEY_{digit}'], False)
+    for char, name in _UNSHIFTED.items():
+        keymap[char] = (ecodes.ecodes[name], False)
+    for char, name in _SHIFTED.items():
+        keymap[char] = (ecodes.ecodes[name], True)
+    return keymap
+
+
+KEYMAP = _build_keymap()
+
+SHIFT = ecodes.KEY_LEFTSHIFT
+KEY_LEFTCTRL = ecodes.KEY_LEFTCTRL
+KEY_V = ecodes.KEY_V
+
+# Compositors need a moment to pick up a new input device before its events are delivered
+DEVICE_SETTLE_SECONDS = 0.2
+
+
+class KeyboardInjector(ABC):
+    """
+    Types text as key events through some virtual keyboard.
+
+    Each character becomes a press frame and a release frame, each closed with a single
+    SYN_REPORT; shift is pressed once for a run of shifted characters instead of around
+    every one of them. Subclasses provide the device by implementing the abstract is_open,
+    open(), close(), _write() and _syn().
+    """
+
+    name = 'keyboard'
+
+    def __init__(self, key_delay: float = 15):
+        self.key_delay = key_delay  # milliseconds between characters
+        self._lock = threading.Lock()  # one writer at a time (typing vs. paste shortcut)
+
+    @property
+    @abstractmethod
+    def is_open(self) -> bool:
+        ...
+
+    @abstractmethod
+    def open(self) -> bool:
+        ...
+
+    @abstractmethod
+    def close(self):
+        ...
+
+    @abstractmethod
+    def _write(self, code: int, value: int):
+        """Send one EV_KEY event"""
+
+    @abstractmethod
+    def _syn(self):
+        """Close the current frame with SYN_REPORT"""
+
+    @staticmethod
+    def can_type(text: str) -> bool:
+        """True if every character has a key in the table"""
+        return all(char in KEYMAP for char in text)
+
+    def type_text(self, text: str, cancel: Optional[threading.Event] = None) -> bool:
+        """
+        Type text with the virtual keyboard. Characters missing from the table fail the call.
+
+        Setting cancel stops typing after the current character and fails the call.
+        """
+        if not self.can_type(text):
+            return False
+        delay = self.key_delay / 1000.0
+        with self._lock:
+            if not self.is_open:
+                return False
+            write, syn = self._write, self._syn
+            shifted = False
+            try:
+                for char in text:
+                    if cancel is not None and cancel.is_set():
+                        return False
+                    code, needs_shift = KEYMAP[char]
+                    if needs_shift != shifted:
+                        write(SHIFT, 1 if needs_shift else 0)
+                        shifted = needs_shift
+                    write(code, 1)
+                    syn()
+                    write(code, 0)
+                    syn()
+                    if delay:
+                        time.sleep(delay)
+            except OSError as e:
+                print(f"ERROR: {self.name} write failed: {e}")
+                return False
+            finally:
+                if shifted:
+                    self._release(SHIFT)
+        return True
+
+    def send_keys(self, codes: List[int]) -> bool:
+        """Press keys in order and release them in reverse, e.g. [KEY_LEFTCTRL, KEY_V]"""
+        with self._lock:
+            if not self.is_open:
+                return False
+            try:
+                for code in codes:
+                    self._write(code, 1)
+                self._syn()
+                for code in reversed(codes):
+                    self._write(code, 0)
+                self._syn()
+            except OSError as e:
+                print(f"ERROR: {self.name} write failed: {e}")
+                return False
+        return True
+
+    def _release(self, code: int):
+        try:
+            self._write(code, 0)
+            self._syn()
+        except OSError:
+            pass
+
+    def __del__(self):
+        """Cleanup when object is destroyed"""
+        try:
+            self.close()
+        except:
+            pass  # Ignore errors during cleanup
+
+
+class UInputInjector(KeyboardInjector):
+    """
+    A virtual keyboard that stays open for the life of the application.
+
+    Creating the device once removes the per-utterance cost of spawning `ydotool type`
+    and the round trip through ydotoold.
+    """
+
+    name = 'uinput'
+
+    def __init__(self, key_delay: float = 15, device_name: str = 'whispertux-keyboard'):
+        super().__init__(key_delay)
+        self.device_name = device_name
+        self.device = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.device is not None
+
+    def open(self) -> bool:
+        """Create the virtual keyboard. Returns False if /dev/uinput can't be used."""
+        if self.device is not None:
+            return True
+        keys = sorted({code for code, _ in KEYMAP.values()} |
+                      {SHIFT, KEY_LEFTCTRL, KEY_V})
+        try:
+            self.device = UInput({ecodes.EV_KEY: keys}, name=self.device_name)
+        except (UInputError, OSError) as e:
+            print(f"uinput not available: {e}")
+            return False
+        time.sleep(DEVICE_SETTLE_SECONDS)
+        print(f"Virtual keyboard '{self.device_name}' ready for text injection")
+        return True
+
+    def close(self):
+        with self._lock:
+            if self.device is not None:
+                try:
+                    self.device.close()
+                except OSError:
+                    pass
+                self.device = None
+
+    def _write(self, code: int, value: int):
+        self.device.write(ecodes.EV_KEY, code, value)
+
+    def _syn(self):
+        self.device.syn()
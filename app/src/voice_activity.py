@@ -0,0 +1,216 @@
+"""
+Voice activity detection for WhisperTux
+Trims silent edges, shortens long pauses and detects speech-free recordings before they reach whisper
+"""
+
+import numpy as np
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+try:
+    from .audio_buffer import to_float32
+except ImportError:
+    from audio_buffer import to_float32
+
+
+class SampleOffsetMap:
+    """
+    Maps sample positions in processed (trimmed/compressed) audio back to the original recording
+
+    The processed audio is a concatenation of spans copied from the original; each span is
+    stored as (processed_start, original_start), and positions inside a span map linearly.
+    """
+
+    def __init__(self):
+        self._processed_starts: List[int] = []
+        self._original_starts: List[int] = []
+
+    def add_span(self, processed_start: int, original_start: int):
+        """Record that processed audio from processed_start on was copied from original_start"""
+        self._processed_starts.append(processed_start)
+        self._original_starts.append(original_start)
+
+    def to_original(self, processed_sample: int) -> int:
+        """Original sample index for a sample index in the processed audio"""
+        if not self._processed_starts:
+            return processed_sample
+        span = int(np.searchsorted(self._processed_starts, processed_sample, side='right')) - 1
+        span = max(span, 0)
+        return self._original_starts[span] + (processed_sample - self._processed_starts[span])
+
+    def to_original_seconds(self, seconds: float, sample_rate: int = 16000) -> float:
+        """Map an engine timestamp (seconds into the processed audio) to the original recording"""
+        return self.to_original(int(round(seconds * sample_rate))) / float(sample_rate)
+
+    @property
+    def spans(self) -> List[Tuple[int, int]]:
+        return list(zip(self._processed_starts, self._original_starts))
+
+
+@dataclass
+class VadResult:
+    """Outcome of running the detector over one recording"""
+    audio: np.ndarray          # trimmed audio (empty if no speech)
+    has_speech: bool
+    start_sample: int          # first kept sample in the original recording
+    end_sample: int            # one past the last kept sample
+    original_samples: int
+    sample_rate: int
+    offset_map: SampleOffsetMap = field(default_factory=SampleOffsetMap)
+    compressed_pauses: int = 0
+
+    @property
+    def original_seconds(self) -> float:
+        return self.original_samples / self.sample_rate
+
+    @property
+    def saved_seconds(self) -> float:
+        """Audio time whisper no longer has to process"""
+        return (self.original_samples - len(self.audio)) / self.sample_rate
+
+
+class VoiceActivityDetector:
+    """Frame-based energy and zero-crossing-rate voice activity detector"""
+
+    def __init__(self, config_manager=None, sample_rate: int = 16000):
+        self.sample_rate = sample_rate
+
+        # Initialize settings from config if available
+        get = config_manager.get_setting if config_manager else (lambda key, default: default)
+        self.enabled = get('vad_enabled', True)
+        self.frame_ms = get('vad_frame_ms', 30)
+        # Voiced frames must be louder than this (dBFS)...
+        self.threshold_db = get('vad_threshold_db', -45.0)
+        # ...and they must also be this far above the recording's noise floor
+        self.noise_margin_db = get('vad_noise_margin_db', 10.0)
+        # A "noise floor" louder than this is speech, not the room - the floor is capped here
+        self.noise_floor_cap_db = get('vad_noise_floor_cap_db', -35.0)
+        # Quieter frames with a high zero-crossing rate (fricatives like "s", "f") also count
+        self.zcr_threshold = get('vad_zcr_threshold', 0.3)
+        self.zcr_floor_db = get('vad_zcr_floor_db', -55.0)
+        # Audio kept around the detected speech so word onsets and endings aren't clipped
+        self.padding_ms = get('vad_padding_ms', 250)
+        # Less speech than this is treated as a silent recording
+        self.min_speech_ms = get('vad_min_speech_ms', 120)
+
+        # Pause compression: internal silences longer than pause_min_ms become pause_keep_ms
+        self.compress_pauses = get('pause_compression', False)
+        self.pause_min_ms = get('pause_min_ms', 1000)
+        self.pause_keep_ms = get('pause_keep_ms', 300)
+
+    def process(self, audio: np.ndarray) -> VadResult:
+        """Trim leading/trailing silence and decide whether the recording has speech"""
+        total = len(audio)
+        if not self.enabled or total == 0:
+            return VadResult(audio, total > 0, 0, total, total, self.sample_rate)
+
+        voiced, candidate = self.classify_frames(audio)
+        frame_len = self._frame_length()
+
+        speech_ms = int(np.count_nonzero(voiced)) * self.frame_ms
+        if speech_ms < self.min_speech_ms:
+            return VadResult(audio[:0], False, 0, 0, total, self.sample_rate)
+
+        # Speech is anchored on voiced frames; unvoiced candidates only extend its edges
+        indices = np.flatnonzero(voiced)
+        first, last = int(indices[0]), int(indices[-1])
+        while first > 0 and candidate[first - 1]:
+            first -= 1
+        while last < len(candidate) - 1 and candidate[last + 1]:
+            last += 1
+
+        padding = int(self.sample_rate * self.padding_ms / 1000)
+        start = max(0, first * frame_len - padding)
+        end = min(total, (last + 1) * frame_len + padding)
+
+        result = VadResult(audio[start:end], True, start, end, total, self.sample_rate)
+        if self.compress_pauses:
+            pauses = self._find_pauses(candidate[first:last + 1], first)
+            if pauses:
+                result.audio, result.offset_map = self._remove_pauses(audio, start, end, pauses)
+                result.compressed_pauses = len(pauses)
+                return result
+
+        result.offset_map.add_span(0, start)
+        return result
+
+    def _find_pauses(self, candidate: np.ndarray, frame_offset: int) -> List[Tuple[int, int]]:
+        """Runs of non-speech frames at least pause_min_ms long, as (start, end) frame indices"""
+        min_frames = int(np.ceil(self.pause_min_ms / self.frame_ms))
+        silent = np.concatenate(([False], ~candidate, [False])).astype(np.int8)
+        edges = np.diff(silent)
+        run_starts = np.flatnonzero(edges == 1)
+        run_ends = np.flatnonzero(edges == -1)
+        long_runs = (run_ends - run_starts) >= min_frames
+        return [(int(a) + frame_offset, int(b) + frame_offset)
+                for a, b in zip(run_starts[long_runs], run_ends[long_runs])]
+
+    def _remove_pauses(self, audio: np.ndarray, start: int, end: int,
+                       pauses: List[Tuple[int, int]]) -> Tuple[np.ndarray, SampleOffsetMap]:
+        """Cut each pause down to pause_keep_ms, split evenly around the cut"""
+        frame_len = self._frame_length()
+        keep_half = int(self.sample_rate * self.pause_keep_ms / 2000)
+
+        # Spans of the original recording to keep, in order
+        spans = []
+        cursor = start
+        for pause_start, pause_end in pauses:
+            cut_from = pause_start * frame_len + keep_half
+            cut_to = pause_end * frame_len - keep_half
+            if cut_to <= cut_from:
+                continue
+            spans.append((cursor, cut_from))
+            cursor = cut_to
+        spans.append((cursor, end))
+
+        offset_map = SampleOffsetMap()
+        processed = 0
+        for span_start, span_end in spans:
+            offset_map.add_span(processed, span_start)
+            processed += span_end - span_start
+
+        compressed = np.concatenate([audio[a:b] for a, b in spans])
+        return compressed, offset_map
+
+    def classify_frames(self, audio: np.ndarray):
+        """
+        Per-frame decisions, vectorized over the whole recording
+
+        Returns:
+            (voiced, candidate) boolean arrays - voiced frames are clearly above the noise
+            floor, candidates additionally include quiet high zero-crossing frames
+        """
+        frame_len = self._frame_length()
+        n_frames = int(np.ceil(len(audio) / frame_len))
+        if n_frames == 0:
+            empty = np.zeros(0, dtype=bool)
+            return empty, empty
+
+        # Pad the last partial frame with zeros and view the signal as (frames, samples)
+        samples = to_float32(audio)  # thresholds are in dBFS, so int16 recordings are scaled
+        if len(samples) % frame_len:
+            padded = np.zeros(n_frames * frame_len, dtype=np.float32)
+            padded[:len(samples)] = samples
+            samples = padded
+        frames = samples.reshape(n_frames, frame_len)
+
+        rms = np.sqrt(np.mean(np.square(frames), axis=1))
+        level_db = 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frame_len - 1)
+
+        # Adapt to the room: the quietest tenth of the recording approximates the noise floor.
+        # A clip that is speech from start to end has no quiet tenth, so the estimate is capped.
+        noise_floor_db = min(float(np.percentile(level_db, 10)), self.noise_floor_cap_db)
+        energy_threshold = max(self.threshold_db, noise_floor_db + self.noise_margin_db)
+
+        voiced = level_db > energy_threshold
+        if not voiced.any():
+            # Never reject every frame that is above the absolute threshold
+            voiced = level_db > self.threshold_db
+        unvoiced = (zcr > self.zcr_threshold) & (level_db > max(self.zcr_floor_db, noise_floor_db + 3.0))
+        return voiced, voiced | unvoiced
+
+    def _frame_length(self) -> int:
+        return max(1, int(self.sample_rate * self.frame_ms / 1000))
@@ -0,0 +1,349 @@
+"""
+In-process whisper.cpp engine for WhisperTux
+Loads libwhisper.so via ctypes and keeps a whisper_context alive across transcriptions
+"""
+
+import ctypes
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Optional, Callable, List, Tuple
+
+
+WHISPER_SAMPLE_RATE = 16000
+WHISPER_SAMPLING_GREEDY = 0
+
+# Callback signatures from whisper.h / ggml.h
+_new_segment_callback_t = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p)
+_progress_callback_t = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p)
+_encoder_begin_callback_t = ctypes.CFUNCTYPE(ctypes.c_bool, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p)
+_abort_callback_t = ctypes.CFUNCTYPE(ctypes.c_bool, ctypes.c_void_p)
+_log_callback_t = ctypes.CFUNCTYPE(None, ctypes.c_int, ctypes.c_char_p, ctypes.c_void_p)
+
+# Extra space appended to the structs below so fields added by newer whisper.cpp
+# releases (e.g. the VAD options) land in zeroed memory instead of past our buffer
+_RESERVED_BYTES = 256
+
+
+class _WhisperAheads(ctypes.Structure):
+    _fields_ = [
+        ('n_heads', ctypes.c_size_t),
+        ('heads', ctypes.c_void_p),
+    ]
+
+
+class _WhisperContextParams(ctypes.Structure):
+    """Mirror of struct whisper_context_params (whisper.cpp 1.7.x)"""
+    _fields_ = [
+        ('use_gpu', ctypes.c_bool),
+        ('flash_attn', ctypes.c_bool),
+        ('gpu_device', ctypes.c_int),
+        ('dtw_token_timestamps', ctypes.c_bool),
+        ('dtw_aheads_preset', ctypes.c_int),
+        ('dtw_n_top', ctypes.c_int),
+        ('dtw_aheads', _WhisperAheads),
+        ('dtw_mem_size', ctypes.c_size_t),
+        ('_reserved', ctypes.c_ubyte * _RESERVED_BYTES),
+    ]
+
+
+class _GreedyParams(ctypes.Structure):
+    _fields_ = [('best_of', ctypes.c_int)]
+
+
+class _BeamSearchParams(ctypes.Structure):
+    _fields_ = [('beam_size', ctypes.c_int), ('patience', ctypes.c_float)]
+
+
+class _WhisperFullParams(ctypes.Structure):
+    """Mirror of struct whisper_full_params (whisper.cpp 1.7.x)"""
+    _fields_ = [
+        ('strategy', ctypes.c_int),
+        ('n_threads', ctypes.c_int),
+        ('n_max_text_ctx', ctypes.c_int),
+        ('offset_ms', ctypes.c_int),
+        ('duration_ms', ctypes.c_int),
+        ('translate', ctypes.c_bool),
+        ('no_context', ctypes.c_bool),
+        ('no_timestamps', ctypes.c_bool),
+        ('single_segment', ctypes.c_bool),
+        ('print_special', ctypes.c_bool),
+        ('print_progress', ctypes.c_bool),
+        ('print_realtime', ctypes.c_bool),
+        ('print_timestamps', ctypes.c_bool),
+        ('token_timestamps', ctypes.c_bool),
+        ('thold_pt', ctypes.c_float),
+        ('thold_ptsum', ctypes.c_float),
+        ('max_len', ctypes.c_int),
+        ('split_on_word', ctypes.c_bool),
+        ('max_tokens', ctypes.c_int),
+        ('debug_mode', ctypes.c_bool),
+        ('audio_ctx', ctypes.c_int),
+        ('tdrz_enable', ctypes.c_bool),
+        ('suppress_regex', ctypes.c_char_p),
+        ('initial_prompt', ctypes.c_char_p),
+        ('prompt_tokens', ctypes.c_void_p),
+        ('prompt_n_tokens', ctypes.c_int),
+        ('language', ctypes.c_char_p),
+        ('detect_language', ctypes.c_bool),
+        ('suppress_blank', ctypes.c_bool),
+        ('suppress_nst', ctypes.c_bool),
+        ('temperature', ctypes.c_float),
+        ('max_initial_ts', ctypes.c_float),
+        ('length_penalty', ctypes.c_float),
+        ('temperature_inc', ctypes.c_float),
+        ('entropy_thold', ctypes.c_float),
+        ('logprob_thold', ctypes.c_float),
+        ('no_speech_thold', ctypes.c_float),
+        ('greedy', _GreedyParams),
+        ('beam_search', _BeamSearchParams),
+        ('new_segment_callback', _new_segment_callback_t),
+        ('new_segment_callback_user_data', ctypes.c_void_p),
+        ('progress_callback', _progress_callback_t),
+        ('progress_callback_user_data', ctypes.c_void_p),
+        ('encoder_begin_callback', _encoder_begin_callback_t),
+        ('encoder_begin_callback_user_data', ctypes.c_void_p),
+        ('abort_callback', _abort_callback_t),
+        ('abort_callback_user_data', ctypes.c_void_p),
+        ('logits_filter_callback', ctypes.c_void_p),
+        ('logits_filter_callback_user_data', ctypes.c_void_p),
+        ('grammar_rules', ctypes.c_void_p),
+        ('n_grammar_rules', ctypes.c_size_t),
+        ('i_start_rule', ctypes.c_size_t),
+        ('grammar_penalty', ctypes.c_float),
+        ('_reserved', ctypes.c_ubyte * _RESERVED_BYTES),
+    ]
+
+
+def _copy_defaults(target: ctypes.Structure, source_ptr: int):
+    """Copy the known fields of a C struct into a ctypes mirror, leaving the reserved tail zeroed"""
+    known_size = type(target)._reserved.offset
+    ctypes.memmove(ctypes.addressof(target), source_ptr, known_size)
+
+
+class WhisperLibrary:
+    """In-process whisper.cpp engine using libwhisper.so through ctypes"""
+
+    def __init__(self, library_path: Path, use_gpu: bool = True):
+        self.library_path = Path(library_path)
+        self.use_gpu = use_gpu
+        self.lib = None
+        self.ctx = None
+        self.model_path = None
+
+        # whisper_context is not thread-safe; serialize loads and decodes
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()  # of the running (or last) decode
+
+        # Keep ctypes callbacks referenced while C code may call them
+        self._log_callback = _log_callback_t(lambda level, text, user_data: None)
+        self._abort_callback = _abort_callback_t(lambda user_data: self._cancel_event.is_set())
+        self._encoder_begin_callback = _encoder_begin_callback_t(
+            lambda ctx, state, user_data: not self._cancel_event.is_set()
+        )
+
+    def load(self) -> bool:
+        """Load libwhisper.so and bind the functions we use"""
+        if self.lib is not None:
+            return True
+
+        try:
+            # ctypes.CDLL releases the GIL for the duration of every foreign call
+            lib = ctypes.CDLL(str(self.library_path))
+        except OSError as e:
+            print(f"ERROR: Failed to load {self.library_path}: {e}")
+            return False
+
+        try:
+            lib.whisper_context_default_params_by_ref.restype = ctypes.c_void_p
+            lib.whisper_context_default_params_by_ref.argtypes = []
+
+            lib.whisper_init_from_file_with_params.restype = ctypes.c_void_p
+            lib.whisper_init_from_file_with_params.argtypes = [ctypes.c_char_p, _WhisperContextParams]
+
+            lib.whisper_free.restype = None
+            lib.whisper_free.argtypes = [ctypes.c_void_p]
+
+            lib.whisper_full_default_params_by_ref.restype = ctypes.c_void_p
+            lib.whisper_full_default_params_by_ref.argtypes = [ctypes.c_int]
+
+            lib.whisper_free_params.restype = None
+            lib.whisper_free_params.argtypes = [ctypes.c_void_p]
+
+            lib.whisper_free_context_params.restype = None
+            lib.whisper_free_context_params.argtypes = [ctypes.c_void_p]
+
+            lib.whisper_full.restype = ctypes.c_int
+            lib.whisper_full.argtypes = [
+                ctypes.c_void_p, _WhisperFullParams, ctypes.POINTER(ctypes.c_float), ctypes.c_int
+            ]
+
+            lib.whisper_full_n_segments.restype = ctypes.c_int
+            lib.whisper_full_n_segments.argtypes = [ctypes.c_void_p]
+
+            lib.whisper_full_get_segment_text.restype = ctypes.c_char_p
+            lib.whisper_full_get_segment_text.argtypes = [ctypes.c_void_p, ctypes.c_int]
+
+            lib.whisper_full_get_segment_t0.restype = ctypes.c_int64
+            lib.whisper_full_get_segment_t0.argtypes = [ctypes.c_void_p, ctypes.c_int]
+
+            lib.whisper_full_get_segment_t1.restype = ctypes.c_int64
+            lib.whisper_full_get_segment_t1.argtypes = [ctypes.c_void_p, ctypes.c_int]
+
+            lib.whisper_log_set.restype = None
+            lib.whisper_log_set.argtypes = [_log_callback_t, ctypes.c_void_p]
+        except AttributeError as e:
+            print(f"ERROR: {self.library_path} is missing an expected symbol: {e}")
+            return False
+
+        # Silence whisper.cpp's own logging on stderr
+        lib.whisper_log_set(self._log_callback, None)
+
+        self.lib = lib
+        return True
+
+    def load_model(self, model_path: Path) -> bool:
+        """Create a whisper_context for the given model, replacing any previous one"""
+        model_path = Path(model_path)
+        if not self.load():
+            return False
+
+        with self._lock:
+            if self.ctx is not None and model_path == self.model_path:
+                return True
+
+            self._free_context()
+
+            params = _WhisperContextParams()
+            defaults = self.lib.whisper_context_default_params_by_ref()
+            _copy_defaults(params, defaults)
+            self.lib.whisper_free_context_params(defaults)
+            params.use_gpu = self.use_gpu
+
+            ctx = self.lib.whisper_init_from_file_with_params(str(model_path).encode('utf-8'), params)
+            if not ctx:
+                print(f"ERROR: libwhisper failed to load model {model_path}")
+                return False
+
+            self.ctx = ctx
+            self.model_path = model_path
+            print(f"libwhisper loaded model {model_path.name}")
+            return True
+
+    def transcribe(self, audio_data: np.ndarray, threads: int = 4, language: str = 'en',
+                   audio_ctx: int = 0,
+                   segment_callback: Optional[Callable[[str], None]] = None,
+                   cancel_event: Optional[threading.Event] = None) -> Optional[str]:
+        """
+        Run whisper_full on 16 kHz mono float32 samples.
+
+        Returns None on failure or cancellation.
+        """
+        segments = self.transcribe_segments(
+            audio_data, threads=threads, language=language, audio_ctx=audio_ctx,
+            timestamps=False, segment_callback=segment_callback, cancel_event=cancel_event
+        )
+        if segments is None:
+            return None
+        return ''.join(text for _, _, text in segments).strip()
+
+    def transcribe_segments(self, audio_data: np.ndarray, threads: int = 4, language: str = 'en',
+                            audio_ctx: int = 0, timestamps: bool = True, prompt: Optional[str] = None,
+                            segment_callback: Optional[Callable[[str], None]] = None,
+                            cancel_event: Optional[threading.Event] = None
+                            ) -> Optional[List[Tuple[float, float, str]]]:
+        """
+        Run whisper_full and return (start, end, text) segments with times in seconds.
+
+        cancel_event belongs to the caller's job and is created when the job is queued, so
+        a cancel that arrives before the decode starts still stops it. Without one the
+        decode gets a fresh event that only cancel() can set.
+
+        Returns None on failure or cancellation.
+        """
+        samples = np.ascontiguousarray(audio_data, dtype=np.float32)
+
+        with self._lock:
+            if self.ctx is None:
+                print("ERROR: libwhisper has no model loaded")
+                return None
+
+            self._cancel_event = cancel_event if cancel_event is not None else threading.Event()
+
+            params = _WhisperFullParams()
+            defaults = self.lib.whisper_full_default_params_by_ref(WHISPER_SAMPLING_GREEDY)
+            _copy_defaults(params, defaults)
+            self.lib.whisper_free_params(defaults)
+
+            language_bytes = language.encode('utf-8')
+            prompt_bytes = prompt.encode('utf-8') if prompt else None
+            params.n_threads = threads
+            params.language = language_bytes
+            params.initial_prompt = prompt_bytes
+            params.no_timestamps = not timestamps
+            params.print_progress = False
+            params.print_realtime = False
+            params.print_timestamps = False
+            params.print_special = False
+            params.audio_ctx = audio_ctx
+            params.abort_callback = self._abort_callback
+            params.encoder_begin_callback = self._encoder_begin_callback
+
+            if segment_callback is not None:
+                def on_new_segment(ctx, state, n_new, user_data):
+                    n_segments = self.lib.whisper_full_n_segments(ctx)
+                    for i in range(n_segments - n_new, n_segments):
+                        segment_callback(self._segment_text(i))
+                new_segment_callback = _new_segment_callback_t(on_new_segment)
+                params.new_segment_callback = new_segment_callback
+
+            samples_ptr = samples.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+            result = self.lib.whisper_full(self.ctx, params, samples_ptr, len(samples))
+
+            if self._cancel_event.is_set():
+                print("libwhisper transcription cancelled")
+                return None
+            if result != 0:
+                print(f"ERROR: whisper_full failed with code {result}")
+                return None
+
+            # Segment times are reported in centiseconds
+            segments = []
+            for i in range(self.lib.whisper_full_n_segments(self.ctx)):
+                t0 = self.lib.whisper_full_get_segment_t0(self.ctx, i) / 100.0
+                t1 = self.lib.whisper_full_get_segment_t1(self.ctx, i) / 100.0
+                segments.append((t0, t1, self._segment_text(i)))
+            return segments
+
+    def cancel(self):
+        """Abort the running whisper_full call as soon as possible"""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """True if the most recent transcription was cancelled"""
+        return self._cancel_event.is_set()
+
+    def close(self):
+        """Free the whisper_context"""
+        self.cancel()
+        with self._lock:
+            self._free_context()
+
+    def _segment_text(self, index: int) -> str:
+        text = self.lib.whisper_full_get_segment_text(self.ctx, index)
+        return text.decode('utf-8', errors='replace') if text else ''
+
+    def _free_context(self):
+        if self.ctx is not None:
+            self.lib.whisper_free(self.ctx)
+            self.ctx = None
+            self.model_path = None
+
+    def __del__(self):
+        """Cleanup when object is destroyed"""
+        try:
+            if self.lib is not None:
+                self._free_context()
+        except:
+            pass  # Ignore errors during cleanup
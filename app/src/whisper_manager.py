@@ -6,18 +6,50 @@ Handles interaction with whisper.cpp for audio transcription
 import subprocess
 import tempfile
 import os
+import io
+import re
 import wave
+import threading
 import numpy as np
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional, List, Tuple
 try:
     from .config_manager import ConfigManager
+    from .whisper_server import WhisperServer
+    from .whisper_lib import WhisperLibrary, WHISPER_SAMPLE_RATE
+    from .model_index import STOCK_MODELS
+    from .audio_buffer import to_float32, to_int16
 except ImportError:
     from config_manager import ConfigManager
+    from whisper_server import WhisperServer
+    from whisper_lib import WhisperLibrary, WHISPER_SAMPLE_RATE
+    from model_index import STOCK_MODELS
+    from audio_buffer import to_float32, to_int16
+
+
+# Whisper encoder context: 1500 frames cover the 30 s window
+AUDIO_CTX_FULL = 1500
+AUDIO_CTX_FRAMES_PER_SECOND = 50
+AUDIO_CTX_PADDING = 64
+
+# Minimum encoder context per model family
+AUDIO_CTX_FLOORS = {
+    'tiny': 256,
+    'base': 256,
+    'small': 384,
+    'medium': 512,
+    'large': 768,
+}
+
+# Words of the previous window passed as the prompt when a spilled recording is decoded in windows
+LIBRARY_PROMPT_WORDS = 50
 
 
 class WhisperManager:
     """Manages whisper.cpp integration for audio transcription"""
+
+    # whisper-cli segment line when timestamps are enabled
+    _SEGMENT_LINE = re.compile(r'^\[(\d+):(\d+):([\d.]+) --> (\d+):(\d+):([\d.]+)\]\s*(.*)$')
     
     def __init__(self, config_manager: Optional[ConfigManager] = None):
         if config_manager is None:
@@ -34,6 +66,14 @@ class WhisperManager:
         # Whisper process state
         self.current_process = None
         self.ready = False
+
+        # Backend selection: 'cli' spawns whisper-cli per utterance, 'server' keeps the model
+        # resident in a whisper-server process, 'library' keeps it resident in this process
+        self.backend = self.config.get_setting('whisper_backend', 'cli')
+        self.server = None
+        self.library = None
+        # Spilled recordings go to libwhisper in windows of this length to bound the float32 copy
+        self.library_window_seconds = 300.0
         
     def initialize(self) -> bool:
         """Initialize the whisper manager and check dependencies"""
@@ -44,9 +84,10 @@ class WhisperManager:
 
             # Check if whisper binary exists
             if not self.whisper_binary.exists():
-                print(f"ERROR: Whisper binary not found at: {self.whisper_binary}")
-                print("  Please build whisper.cpp first by running the build scripts")
-                return False
+                if not self._resident_backend_available():
+                    print(f"ERROR: Whisper binary not found at: {self.whisper_binary}")
+                    print("  Please build whisper.cpp first by running the build scripts")
+                    return False
 
             # Scan for available models to populate the cache
             self.get_available_models()
@@ -71,6 +112,11 @@ class WhisperManager:
             print(f"Whisper binary found: {self.whisper_binary}")
             print(f"Using model: {self.current_model} at {self.model_path}")
 
+            if self.backend == 'server':
+                self._start_server()
+            elif self.backend == 'library':
+                self._start_library()
+
             self.ready = True
             return True
 
@@ -106,17 +152,82 @@ class WhisperManager:
         if migrated:
             self.config.save_config()
     
+    def _start_server(self):
+        """Spawn the resident whisper-server and load the model in the background"""
+        server_binary = self.config.get_whisper_server_binary_path()
+        if not server_binary.exists():
+            print(f"WARNING: whisper-server not found at {server_binary}, falling back to whisper-cli")
+            self.backend = 'cli'
+            return
+
+        self.server = WhisperServer(
+            server_binary,
+            self.model_path,
+            threads=self.config.get_setting('transcription_threads', 4),
+            port=self.config.get_setting('whisper_server_port', 0),
+            idle_timeout=self.config.get_setting('whisper_server_idle_timeout', 600),
+        )
+        # Warm up without blocking startup; the first transcription waits for readiness
+        threading.Thread(target=self.server.start, daemon=True).start()
+
+    def _start_library(self):
+        """Load libwhisper in-process and load the model in the background"""
+        library_path = self.config.get_whisper_library_path()
+        if not library_path.exists():
+            print(f"WARNING: libwhisper not found at {library_path}, falling back to whisper-cli")
+            self.backend = 'cli'
+            return
+
+        self.library = WhisperLibrary(
+            library_path,
+            use_gpu=self.config.get_setting('whisper_library_use_gpu', True),
+        )
+        if not self.library.load():
+            print("WARNING: libwhisper could not be loaded, falling back to whisper-cli")
+            self.library = None
+            self.backend = 'cli'
+            return
+
+        print(f"Using in-process libwhisper: {library_path}")
+        # Model load holds the engine lock, so the first transcription simply waits for it
+        threading.Thread(target=self.library.load_model, args=(self.model_path,), daemon=True).start()
+
+    def _resident_backend_available(self) -> bool:
+        """Check whether the selected backend can run without whisper-cli"""
+        if self.backend == 'server':
+            return self.config.get_whisper_server_binary_path().exists()
+        if self.backend == 'library':
+            return self.config.get_whisper_library_path().exists()
+        return False
+
+    def cancel_transcription(self):
+        """Abort an in-flight transcription if the backend supports it"""
+        if self.library is not None:
+            self.library.cancel()
+
+    def shutdown(self):
+        """Release backend resources (stops the resident server or frees the in-process model)"""
+        if self.server is not None:
+            self.server.stop()
+        if self.library is not None:
+            self.library.close()
+
     def is_ready(self) -> bool:
         """Check if whisper is ready for transcription"""
         return self.ready
     
-    def transcribe_audio(self, audio_data: np.ndarray, sample_rate: int = 16000) -> str:
+    def transcribe_audio(self, audio_data: np.ndarray, sample_rate: int = 16000,
+                         segment_callback: Optional[Callable[[str], None]] = None,
+                         cancel_event: Optional[threading.Event] = None) -> str:
         """
         Transcribe audio data using whisper.cpp
         
         Args:
             audio_data: NumPy array of audio samples (float32)
             sample_rate: Sample rate of the audio data
+            segment_callback: Called with each segment's text as soon as it is decoded
+                (library backend only - the other backends return everything at once)
+            cancel_event: The job's cancel event, created when it was queued (library backend)
             
         Returns:
             Transcribed text string
@@ -138,8 +249,231 @@ class WhisperManager:
         if len(audio_data) < min_samples:
             print(f"Audio too short: {len(audio_data)} samples (minimum {min_samples})")
             return ""
-        
-        # Create temporary WAV file
+
+        if cancel_event is not None and cancel_event.is_set():
+            print("Transcription cancelled before it started")
+            return ""
+
+        # Long-session recordings arrive as an int16 mapping of a complete WAV file on disk
+        wav_path = getattr(audio_data, 'wav_path', None)
+
+        # In-process backend - samples go straight to whisper_full, no WAV or subprocess
+        if self.library is not None and sample_rate == WHISPER_SAMPLE_RATE:
+            if wav_path:
+                transcription = self._transcribe_spilled_via_library(audio_data, segment_callback, cancel_event)
+            else:
+                transcription = self.library.transcribe(
+                    to_float32(audio_data),
+                    threads=self.config.get_setting('transcription_threads', 4),
+                    audio_ctx=self.get_audio_ctx(len(audio_data), sample_rate),
+                    segment_callback=segment_callback,
+                    cancel_event=cancel_event,
+                )
+            if transcription is not None or self.library.cancelled:
+                return transcription.strip() if transcription else ""
+            if not self.whisper_binary.exists():
+                return ""
+            print("libwhisper transcription failed, falling back to whisper-cli")
+
+        # Resident server backend - no model reload per utterance
+        if self.server is not None:
+            # A spilled recording is already a WAV file - upload it from disk
+            wav = wav_path or self._encode_wav(audio_data, sample_rate)
+            transcription = self.server.transcribe(wav, audio_seconds=len(audio_data) / sample_rate)
+            if transcription is not None:
+                return transcription.strip()
+            if not self.whisper_binary.exists():
+                return ""
+            print("whisper-server unavailable, falling back to whisper-cli")
+
+        transcription = self._transcribe_via_cli(audio_data, sample_rate)
+        return transcription.strip() if transcription else ""
+
+    def transcribe_segments(self, audio_data: np.ndarray, sample_rate: int = 16000,
+                            prompt: Optional[str] = None) -> Optional[List[Tuple[float, float, str]]]:
+        """
+        Transcribe audio and return timed segments
+
+        Args:
+            audio_data: NumPy array of audio samples (float32)
+            sample_rate: Sample rate of the audio data
+            prompt: Previously transcribed text to condition the decoder on
+
+        Returns:
+            List of (start_seconds, end_seconds, text) tuples, or None on failure
+        """
+        if not self.ready:
+            raise RuntimeError("Whisper manager not initialized")
+
+        if audio_data is None or len(audio_data) < int(sample_rate * 0.1):
+            return []
+
+        if self.library is not None and sample_rate == WHISPER_SAMPLE_RATE:
+            segments = self.library.transcribe_segments(
+                to_float32(audio_data),
+                threads=self.config.get_setting('transcription_threads', 4),
+                audio_ctx=self.get_audio_ctx(len(audio_data), sample_rate),
+                prompt=prompt,
+            )
+            if segments is not None or self.library.cancelled:
+                return segments
+
+        wav_bytes = self._encode_wav(audio_data, sample_rate)
+
+        if self.server is not None:
+            segments = self.server.transcribe_segments(wav_bytes, prompt=prompt,
+                                                       audio_seconds=len(audio_data) / sample_rate)
+            if segments is not None:
+                return segments
+
+        if not self.whisper_binary.exists():
+            return None
+
+        # Timestamped output on stdout: "[00:00:01.240 --> 00:00:03.880]  text"
+        stdout = self._run_whisper('-', input_data=wav_bytes, timestamps=True, prompt=prompt,
+                                   audio_ctx=self.get_audio_ctx(len(audio_data), sample_rate))
+        segments = []
+        for line in stdout.splitlines():
+            match = self._SEGMENT_LINE.match(line.strip())
+            if match:
+                h0, m0, s0, h1, m1, s1, text = match.groups()
+                segments.append((
+                    int(h0) * 3600 + int(m0) * 60 + float(s0),
+                    int(h1) * 3600 + int(m1) * 60 + float(s1),
+                    text,
+                ))
+        return segments
+
+    def _transcribe_spilled_via_library(self, audio_data: np.ndarray,
+                                        segment_callback: Optional[Callable[[str], None]] = None,
+                                        cancel_event: Optional[threading.Event] = None) -> Optional[str]:
+        """
+        Transcribe a spilled recording through libwhisper one window at a time.
+
+        whisper_full needs contiguous float32 samples, twice the size of the int16 file,
+        so converting an hour-long session at once would hold ~230 MB on top of the mapping.
+        Each window is cut at its quietest frame near the boundary and decoded with the
+        previous window's text as the prompt. Returns None on failure or cancellation.
+        """
+        window = int(self.library_window_seconds * WHISPER_SAMPLE_RATE)
+        threads = self.config.get_setting('transcription_threads', 4)
+        texts = []
+        start = 0
+        while start < len(audio_data):
+            end = len(audio_data)
+            if end - start > window:
+                end = self._quietest_cut(audio_data, start + window)
+            chunk = to_float32(audio_data[start:end])
+            prompt = ' '.join(' '.join(texts).split()[-LIBRARY_PROMPT_WORDS:]) or None
+            segments = self.library.transcribe_segments(
+                chunk, threads=threads, audio_ctx=self.get_audio_ctx(len(chunk)),
+                timestamps=False, prompt=prompt, segment_callback=segment_callback,
+                cancel_event=cancel_event,
+            )
+            if segments is None:
+                return None
+            texts.append(''.join(text for _, _, text in segments).strip())
+            start = end
+        return ' '.join(text for text in texts if text)
+
+    @staticmethod
+    def _quietest_cut(audio_data: np.ndarray, end: int, search_seconds: float = 5.0) -> int:
+        """The start of the quietest 30 ms frame in the search_seconds before end"""
+        frame = int(0.03 * WHISPER_SAMPLE_RATE)
+        begin = max(0, end - int(search_seconds * WHISPER_SAMPLE_RATE))
+        region = np.asarray(audio_data[begin:end], dtype=np.float64)
+        frames = len(region) // frame
+        if frames < 2:
+            return end
+        energy = np.square(region[:frames * frame]).reshape(frames, frame).mean(axis=1)
+        return begin + int(np.argmin(energy)) * frame or end
+
+    def get_audio_ctx(self, num_samples: int, sample_rate: int = 16000) -> int:
+        """
+        Encoder context size for a clip of the given length
+
+        whisper.cpp pads every clip to the 30 s encoder window (1500 frames, 50 per second).
+        For short clips the context is shrunk to the clip length plus a safety margin,
+        but never below a per-model floor - small contexts hurt accuracy most on large models.
+
+        Returns:
+            Number of encoder frames, or 0 to use the full window
+        """
+        if not self.config.get_setting('adaptive_audio_ctx', True):
+            return 0
+
+        duration = num_samples / float(sample_rate)
+        margin = self.config.get_setting('audio_ctx_margin', 0.2)
+        frames = int(np.ceil(duration * AUDIO_CTX_FRAMES_PER_SECOND * (1.0 + margin))) + AUDIO_CTX_PADDING
+        frames = max(frames, self._get_audio_ctx_floor())
+
+        if frames >= AUDIO_CTX_FULL:
+            return 0
+        # Keep the size a multiple of 64 frames
+        return int(np.ceil(frames / 64.0)) * 64
+
+    def _get_audio_ctx_floor(self) -> int:
+        """Smallest encoder context allowed for the current model"""
+        override = self.config.get_setting('audio_ctx_min', None)
+        if override:
+            return int(override)
+
+        name = f"{self.current_model} {self.model_path.name if self.model_path else ''}".lower()
+        for family in ('large', 'medium', 'small', 'base', 'tiny'):
+            if family in name:
+                return AUDIO_CTX_FLOORS[family]
+
+        # Unknown fine-tune: guess the family from the file size (unquantized ggml sizes)
+        try:
+            size_mb = self.model_path.stat().st_size / (1024 * 1024)
+        except (OSError, AttributeError):
+            return AUDIO_CTX_FLOORS['large']
+        if size_mb < 100:
+            return AUDIO_CTX_FLOORS['tiny']
+        if size_mb < 200:
+            return AUDIO_CTX_FLOORS['base']
+        if size_mb < 600:
+            return AUDIO_CTX_FLOORS['small']
+        if size_mb < 1600:
+            return AUDIO_CTX_FLOORS['medium']
+        return AUDIO_CTX_FLOORS['large']
+
+    def get_audio_transport(self) -> str:
+        """Get the effective whisper-cli audio transport ('pipe', 'memfd' or 'file')"""
+        transport = self.config.get_setting('audio_transport', 'pipe')
+        if transport not in ('pipe', 'memfd', 'file'):
+            print(f"WARNING: Unknown audio_transport '{transport}', using pipe")
+            transport = 'pipe'
+        if transport == 'memfd' and not hasattr(os, 'memfd_create'):
+            transport = 'pipe'
+        return transport
+
+    def _transcribe_via_cli(self, audio_data: np.ndarray, sample_rate: int) -> str:
+        """Hand audio to a whisper-cli process using the configured transport"""
+        transport = self.get_audio_transport()
+        audio_ctx = self.get_audio_ctx(len(audio_data), sample_rate)
+        timeout = self._cli_timeout(len(audio_data), sample_rate)
+
+        wav_path = getattr(audio_data, 'wav_path', None)
+        if wav_path:
+            # The recording is already a complete WAV file - let whisper-cli read it in place
+            return self._run_whisper(wav_path, audio_ctx=audio_ctx, timeout=timeout)
+
+        if transport == 'pipe':
+            # WAV bytes on stdin, transcription parsed from stdout - nothing touches the disk
+            return self._run_whisper('-', input_data=self._encode_wav(audio_data, sample_rate),
+                                     audio_ctx=audio_ctx, timeout=timeout)
+
+        if transport == 'memfd':
+            # Anonymous in-memory file the child opens through /dev/fd
+            fd = self._write_memfd(self._encode_wav(audio_data, sample_rate))
+            try:
+                return self._run_whisper(f'/dev/fd/{fd}', pass_fds=(fd,), audio_ctx=audio_ctx,
+                                         timeout=timeout)
+            finally:
+                os.close(fd)
+
+        # Legacy transport: temporary WAV in the temp directory plus a .txt result file
         with tempfile.NamedTemporaryFile(suffix='.wav', delete=False, dir=self.temp_dir) as temp_file:
             temp_wav_path = temp_file.name
             
@@ -148,9 +482,7 @@ class WhisperManager:
             self._save_audio_as_wav(audio_data, temp_wav_path, sample_rate)
             
             # Run whisper.cpp transcription
-            transcription = self._run_whisper(temp_wav_path)
-            
-            return transcription.strip() if transcription else ""
+            return self._run_whisper(temp_wav_path, output_txt=True, audio_ctx=audio_ctx, timeout=timeout)
             
         finally:
             # Clean up temporary file
@@ -158,60 +490,109 @@ class WhisperManager:
                 os.unlink(temp_wav_path)
             except:
                 pass  # Ignore cleanup errors
+
+    @staticmethod
+    def _cli_timeout(num_samples: int, sample_rate: int) -> float:
+        """whisper-cli timeout - 30 s, or twice the audio length for long recordings"""
+        return max(30.0, 2.0 * num_samples / sample_rate)
+
+    @staticmethod
+    def _write_memfd(data: bytes) -> int:
+        """Copy data into an anonymous memory-backed file and return its descriptor"""
+        fd = os.memfd_create('whispertux-audio', os.MFD_CLOEXEC)
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        except:
+            os.close(fd)
+            raise
+        return fd
     
     def _save_audio_as_wav(self, audio_data: np.ndarray, filepath: str, sample_rate: int):
         """Save numpy audio data as a WAV file"""
-        # Convert float32 to int16 for WAV format
-        if audio_data.dtype == np.float32:
-            # Scale from [-1, 1] to [-32768, 32767]
-            audio_int16 = (audio_data * 32767).astype(np.int16)
-        else:
-            audio_int16 = audio_data.astype(np.int16)
+        # int16 recordings are written as they are; float samples are scaled and clipped
+        audio_int16 = to_int16(audio_data)
         
         with wave.open(filepath, 'wb') as wav_file:
             wav_file.setnchannels(1)  # Mono
             wav_file.setsampwidth(2)  # 16-bit
             wav_file.setframerate(sample_rate)
             wav_file.writeframes(audio_int16.tobytes())
+
+    def _encode_wav(self, audio_data: np.ndarray, sample_rate: int) -> bytes:
+        """Encode numpy audio data as in-memory WAV bytes"""
+        buffer = io.BytesIO()
+        self._save_audio_as_wav(audio_data, buffer, sample_rate)
+        return buffer.getvalue()
     
-    def _run_whisper(self, audio_file_path: str) -> str:
-        """Run whisper.cpp on the given audio file"""
+    def _run_whisper(self, audio_source: str, output_txt: bool = False,
+                     input_data: Optional[bytes] = None, pass_fds: tuple = (),
+                     timestamps: bool = False, prompt: Optional[str] = None,
+                     audio_ctx: int = 0, timeout: float = 30.0) -> str:
+        """
+        Run whisper.cpp on the given audio source
+
+        Args:
+            audio_source: Path passed to -f ('-' reads the WAV from stdin)
+            output_txt: Read the result from the <audio_source>.txt file instead of stdout
+            input_data: Bytes to feed on stdin
+            pass_fds: Extra file descriptors the child needs to inherit
+            timestamps: Return the raw timestamped stdout instead of plain text
+            prompt: Initial prompt to condition the decoder on
+            audio_ctx: Encoder context size in frames (0 = full 30 s window)
+            timeout: Seconds before the process is killed
+        """
         try:
             threads = self.config.get_setting('transcription_threads', 4)
             # Construct whisper.cpp command
             cmd = [
                 str(self.whisper_binary),
                 '-m', str(self.model_path),
-                '-f', audio_file_path,
-                '--output-txt',
-                '--no-timestamps',
+                '-f', audio_source,
                 '--language', 'en',
                 '--threads', str(threads)
             ]
+            if not timestamps:
+                cmd.append('--no-timestamps')
+            if prompt:
+                cmd.extend(['--prompt', prompt])
+            if audio_ctx > 0:
+                cmd.extend(['--audio-ctx', str(audio_ctx)])
+            if output_txt:
+                cmd.append('--output-txt')
+            else:
+                # Keep stdout down to the transcription itself
+                cmd.append('--no-prints')
             
             # Run the command
             result = subprocess.run(
                 cmd,
+                input=input_data,
                 capture_output=True,
-                text=True,
-                timeout=30  # 30 second timeout
+                pass_fds=pass_fds,
+                timeout=timeout
             )
+            stdout = result.stdout.decode('utf-8', errors='replace')
             
             if result.returncode == 0:
                 # Try to read the output txt file
-                txt_file = audio_file_path + '.txt'
-                if os.path.exists(txt_file):
+                txt_file = audio_source + '.txt'
+                if output_txt and os.path.exists(txt_file):
                     with open(txt_file, 'r') as f:
                         transcription = f.read().strip()
                     # Clean up the txt file
                     os.unlink(txt_file)
                     return transcription
+                elif timestamps:
+                    return stdout
                 else:
-                    # Fall back to stdout if no txt file
-                    return result.stdout.strip()
+                    # Segments are printed one after another; collapse them into one line
+                    return ' '.join(stdout.split())
             else:
                 print(f"Whisper command failed with return code {result.returncode}")
-                print(f"stderr: {result.stderr}")
+                print(f"stderr: {result.stderr.decode('utf-8', errors='replace')}")
                 return ""
                 
         except subprocess.TimeoutExpired:
@@ -248,6 +629,12 @@ class WhisperManager:
             self.current_model = model_name
             self.model_path = new_model_path
 
+            # Swap the resident model if the server backend is active
+            if self.server is not None:
+                self.server.load_model(new_model_path)
+            if self.library is not None:
+                threading.Thread(target=self.library.load_model, args=(new_model_path,), daemon=True).start()
+
             # Update config - store model name and custom path if it's a finetune/custom
             self.config.set_setting('model', model_name)
 
@@ -299,8 +686,12 @@ class WhisperManager:
 
         return display_name
 
-    def get_available_models(self) -> list:
-        """Get list of available whisper models from all configured directories"""
+    def get_available_models(self, force_rescan: bool = False) -> list:
+        """Get list of available whisper models from all configured directories
+
+        Directory contents come from the model index, which only rescans a directory
+        when it has changed. force_rescan ignores the index and scans everything again.
+        """
         available_models = []
         model_paths = {}  # Track paths for display
         internal_to_display = {}  # Map internal names to display names
@@ -308,60 +699,44 @@ class WhisperManager:
         # Get all model directories from config
         model_dirs = self.config.get_model_directories()
 
-        # Standard model names to look for
-        supported_models = ['tiny', 'base', 'small', 'medium', 'large', 'large-v2', 'large-v3', 'large-v3-turbo']
+        model_index = self.config.get_model_index()
+        if force_rescan:
+            model_index.invalidate()
 
-        for model_dir_str in model_dirs:
-            model_dir = Path(model_dir_str).expanduser()
-            if not model_dir.exists():
+        for entry in model_index.get_roots(model_dirs):
+            if not entry['exists']:
                 continue
 
-            # Check for standard model files in this directory
-            for model in supported_models:
-                model_files = [
-                    model_dir / f"ggml-{model}.en.bin",  # English-only
-                    model_dir / f"ggml-{model}.bin"      # Multilingual
-                ]
-
-                for model_file in model_files:
-                    if model_file.exists():
-                        # Internal name for storage (e.g., "tiny" or "tiny.en")
-                        if model_file.name.endswith('.en.bin'):
-                            internal_name = f"{model}.en"
-                        else:
-                            internal_name = model
-
-                        # Display name for UI (e.g., "tiny stock")
-                        display_name = f"{model} stock"
-
+            # Standard model files in this directory, English-only preferred
+            for model in STOCK_MODELS:
+                display_name = f"{model} stock"
+                for internal_name in (f"{model}.en", model):
+                    if internal_name in entry['stock']:
                         if display_name not in available_models:
                             available_models.append(display_name)
-                            model_paths[display_name] = str(model_file)
+                            model_paths[display_name] = entry['stock'][internal_name]
                             internal_to_display[internal_name] = display_name
                         break
 
-            # Special handling for large-v3-turbo with alternate naming conventions
+            # large-v3-turbo under one of its alternate names
             turbo_display = 'large-v3-turbo stock'
-            if turbo_display not in available_models:
-                turbo_patterns = [
-                    # Standard naming
-                    model_dir / "ggml-large-v3-turbo.bin",
-                    model_dir / "ggml-large-v3-turbo.en.bin",
-                    # Alternate naming (used by dsnote, etc.)
-                    model_dir / "multilang_whisper_large3_turbo.ggml",
-                    model_dir / "whisper_large3_turbo.ggml",
-                    model_dir / "large-v3-turbo.ggml",
-                    model_dir / "ggml-large-v3-turbo.ggml",
-                ]
-                for turbo_file in turbo_patterns:
-                    if turbo_file.exists():
-                        available_models.append(turbo_display)
-                        model_paths[turbo_display] = str(turbo_file)
-                        internal_to_display['large-v3-turbo'] = turbo_display
-                        break
-
-            # Scan for finetune models in this directory
-            self._scan_for_finetunes(model_dir, available_models, model_paths)
+            if turbo_display not in available_models and entry['turbo']:
+                available_models.append(turbo_display)
+                model_paths[turbo_display] = entry['turbo']
+                internal_to_display['large-v3-turbo'] = turbo_display
+
+            # Finetune models in this directory
+            for display_name, path in entry['finetunes']:
+                # Avoid duplicates
+                base_display_name = display_name
+                counter = 1
+                while display_name in model_paths and model_paths[display_name] != path:
+                    display_name = f"{base_display_name} ({counter})"
+                    counter += 1
+
+                if display_name not in available_models:
+                    available_models.append(display_name)
+                    model_paths[display_name] = path
 
         # Add custom model path if set
         custom_path = self.config.get_custom_model_path()
@@ -377,63 +752,6 @@ class WhisperManager:
 
         return available_models
 
-    def _scan_for_finetunes(self, base_dir: Path, models_list: list, paths_dict: dict, max_depth: int = 3):
-        """Scan directory for finetune models (.bin files)"""
-        if max_depth <= 0:
-            return
-
-        try:
-            for item in base_dir.iterdir():
-                if item.is_dir():
-                    # Check for ggml-model.bin in this directory (common finetune convention)
-                    ggml_model = item / "ggml-model.bin"
-                    if ggml_model.exists():
-                        # Use directory name as finetune name with "- fine tune" suffix
-                        display_name = f"{item.name} - fine tune"
-
-                        # Avoid duplicates
-                        base_display_name = display_name
-                        counter = 1
-                        while display_name in paths_dict and paths_dict[display_name] != str(ggml_model):
-                            display_name = f"{base_display_name} ({counter})"
-                            counter += 1
-
-                        if display_name not in models_list:
-                            models_list.append(display_name)
-                            paths_dict[display_name] = str(ggml_model)
-
-                    # Recurse into subdirectories
-                    self._scan_for_finetunes(item, models_list, paths_dict, max_depth - 1)
-
-                elif item.is_file() and item.suffix == '.bin':
-                    # Check for standalone .bin files that look like finetunes
-                    # Skip standard model files (they're already handled above)
-                    stem_lower = item.stem.lower()
-                    standard_patterns = ['ggml-tiny', 'ggml-base', 'ggml-small', 'ggml-medium', 'ggml-large']
-                    is_standard = any(stem_lower.startswith(p) for p in standard_patterns)
-
-                    # Check if it looks like a finetune (contains "ggml" or "fine-tune" or "finetune")
-                    is_finetune = ('ggml' in stem_lower or 'fine-tune' in stem_lower or
-                                   'finetune' in stem_lower or 'fine_tune' in stem_lower)
-
-                    if not is_standard and is_finetune:
-                        # This looks like a custom/finetune model - use "- fine tune" suffix
-                        display_name = f"{item.stem} - fine tune"
-
-                        # Avoid duplicates
-                        base_display_name = display_name
-                        counter = 1
-                        while display_name in paths_dict and paths_dict[display_name] != str(item):
-                            display_name = f"{base_display_name} ({counter})"
-                            counter += 1
-
-                        if display_name not in models_list:
-                            models_list.append(display_name)
-                            paths_dict[display_name] = str(item)
-
-        except PermissionError:
-            pass  # Skip directories we can't read
-
     def get_model_path(self, model_name: str) -> Optional[Path]:
         """Get the full path for a model by name"""
         # Check cached paths first
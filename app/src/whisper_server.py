@@ -0,0 +1,395 @@
+"""
+Whisper server backend for WhisperTux
+Keeps a whisper.cpp server process running so the model stays resident between transcriptions
+"""
+
+import atexit
+import json
+import socket
+import subprocess
+import threading
+import time
+import uuid
+import http.client
+import os
+from pathlib import Path
+from typing import Iterator, Optional, List, Tuple, Union
+
+
+# Bytes read per chunk when uploading a WAV file from disk
+UPLOAD_CHUNK_BYTES = 1 << 20
+
+
+class WhisperServer:
+    """Manages a long-lived whisper-server process and talks to it over local HTTP"""
+
+    def __init__(self, server_binary: Path, model_path: Path, threads: int = 4,
+                 port: int = 0, idle_timeout: float = 600.0, language: str = 'en'):
+        self.server_binary = Path(server_binary)
+        self.model_path = Path(model_path)
+        self.threads = threads
+        self.language = language
+        self.host = '127.0.0.1'
+        self.requested_port = port
+        self.port = None
+
+        # Seconds without a request before the server is shut down to free memory (0 = never)
+        self.idle_timeout = idle_timeout
+
+        # Timeouts (seconds)
+        self.startup_timeout = 120.0  # large models can take a while to load
+        self.request_timeout = 60.0  # minimum - long recordings get twice their duration
+        self.health_interval = 0.1
+
+        # Crash handling - give up after too many restarts in a short window
+        self.max_restarts = 3
+        self.restart_window = 60.0
+        self._restart_times = []
+
+        # Process state
+        self.process = None
+        self.ready = False
+        self.last_used = 0.0
+        self._lock = threading.RLock()
+        self._idle_timer = None
+
+        atexit.register(self.stop)
+
+    def start(self, wait: bool = True) -> bool:
+        """Start the server process. If wait is False, return once the process is spawned."""
+        with self._lock:
+            if self.is_running():
+                return self.ready or not wait or self._wait_until_ready()
+
+            if not self.server_binary.exists():
+                print(f"ERROR: whisper-server binary not found at: {self.server_binary}")
+                return False
+
+            self.port = self.requested_port or self._find_free_port()
+            cmd = [
+                str(self.server_binary),
+                '-m', str(self.model_path),
+                '--host', self.host,
+                '--port', str(self.port),
+                '--threads', str(self.threads),
+                '--language', self.language,
+                # Timestamps are chosen per request - segment requests need them to split
+                # the audio into segments, plain transcriptions turn them off
+            ]
+
+            try:
+                self.process = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+            except Exception as e:
+                print(f"ERROR: Failed to start whisper-server: {e}")
+                self.process = None
+                return False
+
+            self.ready = False
+            self.last_used = time.monotonic()
+            print(f"Started whisper-server (pid {self.process.pid}) on {self.host}:{self.port} "
+                  f"with model {self.model_path.name}")
+
+            if not wait:
+                return True
+            return self._wait_until_ready()
+
+    def stop(self):
+        """Stop the server process if it is running"""
+        with self._lock:
+            self._cancel_idle_timer()
+            if self.process is None:
+                return
+
+            try:
+                if self.process.poll() is None:
+                    self.process.terminate()
+                    try:
+                        self.process.wait(timeout=5)
+                    except subprocess.TimeoutExpired:
+                        self.process.kill()
+                        self.process.wait(timeout=5)
+                print("whisper-server stopped")
+            except Exception as e:
+                print(f"Error stopping whisper-server: {e}")
+            finally:
+                self.process = None
+                self.ready = False
+
+    def is_running(self) -> bool:
+        """Check if the server process is alive"""
+        return self.process is not None and self.process.poll() is None
+
+    def ensure_running(self) -> bool:
+        """Make sure the server is up and healthy, restarting it if it crashed"""
+        with self._lock:
+            if self.is_running():
+                if self.ready:
+                    return True
+                return self._wait_until_ready()
+
+            if self.process is not None:
+                # The process exited on its own - treat it as a crash
+                print(f"whisper-server exited unexpectedly (code {self.process.returncode}), restarting")
+                self.process = None
+                self.ready = False
+                if not self._allow_restart():
+                    print("ERROR: whisper-server keeps crashing, giving up on restarts")
+                    return False
+
+            return self.start(wait=True)
+
+    def health_check(self) -> bool:
+        """Return True if the server answers and has finished loading the model"""
+        if not self.is_running():
+            return False
+
+        try:
+            status, _ = self._request('GET', '/health', timeout=2.0)
+            # Older servers have no /health route; any answer means the model is loaded
+            return status == 200 or status == 404
+        except (OSError, http.client.HTTPException):
+            return False
+
+    def transcribe(self, wav: Union[bytes, str], audio_seconds: float = 0.0) -> Optional[str]:
+        """
+        Send a WAV file to the server and return the transcription.
+
+        wav is the encoded file, or the path of a WAV file on disk, which is streamed
+        from the file rather than read into memory.
+
+        Returns None if the server could not produce a result, so the caller can fall back.
+        """
+        fields = {'response_format': 'json', 'temperature': '0.0', 'no_timestamps': 'true'}
+        result = self._inference(wav, fields, audio_seconds)
+        if result is None:
+            return None
+        return result.get('text', '').strip()
+
+    def transcribe_segments(self, wav: Union[bytes, str], prompt: Optional[str] = None,
+                            audio_seconds: float = 0.0) -> Optional[List[Tuple[float, float, str]]]:
+        """Send a WAV file (encoded, or a path) to the server and return (start, end, text) segments in seconds"""
+        # Without timestamp tokens the whole 30 s window comes back as a single segment
+        fields = {'response_format': 'verbose_json', 'temperature': '0.0', 'no_timestamps': 'false'}
+        if prompt:
+            fields['prompt'] = prompt
+
+        result = self._inference(wav, fields, audio_seconds)
+        if result is None:
+            return None
+        if 'segments' not in result:
+            # Server too old for verbose_json - treat the whole clip as one segment
+            return [(0.0, 0.0, result.get('text', ''))]
+        return [(float(seg.get('start', 0.0)), float(seg.get('end', 0.0)), seg.get('text', ''))
+                for seg in result['segments']]
+
+    def _inference(self, wav: Union[bytes, str], fields: dict, audio_seconds: float = 0.0) -> Optional[dict]:
+        """POST audio to /inference and return the decoded JSON response"""
+        # Decoding takes longer the longer the recording - don't give up on a busy server
+        timeout = max(self.request_timeout, 2.0 * audio_seconds)
+        for attempt in range(2):
+            if not self.ensure_running():
+                return None
+
+            self._touch()
+            try:
+                body, content_type, length = self._stream_multipart(fields, 'file', 'audio.wav', wav)
+                status, data = self._request(
+                    'POST', '/inference', body=body,
+                    headers={'Content-Type': content_type, 'Content-Length': str(length)},
+                    timeout=timeout
+                )
+            except (OSError, http.client.HTTPException) as e:
+                print(f"whisper-server request failed: {e}")
+                if attempt == 0 and not self.is_running():
+                    continue  # crashed mid-request - restart and retry once
+                return None
+            finally:
+                self._touch()
+
+            if status != 200:
+                print(f"whisper-server returned HTTP {status}: {data[:200]!r}")
+                return None
+
+            try:
+                result = json.loads(data.decode('utf-8'))
+            except (ValueError, UnicodeDecodeError):
+                return {'text': data.decode('utf-8', errors='replace').strip()}
+
+            if 'error' in result:
+                print(f"whisper-server error: {result['error']}")
+                return None
+            return result
+
+        return None
+
+    def load_model(self, model_path: Path) -> bool:
+        """Switch the resident model, restarting the server if it can't hot-swap"""
+        model_path = Path(model_path)
+        with self._lock:
+            if model_path == self.model_path and self.is_running():
+                return True
+
+            self.model_path = model_path
+            if not self.is_running():
+                # Will be picked up on the next start
+                return True
+
+            if self.ready:
+                try:
+                    body, content_type = self._encode_multipart(fields={'model': str(model_path)})
+                    status, _ = self._request(
+                        'POST', '/load', body=body,
+                        headers={'Content-Type': content_type},
+                        timeout=self.startup_timeout
+                    )
+                    if status == 200:
+                        print(f"whisper-server loaded model {model_path.name}")
+                        return True
+                except (OSError, http.client.HTTPException) as e:
+                    print(f"whisper-server model load failed: {e}")
+
+            # Fall back to a full restart with the new model
+            self.stop()
+            return self.start(wait=False)
+
+    def get_status(self) -> dict:
+        """Get the status of the server backend"""
+        return {
+            'running': self.is_running(),
+            'ready': self.ready,
+            'pid': self.process.pid if self.process else None,
+            'port': self.port,
+            'model': str(self.model_path),
+            'idle_timeout': self.idle_timeout,
+        }
+
+    def _wait_until_ready(self) -> bool:
+        """Poll the health endpoint until the model is loaded"""
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if not self.is_running():
+                print("ERROR: whisper-server exited during startup")
+                return False
+            if self.health_check():
+                self.ready = True
+                self._schedule_idle_timer()
+                return True
+            time.sleep(self.health_interval)
+
+        print("ERROR: whisper-server did not become ready in time")
+        self.stop()
+        return False
+
+    def _allow_restart(self) -> bool:
+        """Rate-limit crash restarts"""
+        now = time.monotonic()
+        self._restart_times = [t for t in self._restart_times if now - t < self.restart_window]
+        if len(self._restart_times) >= self.max_restarts:
+            return False
+        self._restart_times.append(now)
+        return True
+
+    def _touch(self):
+        """Record activity and push back the idle shutdown"""
+        self.last_used = time.monotonic()
+        self._schedule_idle_timer()
+
+    def _schedule_idle_timer(self):
+        """(Re)arm the idle unload timer"""
+        self._cancel_idle_timer()
+        if self.idle_timeout and self.idle_timeout > 0:
+            self._idle_timer = threading.Timer(self.idle_timeout, self._on_idle)
+            self._idle_timer.daemon = True
+            self._idle_timer.start()
+
+    def _cancel_idle_timer(self):
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _on_idle(self):
+        """Unload the model after a period of inactivity"""
+        with self._lock:
+            if time.monotonic() - self.last_used < self.idle_timeout:
+                return  # used again while the timer was firing
+            if self.is_running():
+                print(f"whisper-server idle for {self.idle_timeout:.0f}s, unloading model")
+                self.stop()
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None,
+                 headers: Optional[dict] = None, timeout: float = 10.0):
+        """Perform an HTTP request against the local server"""
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            return response.status, response.read()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _encode_multipart(fields: dict, file_field: Optional[str] = None,
+                          filename: Optional[str] = None, file_data: Optional[bytes] = None):
+        """Build a multipart/form-data body"""
+        boundary = uuid.uuid4().hex
+        parts = []
+        for name, value in fields.items():
+            parts.append(
+                f'--{boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f'{value}\r\n'.encode('utf-8')
+            )
+        if file_field is not None:
+            parts.append(
+                f'--{boundary}\r\n'
+                f'Content-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+                f'Content-Type: audio/wav\r\n\r\n'.encode('utf-8')
+            )
+            parts.append(file_data)
+            parts.append(b'\r\n')
+        parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+        return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+    @staticmethod
+    def _stream_multipart(fields: dict, file_field: str, filename: str,
+                          wav: Union[bytes, str]) -> Tuple[Iterator[bytes], str, int]:
+        """
+        A multipart/form-data body as an iterator of chunks, with its content type and length.
+
+        A WAV path is read in UPLOAD_CHUNK_BYTES pieces while the request is sent, so a long
+        recording is never held in memory as a whole.
+        """
+        head, content_type = WhisperServer._encode_multipart(fields, file_field, filename, b'')
+        # _encode_multipart ends with the (empty) file, CRLF and the closing boundary
+        boundary = content_type.split('boundary=', 1)[1]
+        tail = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        head = head[:-len(tail)]
+
+        if isinstance(wav, (bytes, bytearray)):
+            return iter((head, bytes(wav), tail)), content_type, len(head) + len(wav) + len(tail)
+
+        size = os.path.getsize(wav)
+
+        def chunks():
+            yield head
+            with open(wav, 'rb') as f:
+                while True:
+                    chunk = f.read(UPLOAD_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    yield chunk
+            yield tail
+
+        return chunks(), content_type, len(head) + size + len(tail)
+
+    @staticmethod
+    def _find_free_port() -> int:
+        """Ask the kernel for an unused local port"""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(('127.0.0.1', 0))
+            return s.getsockname()[1]
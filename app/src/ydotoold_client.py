@@ -0,0 +1,129 @@
+"""
+ydotoold client for WhisperTux
+Sends key events to a running ydotoold over its socket, without spawning the ydotool CLI
+"""
+
+import os
+import socket
+import struct
+import time
+from typing import Optional
+
+try:
+    from .uinput_injector import KeyboardInjector
+except ImportError:
+    from uinput_injector import KeyboardInjector
+
+
+EV_SYN = 0x00
+EV_KEY = 0x01
+SYN_REPORT = 0
+
+# struct input_event: struct timeval (two longs), __u16 type, __u16 code, __s32 value.
+# ydotoold ignores the timestamp and writes each event to its uinput device as it arrives.
+_INPUT_EVENT = struct.Struct('@llHHi')
+
+# Where ydotoold listens unless YDOTOOL_SOCKET says otherwise (scripts/ydotoold-wrapper.sh uses /tmp)
+DEFAULT_SOCKET_PATHS = ['/tmp/.ydotool_socket']
+
+
+def find_ydotoold_socket(configured: Optional[str] = None) -> Optional[str]:
+    """The ydotoold socket to use: the configured path, $YDOTOOL_SOCKET, or a default that exists"""
+    if configured:
+        return configured
+    if os.environ.get('YDOTOOL_SOCKET'):
+        return os.environ['YDOTOOL_SOCKET']
+    candidates = list(DEFAULT_SOCKET_PATHS)
+    if os.environ.get('XDG_RUNTIME_DIR'):
+        candidates.append(os.path.join(os.environ['XDG_RUNTIME_DIR'], '.ydotool_socket'))
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+class YdotooldInjector(KeyboardInjector):
+    """
+    Speaks ydotoold's socket protocol directly over one persistent connection.
+
+    For deployments where ydotoold has to stay the privileged component that owns
+    /dev/uinput. Every input_event is one datagram, exactly what the ydotool CLI sends,
+    so typing and the paste shortcut no longer fork a process. If the daemon restarts,
+    the failed event is retried once on a fresh connection.
+    """
+
+    name = 'ydotoold'
+
+    def __init__(self, key_delay: float = 15, socket_path: Optional[str] = None):
+        super().__init__(key_delay)
+        self.socket_path = socket_path
+        self.sock = None
+        self.reconnects = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.sock is not None
+
+    def open(self) -> bool:
+        """Connect to ydotoold. Returns False if no daemon is listening."""
+        if self.sock is not None:
+            return True
+        path = find_ydotoold_socket(self.socket_path)
+        if path is None:
+            print("ydotoold socket not found")
+            return False
+        try:
+            self.sock = self._connect(path)
+        except OSError as e:
+            print(f"Could not connect to ydotoold at {path}: {e}")
+            return False
+        self.socket_path = path
+        print(f"Connected to ydotoold at {path}")
+        return True
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+    @staticmethod
+    def _connect(path: str) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sock.connect(path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _disconnect(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+    def _send(self, event_type: int, code: int, value: int):
+        data = _INPUT_EVENT.pack(0, 0, event_type, code, value)
+        try:
+            self.sock.send(data)
+        except (ConnectionError, FileNotFoundError, OSError) as e:
+            # ydotoold restarted (new socket) or went away - reconnect once and resend
+            self._disconnect()
+            for attempt in range(3):
+                try:
+                    self.sock = self._connect(self.socket_path)
+                    break
+                except OSError:
+                    time.sleep(0.1 * (attempt + 1))
+            else:
+                raise OSError(f"ydotoold is not running ({e})")
+            self.reconnects += 1
+            print("Reconnected to ydotoold")
+            self.sock.send(data)
+
+    def _write(self, code: int, value: int):
+        self._send(EV_KEY, code, value)
+
+    def _syn(self):
+        self._send(EV_SYN, SYN_REPORT, 0)